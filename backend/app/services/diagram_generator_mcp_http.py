@@ -1,5 +1,6 @@
 import os
 import json
+import uuid
 import httpx
 from typing import Dict, Any
 from dotenv import load_dotenv
@@ -51,8 +52,10 @@ async def validate_components_via_mcp(component_names: list) -> Dict[str, Any]:
 async def validate_import_statements_via_mcp(import_statements: list) -> Dict[str, Any]:
     """Validate import statements using MCP HTTP service"""
     try:
-        # For now, let's build this validation logic using the existing component validation
-        # and enhance it to check module paths
+        # The tool takes a list, so every distinct component is validated in one call
+        components = list(dict.fromkeys(stmt["component"] for stmt in import_statements))
+        validation = await validate_components_via_mcp(components)
+        validation_results = validation.get("validation_results", {})
         
         invalid_imports = []
         
@@ -61,18 +64,13 @@ async def validate_import_statements_via_mcp(import_statements: list) -> Dict[st
             component = stmt["component"] 
             full_import = stmt["full_import"]
             
-            # Validate the component exists
-            component_result = await validate_components_via_mcp([component])
-            
-            if component_result.get("error"):
+            if validation.get("error"):
                 invalid_imports.append({
                     "original_import": full_import,
-                    "error": f"MCP service error: {component_result['error']}"
+                    "error": f"MCP service error: {validation['error']}"
                 })
                 continue
             
-            validation_results = component_result.get("validation_results", {})
-            
             # Check if component is valid
             if component not in validation_results:
                 invalid_imports.append({
@@ -237,6 +235,31 @@ async def call_mcp_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str,
         print(f"Error calling MCP tool {tool_name}: {e}")
         raise e
 
+async def save_mcp_artifact(client: httpx.AsyncClient, artifact_key: str) -> str:
+    """Download a rendered diagram from the MCP artifact store and persist it like local renders"""
+    response = await client.get(f"{MCP_BASE_URL}/mcp/artifacts/{artifact_key}")
+    if response.status_code != 200:
+        raise Exception(f"MCP artifact download failed: {response.status_code} - {response.text}")
+    
+    extension = artifact_key.rsplit(".", 1)[-1]
+    filename = f"{uuid.uuid4()}.{extension}"
+    os.makedirs(DIAGRAMS_OUTPUT_DIR, exist_ok=True)
+    filepath = os.path.join(DIAGRAMS_OUTPUT_DIR, filename)
+    with open(filepath, "wb") as f:
+        f.write(response.content)
+    
+    # Keys are content hashes shared by identical renders, so the artifact is left to the
+    # store's TTL and size eviction rather than deleted while another request may need it
+    
+    try:
+        from .storage import upload_diagram
+        diagram_url = await upload_diagram(filepath, filename)
+        if diagram_url and diagram_url != filepath:
+            return diagram_url
+    except Exception as e:
+        print(f"⚠️ Error uploading MCP diagram to Azure Storage: {e}")
+    return f"/static/diagrams/{filename}"
+
 async def generate_diagram_with_mcp_http(architecture_description: str) -> dict:
     """Generate architecture diagram using MCP HTTP service"""
     
@@ -286,9 +309,13 @@ async def generate_diagram_with_mcp_http(architecture_description: str) -> dict:
                     # Try to parse as JSON
                     diagram_data = json.loads(response_text)
                     
+                    diagram_path = diagram_data.get("diagram_path", "")
+                    if diagram_data.get("artifact_key"):
+                        diagram_path = await save_mcp_artifact(client, diagram_data["artifact_key"])
+                    
                     # Ensure we have the required fields
                     result = {
-                        "diagram_path": diagram_data.get("diagram_path", ""),
+                        "diagram_path": diagram_path,
                         "diagram_code": diagram_data.get("diagram_code", ""),
                         "success": True,
                         "explanation": diagram_data.get("explanation", "Diagram generated successfully"),
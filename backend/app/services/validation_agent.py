@@ -1,6 +1,7 @@
 import os
 import re
 import json
+import time
 import logging
 import asyncio
 from dotenv import load_dotenv
@@ -456,88 +457,65 @@ def fix_duplicate_kwargs(code: str) -> str:
     return re.sub(function_pattern, fix_params, code)
 
 
-def auto_fix_common_errors(code: str) -> str:
-    """Auto-fix common import errors in diagram code using validated Azure data"""
-    import re
-    import json
-    import os
-    
-    # Load our validated Azure component data
-    # First try the container path where it's copied
-    azure_nodes_path = os.path.join(os.path.dirname(__file__), "..", "..", "..", "azure_nodes.json")
-    if not os.path.exists(azure_nodes_path):
-        # Try alternative paths
-        alternative_paths = [
-            os.path.join(os.path.dirname(__file__), "..", "..", "..", "mcp-service", "azure_nodes.json"),
-            os.path.join(os.path.dirname(__file__), "..", "..", "..", "backend", "azure_nodes.json"),
-            os.path.join(os.path.dirname(__file__), "..", "..", "azure_nodes.json")  # fallback
-        ]
-        for path in alternative_paths:
-            if os.path.exists(path):
-                azure_nodes_path = path
-                break
+# Common mistake -> canonical name from the MCP service's Azure catalog (None until fetched once)
+_azure_common_mistakes = None
+_azure_common_mistakes_etag = None  # ETag (catalog version) the table was fetched at
+_azure_common_mistakes_checked = None  # monotonic time of the last revalidation
+
+
+def get_azure_common_mistakes():
+    """Common mistake -> canonical name table from the MCP service's Azure catalog.
     
+    GET /mcp/catalog?provider=azure is revalidated with If-None-Match at most every
+    AZURE_CATALOG_WATCH_SECONDS (0 disables), so a catalog reload in the MCP service
+    reaches the backend without a redeploy. Unchanged catalogs answer 304.
+    """
+    import httpx
+    
+    global _azure_common_mistakes, _azure_common_mistakes_etag, _azure_common_mistakes_checked
+    now = time.monotonic()
+    interval = float(os.getenv("AZURE_CATALOG_WATCH_SECONDS", "5"))
+    if _azure_common_mistakes_checked is not None and (interval <= 0 or now - _azure_common_mistakes_checked < interval):
+        return _azure_common_mistakes
+    _azure_common_mistakes_checked = now
+    
+    headers = {}
+    if _azure_common_mistakes is not None and _azure_common_mistakes_etag:
+        headers["If-None-Match"] = _azure_common_mistakes_etag
     try:
-        with open(azure_nodes_path, 'r', encoding='utf-8') as f:
-            azure_data = json.load(f)
+        response = httpx.get(
+            f"{MCP_BASE_URL}/mcp/catalog",
+            params={"provider": "azure"},
+            headers=headers,
+            timeout=float(os.getenv("AZURE_CATALOG_FETCH_TIMEOUT", "2"))
+        )
+        if response.status_code == 304:
+            return _azure_common_mistakes
+        response.raise_for_status()
+        # Built off to the side and swapped in whole; callers holding the old table keep using it
+        common_mistakes = dict(response.json()["common_mistakes"])
     except Exception as e:
-        logger.warning(f"⚠️ Could not load Azure data, falling back to regex fixes: {e}")
-        return auto_fix_common_errors_regex(code)
+        if _azure_common_mistakes is None:
+            logger.warning(f"⚠️ Could not load Azure data, falling back to regex fixes: {e}")
+        else:
+            # Keep the table from the last good response
+            logger.warning(f"⚠️ Could not refresh Azure data, keeping the previous table: {e}")
+        return _azure_common_mistakes
     
-    # Build lookup tables from our validated data
-    canonical_map = {}  # canonical_name -> (submodule, class_info)
-    common_mistakes = {}  # common_mistake -> canonical_name
+    if _azure_common_mistakes is not None:
+        logger.info("🔄 Reloaded Azure common-mistake table from the changed MCP catalog")
+    _azure_common_mistakes = common_mistakes
+    _azure_common_mistakes_etag = response.headers.get("etag")
+    return _azure_common_mistakes
+
+
+def auto_fix_common_errors(code: str) -> str:
+    """Auto-fix common import errors in diagram code using validated Azure data"""
+    import re
     
-    for submodule, components in azure_data.items():
-        for comp in components:
-            canonical = comp["canonical"]
-            
-            # Skip private classes
-            if canonical.startswith('_'):
-                continue
-            
-            canonical_map[canonical] = (submodule, comp)
-            
-            # Build common mistake patterns
-            # AppService -> AppServices
-            if canonical.endswith('s') and len(canonical) > 1:
-                singular = canonical[:-1]
-                common_mistakes[singular] = canonical
-            
-            # Handle specific known mistakes
-            if canonical == "AppServices":
-                common_mistakes["AppService"] = canonical
-                common_mistakes["AppServicess"] = canonical  # Fix double s
-            elif canonical == "KeyVaults":
-                common_mistakes["KeyVault"] = canonical
-                common_mistakes["KeyVaultss"] = canonical  # Fix double s
-            elif canonical == "StorageAccounts":
-                common_mistakes["StorageAccount"] = canonical
-                common_mistakes["StorageAccountss"] = canonical  # Fix double s
-            elif canonical == "SQLDatabases":
-                common_mistakes["SqlDatabase"] = canonical
-                common_mistakes["SQLDatabase"] = canonical
-                common_mistakes["SQLDatabasess"] = canonical  # Fix double s
-            elif canonical == "ContainerRegistries":
-                common_mistakes["ACR"] = canonical
-                common_mistakes["ContainerRegistry"] = canonical
-                common_mistakes["ContainerRegistriess"] = canonical  # Fix double s
-            elif canonical == "VM":
-                common_mistakes["VirtualMachine"] = canonical
-                common_mistakes["VirtualMachines"] = canonical
-            elif canonical == "FunctionApps":
-                common_mistakes["FunctionApp"] = canonical
-                common_mistakes["FunctionAppss"] = canonical  # Fix double s - CRITICAL!
-            elif canonical == "LoadBalancers":
-                common_mistakes["LoadBalancer"] = canonical
-                common_mistakes["LoadBalancerss"] = canonical  # Fix double s - CRITICAL!
-            elif canonical == "DataLake":
-                common_mistakes["DataLakes"] = canonical  # Fix plural - CRITICAL!
-            elif canonical == "DataLakeStorage":
-                common_mistakes["DataLakeStorages"] = canonical  # Fix plural
-            elif canonical == "ContainerInstances":
-                common_mistakes["ContainerInstance"] = canonical
-                common_mistakes["ContainerInstancess"] = canonical  # Fix double s
+    common_mistakes = get_azure_common_mistakes()
+    if common_mistakes is None:
+        return auto_fix_common_errors_regex(code)
     
     logger.info("🔧 Using data-driven component validation for auto-fix...")
     
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Diagram Artifact Store
+Content-addressed store for rendered diagram files shared by the MCP server
+(which writes artifacts) and the HTTP wrapper (which streams them to callers)
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+    "ps": "application/postscript",
+    "jpg": "image/jpeg",
+    "dot": "text/vnd.graphviz",
+}
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+
+class ArtifactStore:
+    """Stores rendered bytes under sha256(content).<format> with TTL and size-bounded eviction"""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024,
+                 ttl_seconds: float = 3600.0):
+        self.root = Path(root or os.path.join(tempfile.gettempdir(), "mcp-artifacts"))
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def put(self, data: bytes, format: str) -> str:
+        """Store bytes and return the artifact key"""
+        key = f"{hashlib.sha256(data).hexdigest()}.{format.lower()}"
+        path = self.root / key
+        if path.exists():
+            # Same content already stored; refresh it so eviction treats it as recent
+            os.utime(path)
+        else:
+            # Write then rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            self.evict()
+        return key
+
+    def put_file(self, file_path: str, format: str) -> str:
+        with open(file_path, "rb") as f:
+            return self.put(f.read(), format)
+
+    def path(self, key: str) -> Optional[Path]:
+        """Filesystem path of an artifact, or None if the key is invalid or missing"""
+        if not _KEY_PATTERN.match(key):
+            return None
+        path = self.root / key
+        return path if path.exists() else None
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path(key)
+        return path.read_bytes() if path else None
+
+    def delete(self, key: str) -> bool:
+        path = self.path(key)
+        if not path:
+            return False
+        path.unlink(missing_ok=True)
+        return True
+
+    def describe(self, key: str) -> Dict[str, Any]:
+        format = key.rsplit(".", 1)[-1]
+        return {
+            "artifact_key": key,
+            "format": format,
+            "content_type": content_type_for(format),
+        }
+
+    def evict(self):
+        """Drop expired artifacts, then the oldest ones until the store fits max_bytes"""
+        now = time.time()
+        entries = []
+        for path in self.root.iterdir():
+            if not _KEY_PATTERN.match(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self.ttl_seconds > 0 and now - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def content_type_for(format: str) -> str:
+    return CONTENT_TYPES.get(format.lower(), "application/octet-stream")
+
+
+_default_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Process-wide store configured from MCP_ARTIFACT_DIR / MCP_ARTIFACT_MAX_MB / MCP_ARTIFACT_TTL"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ArtifactStore(
+            root=os.getenv("MCP_ARTIFACT_DIR"),
+            max_bytes=int(os.getenv("MCP_ARTIFACT_MAX_MB", "512")) * 1024 * 1024,
+            ttl_seconds=float(os.getenv("MCP_ARTIFACT_TTL", "3600"))
+        )
+    return _default_store
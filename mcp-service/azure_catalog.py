@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Azure Component Catalog
+One immutable index over azure_nodes.json per process, shared by the Azure
+validator and the server tools. `python azure_catalog.py --compile` precompiles
+the indexes into a compact artifact (azure_nodes.catalog) of plain tuples and
+dicts with every repeated name stored once, so startup only unpickles it. When
+the artifact is missing or was compiled from a different azure_nodes.json the
+indexes are built from the JSON instead, still once per process.
+
+The catalog is reloadable at runtime: reload_azure_catalog() (or a change to
+azure_nodes.json, noticed by a throttled stat) builds the next catalog and the
+indexes derived from it off to the side and swaps them in under the lock, so a
+caller holding a catalog keeps a consistent snapshot until its next
+get_azure_catalog().
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+CATALOG_FORMAT = 1
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_NODES_PATH = os.path.join(BASE_DIR, "azure_nodes.json")
+DEFAULT_ARTIFACT_PATH = os.path.join(BASE_DIR, "azure_nodes.catalog")
+
+_WORD_PATTERN = re.compile(r'[A-Z][a-z]*|[a-z]+')
+
+# Misspellings diagram agents produce beyond a dropped plural "s"
+KNOWN_MISTAKES = {
+    "AppServices": ("AppService", "AppServicess"),
+    "KeyVaults": ("KeyVault", "KeyVaultss"),
+    "StorageAccounts": ("StorageAccount", "StorageAccountss"),
+    "SQLDatabases": ("SqlDatabase", "SQLDatabase", "SQLDatabasess"),
+    "ContainerRegistries": ("ACR", "ContainerRegistry", "ContainerRegistriess"),
+    "VM": ("VirtualMachine", "VirtualMachines"),
+    "FunctionApps": ("FunctionApp", "FunctionAppss"),
+    "LoadBalancers": ("LoadBalancer", "LoadBalancerss"),
+    "DataLake": ("DataLakes",),
+    "DataLakeStorage": ("DataLakeStorages",),
+    "ContainerInstances": ("ContainerInstance", "ContainerInstancess"),
+}
+
+
+def extract_keywords(name: str) -> List[str]:
+    """Searchable keywords of a component name: its camelCase words and a few whole-name variants"""
+    keywords = [w.lower() for w in _WORD_PATTERN.findall(name)]
+    lowered = name.lower()
+    keywords.extend([
+        lowered,
+        lowered.replace('services', '').replace('service', ''),
+        lowered.replace('apps', '').replace('app', ''),
+    ])
+    return list(set(keywords))
+
+
+class AzureComponent:
+    """One public class of a diagrams.azure submodule"""
+
+    __slots__ = ("canonical", "class_name", "submodule", "aliases")
+
+    def __init__(self, canonical: str, class_name: str, submodule: str, aliases: Tuple[str, ...]):
+        self.canonical = canonical
+        self.class_name = class_name
+        self.submodule = submodule
+        self.aliases = aliases
+
+    @property
+    def import_path(self) -> str:
+        return f"diagrams.azure.{self.submodule}"
+
+    def __repr__(self) -> str:
+        return f"AzureComponent({self.import_path}.{self.canonical})"
+
+
+def build_catalog_data(azure_data: Dict[str, List[Dict[str, Any]]], source_sha256: str = "") -> Dict[str, Any]:
+    """Every index as plain tuples and dicts, the form the compiled artifact stores"""
+    intern = sys.intern
+    components = []
+    alias_map: Dict[str, str] = {}
+    keyword_map: Dict[str, List[Tuple[str, str]]] = {}
+    submodule_components: Dict[str, Tuple[str, ...]] = {}
+    common_mistakes: Dict[str, str] = {}
+
+    for submodule, entries in azure_data.items():
+        submodule = intern(submodule)
+        names = []
+        for comp in entries:
+            canonical = intern(comp["canonical"])
+            # Skip private classes
+            if canonical.startswith('_'):
+                continue
+            aliases = tuple(intern(alias) for alias in comp.get("aliases", []))
+            components.append((canonical, intern(comp["class"]), submodule, aliases))
+            names.append(canonical)
+            for alias in aliases:
+                alias_map[alias] = canonical
+            for keyword in extract_keywords(canonical):
+                keyword_map.setdefault(intern(keyword), []).append((submodule, canonical))
+            # AppService -> AppServices
+            if canonical.endswith('s') and len(canonical) > 1:
+                common_mistakes[intern(canonical[:-1])] = canonical
+            for mistake in KNOWN_MISTAKES.get(canonical, ()):
+                common_mistakes[intern(mistake)] = canonical
+        submodule_components[submodule] = tuple(names)
+
+    return {
+        "format": CATALOG_FORMAT,
+        "source_sha256": source_sha256,
+        "components": tuple(components),
+        "alias_map": alias_map,
+        "keyword_map": {keyword: tuple(hits) for keyword, hits in keyword_map.items()},
+        "submodule_components": submodule_components,
+        "common_mistakes": common_mistakes,
+    }
+
+
+class AzureCatalog:
+    """Read-only component records plus canonical, alias, keyword, submodule and common-mistake indexes"""
+
+    __slots__ = ("source_sha256", "version", "components", "canonical_map", "alias_map", "keyword_map",
+                 "submodule_components", "common_mistakes", "_derived", "_derived_lock")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.source_sha256 = data["source_sha256"]
+        self.version = data["source_sha256"][:16]
+        self.components = tuple(AzureComponent(*record) for record in data["components"])
+        self.canonical_map = MappingProxyType({comp.canonical: comp for comp in self.components})
+        self.alias_map = MappingProxyType(data["alias_map"])
+        self.keyword_map = MappingProxyType(data["keyword_map"])
+        self.submodule_components = MappingProxyType(data["submodule_components"])
+        self.common_mistakes = MappingProxyType(data["common_mistakes"])
+        self._derived: Dict[str, Tuple[Callable[["AzureCatalog"], Any], Any]] = {}
+        # Reentrant: one derived index may be built from another (the validator from the matcher)
+        self._derived_lock = threading.RLock()
+
+    def derived(self, key: str, build: Callable[["AzureCatalog"], Any]) -> Any:
+        """build(self), once per catalog; a reloaded catalog rebuilds it before it is swapped in"""
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = (build, build(self))
+            return self._derived[key][1]
+
+    def derived_builders(self) -> Dict[str, Callable[["AzureCatalog"], Any]]:
+        with self._derived_lock:
+            return {key: build for key, (build, _) in self._derived.items()}
+
+    def resolve(self, name: str) -> Optional[AzureComponent]:
+        """Component for a canonical name or an alias"""
+        comp = self.canonical_map.get(name)
+        if comp is None and name in self.alias_map:
+            comp = self.canonical_map[self.alias_map[name]]
+        return comp
+
+
+def compile_catalog(nodes_path: str = DEFAULT_NODES_PATH, artifact_path: str = DEFAULT_ARTIFACT_PATH) -> Dict[str, Any]:
+    """Build the indexes from azure_nodes.json and write them to the artifact"""
+    with open(nodes_path, "rb") as f:
+        raw = f.read()
+    data = build_catalog_data(json.loads(raw), hashlib.sha256(raw).hexdigest())
+    tmp_path = f"{artifact_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, artifact_path)
+    return data
+
+
+def load_catalog(nodes_path: str = DEFAULT_NODES_PATH, artifact_path: Optional[str] = DEFAULT_ARTIFACT_PATH) -> AzureCatalog:
+    """Catalog from the compiled artifact when it matches nodes_path, else built from the JSON"""
+    with open(nodes_path, "rb") as f:
+        raw = f.read()
+    source_sha256 = hashlib.sha256(raw).hexdigest()
+
+    if artifact_path:
+        try:
+            with open(artifact_path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("format") == CATALOG_FORMAT and data.get("source_sha256") == source_sha256:
+                return AzureCatalog(data)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError, KeyError):
+            pass
+    return AzureCatalog(build_catalog_data(json.loads(raw), source_sha256))
+
+
+_default_catalog: Optional[AzureCatalog] = None
+_default_catalog_lock = threading.Lock()
+# One reload builds at a time; the swap itself only takes _default_catalog_lock
+_reload_lock = threading.Lock()
+_source_stat: Optional[Tuple[int, int]] = None
+_next_watch_check = 0.0
+_watch_reloading = False
+
+
+def _default_paths() -> Tuple[str, str]:
+    return (os.getenv("MCP_AZURE_NODES", DEFAULT_NODES_PATH),
+            os.getenv("MCP_AZURE_CATALOG", DEFAULT_ARTIFACT_PATH))
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_azure_catalog() -> AzureCatalog:
+    """Process-wide catalog; MCP_AZURE_NODES and MCP_AZURE_CATALOG override the file locations.
+
+    Every MCP_CATALOG_WATCH_SECONDS (0 disables) a call stats azure_nodes.json and,
+    when it changed, reloads in a background thread; callers keep the current
+    catalog until the new one is swapped in.
+    """
+    global _default_catalog, _source_stat, _next_watch_check, _watch_reloading
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            nodes_path, artifact_path = _default_paths()
+            _source_stat = _stat(nodes_path)
+            _default_catalog = load_catalog(nodes_path, artifact_path)
+        catalog = _default_catalog
+
+        interval = float(os.getenv("MCP_CATALOG_WATCH_SECONDS", "5"))
+        now = time.monotonic()
+        if interval <= 0 or now < _next_watch_check or _watch_reloading:
+            return catalog
+        _next_watch_check = now + interval
+        if _stat(_default_paths()[0]) == _source_stat:
+            return catalog
+        _watch_reloading = True
+
+    def watch_reload():
+        global _watch_reloading
+        try:
+            reload_azure_catalog()
+        finally:
+            _watch_reloading = False
+
+    threading.Thread(target=watch_reload, name="azure-catalog-reload", daemon=True).start()
+    return catalog
+
+
+def reload_azure_catalog(force: bool = False) -> Dict[str, Any]:
+    """Build the catalog from the current files and swap it in if its source changed (or force)"""
+    global _default_catalog, _source_stat
+    with _reload_lock:
+        started = time.perf_counter()
+        nodes_path, artifact_path = _default_paths()
+        with _default_catalog_lock:
+            current = _default_catalog
+        stat = _stat(nodes_path)
+        try:
+            catalog = load_catalog(nodes_path, artifact_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Keep serving the current catalog; a broken file is not retried until it changes again
+            with _default_catalog_lock:
+                _source_stat = stat
+            return {"reloaded": False, "error": f"Could not load {nodes_path}: {e}",
+                    "version": current.version if current else None}
+
+        if current is not None and catalog.source_sha256 == current.source_sha256 and not force:
+            with _default_catalog_lock:
+                _source_stat = stat
+            return {"reloaded": False, "version": current.version}
+
+        # Matchers, validators and other indexes over the old catalog are rebuilt before the swap
+        if current is not None:
+            for key, build in current.derived_builders().items():
+                catalog.derived(key, build)
+        with _default_catalog_lock:
+            _default_catalog = catalog
+            _source_stat = stat
+        return {
+            "reloaded": True,
+            "version": catalog.version,
+            "previous_version": current.version if current else None,
+            "components": len(catalog.components),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Azure component catalog")
+    parser.add_argument("--compile", action="store_true", help="Write the precompiled catalog artifact")
+    parser.add_argument("--nodes", default=os.getenv("MCP_AZURE_NODES", DEFAULT_NODES_PATH))
+    parser.add_argument("--output", default=os.getenv("MCP_AZURE_CATALOG", DEFAULT_ARTIFACT_PATH))
+    args = parser.parse_args()
+
+    if args.compile:
+        data = compile_catalog(args.nodes, args.output)
+        print(f"Wrote {args.output}: {len(data['components'])} components, "
+              f"{len(data['keyword_map'])} keywords, {os.path.getsize(args.output)} bytes")
+    else:
+        catalog = load_catalog(args.nodes, args.output)
+        print(json.dumps({submodule: list(names) for submodule, names in catalog.submodule_components.items()}, indent=2))
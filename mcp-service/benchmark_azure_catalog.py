@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Azure Catalog Cold-Start Benchmark
+Measures what the Azure component catalog costs a fresh process (compiled
+artifact versus building the indexes from azure_nodes.json) and what it costs
+each validation call (a validator built per call, as the tools used to do,
+versus the shared process-wide catalog). Reports JSON.
+
+Usage:
+    python azure_catalog.py --compile
+    python benchmark_azure_catalog.py --runs 20 --calls 500
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+BASE_DIR = Path(__file__).parent
+
+# Valid names, aliases and typical mistakes, like a validate_azure_components call gets
+SAMPLE_NAMES = ["AppServices", "ACR", "KeyVaults", "FunctionApp", "CosmosDb", "SqlDatabase",
+                "StorageAccounts", "LoadBalancer", "KubernetesServices", "RedisCache"]
+
+COLD_START = """
+import sys, time
+started = time.perf_counter()
+from azure_catalog import load_catalog, DEFAULT_ARTIFACT_PATH
+load_catalog(artifact_path=DEFAULT_ARTIFACT_PATH if sys.argv[1] == "artifact" else None)
+print(time.perf_counter() - started)
+"""
+
+
+def _summary(samples: List[float]) -> Dict[str, Any]:
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+def cold_start(source: str, runs: int) -> Dict[str, Any]:
+    """Import plus catalog load in a fresh interpreter, timed inside the child"""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", COLD_START, source], cwd=BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.strip()))
+    return _summary(samples)
+
+
+def per_call(calls: int) -> Dict[str, Any]:
+    """validate_component_names latency with a validator per call versus the shared one"""
+    from azure_catalog import DEFAULT_NODES_PATH
+    from enhanced_azure_validator import AzureComponentValidator, validate_component_names
+
+    def legacy(names):
+        # What each tool call did before: read the JSON and rebuild every index
+        validator = AzureComponentValidator(azure_nodes_path=DEFAULT_NODES_PATH)
+        return {name: validator.validate_component(name) for name in names}
+
+    validate_component_names(SAMPLE_NAMES)  # load the shared catalog outside the timed loop
+    results = {}
+    for label, call in (("validator_per_call", legacy), ("shared_catalog", validate_component_names)):
+        samples = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            call(SAMPLE_NAMES)
+            samples.append(time.perf_counter() - started)
+        results[label] = _summary(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Azure catalog cold start and per-call cost")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per cold-start source")
+    parser.add_argument("--calls", type=int, default=200, help="Validation calls per per-call variant")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    from azure_catalog import DEFAULT_ARTIFACT_PATH
+
+    report = {
+        "config": {"runs": args.runs, "calls": args.calls, "names_per_call": len(SAMPLE_NAMES)},
+        "cold_start": {"json": cold_start("json", args.runs)},
+        "per_call": per_call(args.calls),
+    }
+    if Path(DEFAULT_ARTIFACT_PATH).exists():
+        report["cold_start"]["artifact"] = cold_start("artifact", args.runs)
+    else:
+        print(f"{DEFAULT_ARTIFACT_PATH} not found; run `python azure_catalog.py --compile` "
+              f"to include the artifact cold start", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
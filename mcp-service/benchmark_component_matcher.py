@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Component Matcher Benchmark
+Runs the indexed matcher and the old linear scan over a corpus of Azure
+component names models actually produced (dropped or doubled plurals, wrong
+casing, marketing names, typos) and reports top-1 accuracy, top-5 recall,
+wrong-first-suggestion rate and per-lookup latency as JSON. A wrong first
+suggestion matters most: simple_mcp_validation applies it as the fix.
+
+Usage:
+    python benchmark_component_matcher.py --thresholds 0.4,0.5,0.6 --repeat 20
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Tuple
+
+BASE_DIR = Path(__file__).parent
+
+# (name a model wrote, accepted canonical names)
+MISSPELLINGS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("FunctionApp", ("FunctionApps",)),
+    ("FunctionAppss", ("FunctionApps",)),
+    ("FuntionApps", ("FunctionApps",)),
+    ("AzureFunctions", ("FunctionApps",)),
+    ("DataLakes", ("DataLake",)),
+    ("AppService", ("AppServices",)),
+    ("AppServicess", ("AppServices",)),
+    ("AppSevices", ("AppServices",)),
+    ("WebApp", ("AppServices",)),
+    ("AppServicePlan", ("AppServicePlans",)),
+    ("KeyVault", ("KeyVaults",)),
+    ("KeyVaultss", ("KeyVaults",)),
+    ("KeyVaut", ("KeyVaults",)),
+    ("StorageAccount", ("StorageAccounts",)),
+    ("StorageAccountss", ("StorageAccounts",)),
+    ("StorageAcount", ("StorageAccounts",)),
+    ("BlobStorages", ("BlobStorage",)),
+    ("QueueStorage", ("QueuesStorage",)),
+    ("TableStorages", ("TableStorage",)),
+    ("SQLManagedInstance", ("SQLManagedInstances",)),
+    ("SqlDatabase", ("SQLDatabases",)),
+    ("SQLDatabase", ("SQLDatabases",)),
+    ("SQLDatabasess", ("SQLDatabases",)),
+    ("SqlServer", ("SQLServers",)),
+    ("AzureSQL", ("SQLDatabases", "SQL")),
+    ("CosmosDB", ("CosmosDb",)),
+    ("CosmosDatabase", ("CosmosDb",)),
+    ("RedisCache", ("CacheForRedis",)),
+    ("PostgreSQL", ("DatabaseForPostgresqlServers",)),
+    ("PostgresqlServer", ("DatabaseForPostgresqlServers",)),
+    ("MySQL", ("DatabaseForMysqlServers",)),
+    ("VirtualMachine", ("VM",)),
+    ("VirtualMachines", ("VM",)),
+    ("VMScaleSets", ("VMSS",)),
+    ("ContainerRegistry", ("ACR",)),
+    ("ContainerInstance", ("ContainerInstances",)),
+    ("ContainerInstancess", ("ContainerInstances",)),
+    ("ContainerApp", ("ContainerApps",)),
+    ("AzureKubernetesService", ("AKS",)),
+    ("KubernetesService", ("AKS",)),
+    ("LoadBalancer", ("LoadBalancers",)),
+    ("LoadBalancerss", ("LoadBalancers",)),
+    ("ApplicationGateways", ("ApplicationGateway",)),
+    ("AppGateway", ("ApplicationGateway",)),
+    ("FrontDoor", ("FrontDoors",)),
+    ("CDNProfile", ("CDNProfiles",)),
+    ("TrafficManager", ("TrafficManagerProfiles",)),
+    ("DNSZone", ("DNSZones",)),
+    ("Firewalls", ("Firewall",)),
+    ("PublicIPAddress", ("PublicIpAddresses",)),
+    ("VirtualNetwork", ("VirtualNetworks",)),
+    ("VNet", ("VirtualNetworks",)),
+    ("Subnet", ("Subnets",)),
+    ("PrivateEndpoints", ("PrivateEndpoint",)),
+    ("NetworkSecurityGroup", ("NetworkSecurityGroupsClassic",)),
+    ("VPNGateway", ("VirtualNetworkGateways",)),
+    ("ExpressRoute", ("ExpressrouteCircuits",)),
+    ("EventHub", ("EventHubs",)),
+    ("EventHubss", ("EventHubs",)),
+    ("EventGridTopic", ("EventGridTopics",)),
+    ("ServiceBusQueue", ("ServiceBus",)),
+    ("ServiceBusNamespace", ("ServiceBus",)),
+    ("LogicApp", ("LogicApps",)),
+    ("APIManagementService", ("APIManagement",)),
+    ("ApiManagement", ("APIManagement",)),
+    ("LogAnalytics", ("LogAnalyticsWorkspaces",)),
+    ("LogAnalyticsWorkspace", ("LogAnalyticsWorkspaces",)),
+    ("ApplicationInsight", ("ApplicationInsights",)),
+    ("AppInsights", ("ApplicationInsights",)),
+    ("AzureMonitor", ("Monitor",)),
+    ("DataFactory", ("DataFactories", "DataFactory")),
+    ("DataFactorys", ("DataFactories", "DataFactory")),
+    ("Databrick", ("Databricks",)),
+    ("StreamAnalytics", ("StreamAnalyticsJobs",)),
+    ("SynapseAnalytic", ("SynapseAnalytics",)),
+    ("IoTHub", ("IotHub",)),
+    ("CognitiveService", ("CognitiveServices",)),
+    ("OpenAI", ("AzureOpenAI",)),
+    ("AzureOpenAi", ("AzureOpenAI",)),
+    ("BotService", ("BotServices",)),
+    ("AzureAD", ("ActiveDirectory",)),
+    ("ActiveDirectories", ("ActiveDirectory",)),
+    ("ManagedIdentity", ("ManagedIdentities",)),
+    ("Sentinal", ("Sentinel",)),
+    ("SecurityCentre", ("SecurityCenter",)),
+    ("NotificationHub", ("NotificationHubs",)),
+    ("SignalR", ("Signalr",)),
+    ("CognitiveSearch", ("Search",)),
+    ("RecoveryServicesVault", ("RecoveryServicesVaults",)),
+    ("BatchAccount", ("BatchAccounts",)),
+    ("DevOps", ("Devops",)),
+]
+
+
+def legacy_find_suggestions(catalog, name: str) -> List[Dict[str, str]]:
+    """The linear scan the validator used before the matcher, for comparison"""
+    from azure_catalog import extract_keywords
+
+    def similarity(a: str, b: str) -> float:
+        if not a or not b:
+            return 0.0
+        return sum(1 for char in a if char in b) / max(len(a), len(b))
+
+    suggestions = []
+    for keyword in extract_keywords(name):
+        for submodule, canonical in catalog.keyword_map.get(keyword, ()):
+            suggestions.append({"name": canonical, "submodule": submodule})
+    for canonical, comp in catalog.canonical_map.items():
+        if similarity(name.lower(), canonical.lower()) > 0.6:
+            suggestions.append({"name": canonical, "submodule": comp.submodule})
+    seen = set()
+    unique = []
+    for suggestion in suggestions:
+        if suggestion["name"] not in seen:
+            seen.add(suggestion["name"])
+            unique.append(suggestion)
+    return unique[:5]
+
+
+def evaluate(find: Callable[[str], List[Dict[str, Any]]], repeat: int) -> Dict[str, Any]:
+    top1 = top5 = wrong_first = empty = 0
+    misses = []
+    samples = []
+    for name, accepted in MISSPELLINGS:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            suggestions = find(name)
+            samples.append(time.perf_counter() - started)
+        names = [s["name"] for s in suggestions]
+        if not names:
+            empty += 1
+        elif names[0] in accepted:
+            top1 += 1
+        else:
+            wrong_first += 1
+        if any(n in accepted for n in names[:5]):
+            top5 += 1
+        if not names or names[0] not in accepted:
+            misses.append({"name": name, "expected": accepted[0], "got": names[:3]})
+
+    samples.sort()
+    total = len(MISSPELLINGS)
+    return {
+        "top1_accuracy": round(top1 / total, 3),
+        "top5_recall": round(top5 / total, 3),
+        "wrong_first_rate": round(wrong_first / total, 3),
+        "no_suggestion_rate": round(empty / total, 3),
+        "p50_us": round(statistics.median(samples) * 1e6, 1),
+        "p95_us": round(samples[int(len(samples) * 0.95)] * 1e6, 1),
+        "max_us": round(samples[-1] * 1e6, 1),
+        "misses": misses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Azure component name suggestions")
+    parser.add_argument("--thresholds", default="0.5", help="Comma separated matcher thresholds to compare")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed lookups per corpus entry")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    from azure_catalog import get_azure_catalog
+    from component_matcher import ComponentMatcher
+
+    catalog = get_azure_catalog()
+    started = time.perf_counter()
+    matcher = ComponentMatcher(catalog)
+    build_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    report = {
+        "config": {"corpus_size": len(MISSPELLINGS), "repeat": args.repeat, "matcher_build_ms": build_ms},
+        "legacy_scan": evaluate(lambda name: legacy_find_suggestions(catalog, name), args.repeat),
+        "matcher": {},
+    }
+    for threshold in (float(t) for t in args.thresholds.split(",") if t.strip()):
+        report["matcher"][str(threshold)] = evaluate(lambda name: matcher.match(name, threshold), args.repeat)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
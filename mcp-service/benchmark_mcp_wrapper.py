@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+MCP HTTP Wrapper Benchmark
+Starts mcp_http_wrapper.py once per transport mode, drives it with a weighted
+mix of MCP calls at a fixed concurrency and reports latency percentiles,
+throughput, peak RSS and process count as JSON. With --batch-sizes it also
+measures diagram render throughput (diagrams/s) for one-call-per-diagram versus
+batch_render_diagrams at each batch size.
+
+Usage:
+    python benchmark_mcp_wrapper.py --modes spawn,pool,inprocess --concurrency 16 --requests 500
+    python benchmark_mcp_wrapper.py --modes inprocess --batch-sizes 1,10,50 --batch-items 500
+    python benchmark_mcp_wrapper.py --url http://localhost:8001 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+
+BASE_DIR = Path(__file__).parent
+WRAPPER_PATH = BASE_DIR / "mcp_http_wrapper.py"
+
+# Wrapper environment per transport mode
+TRANSPORT_MODES = {
+    "spawn": {"MCP_TRANSPORT": "spawn", "MCP_INPROCESS_TOOLS": "false"},
+    "pool": {"MCP_TRANSPORT": "pool", "MCP_INPROCESS_TOOLS": "false"},
+    "inprocess": {"MCP_TRANSPORT": "pool", "MCP_INPROCESS_TOOLS": "true"},
+}
+
+# Identical calls would otherwise be served from the coalescing layer and
+# result cache, which measures the cache rather than the transport
+NO_CACHE_ENV = {"MCP_COALESCE_CALLS": "false", "MCP_RESULT_CACHE_TTL": "0"}
+
+DEFAULT_MIX = "tools_list=1,validate_azure_components=4,suggest_diagram_structure=3,generate_diagram=2"
+
+# Diagram code recorded from typical generate-diagram requests
+RECORDED_DIAGRAMS = [
+    '''from diagrams import Diagram, Cluster
+from diagrams.azure.compute import AppServices, FunctionApps
+from diagrams.azure.database import SQLDatabases, CosmosDb
+from diagrams.azure.network import ApplicationGateway
+
+with Diagram("Web Application", show=False, direction="LR"):
+    gateway = ApplicationGateway("Gateway")
+    with Cluster("App Tier"):
+        web = AppServices("Web")
+        jobs = FunctionApps("Jobs")
+    gateway >> web >> SQLDatabases("Orders")
+    web >> jobs >> CosmosDb("Events")
+''',
+    '''from diagrams import Diagram
+from diagrams.azure.compute import KubernetesServices, ContainerRegistries
+from diagrams.azure.storage import BlobStorage
+from diagrams.azure.security import KeyVaults
+from diagrams.azure.devops import Pipelines
+
+with Diagram("Microservices on AKS", show=False):
+    aks = KubernetesServices("AKS")
+    Pipelines("CI/CD") >> ContainerRegistries("ACR") >> aks
+    aks >> BlobStorage("Assets")
+    aks >> KeyVaults("Secrets")
+''',
+    '''from diagrams import Diagram, Cluster
+from diagrams.azure.analytics import EventHubs, StreamAnalyticsJobs, Databricks
+from diagrams.azure.storage import DataLakeStorage
+from diagrams.azure.iot import IotHub
+
+with Diagram("IoT Analytics", show=False, direction="LR"):
+    hub = IotHub("Devices")
+    with Cluster("Ingestion"):
+        events = EventHubs("Events")
+        stream = StreamAnalyticsJobs("Stream")
+    hub >> events >> stream >> DataLakeStorage("Lake") >> Databricks("Analytics")
+''',
+]
+
+RECORDED_COMPONENTS = [
+    ["AppServices", "SQLDatabases", "ApplicationGateway"],
+    ["KubernetesServices", "ContainerRegistries", "KeyVaults", "BlobStorage"],
+    ["EventHubs", "StreamAnalyticsJobs", "DataLakeStorage", "Databricks"],
+    ["FunctionApp", "CosmosDB", "APIManagement"],
+]
+
+RECORDED_DESCRIPTIONS = [
+    "Web application with an application gateway, app service and SQL database",
+    "Microservices on AKS with a container registry, key vault and blob storage",
+    "IoT telemetry pipeline with event hubs, stream analytics and a data lake",
+    "Serverless API with API management, function apps and Cosmos DB",
+]
+
+
+def build_call(kind: str, rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    """HTTP path and JSON body for one call of the given kind"""
+    if kind == "tools_list":
+        return "/mcp/tools/list", {}
+    if kind == "validate_azure_components":
+        arguments = {"component_names": rng.choice(RECORDED_COMPONENTS)}
+    elif kind == "suggest_diagram_structure":
+        arguments = {"description": rng.choice(RECORDED_DESCRIPTIONS), "provider_preference": "azure"}
+    elif kind == "generate_diagram":
+        arguments = {"code": rng.choice(RECORDED_DIAGRAMS), "format": "png"}
+    else:
+        raise ValueError(f"Unknown call kind '{kind}'")
+    return "/mcp/tools/call", {"name": kind, "arguments": arguments}
+
+
+def build_render_items(count: int, offset: int = 0) -> List[Dict[str, Any]]:
+    """Distinct diagrams for throughput runs; unique titles keep the render cache out of the measurement"""
+    items = []
+    for index in range(offset, offset + count):
+        code = RECORDED_DIAGRAMS[index % len(RECORDED_DIAGRAMS)]
+        title = code.split('Diagram("', 1)[1].split('"', 1)[0]
+        items.append({"id": str(index), "code": code.replace(f'Diagram("{title}"', f'Diagram("{title} #{index}"', 1)})
+    return items
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse 'kind=weight,kind=weight' into a dict"""
+    mix = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if "=" not in entry:
+            raise ValueError(f"Invalid mix entry '{entry}', expected kind=weight")
+        kind, weight = (part.strip() for part in entry.split("=", 1))
+        mix[kind] = float(weight)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Any]:
+    values = sorted(latencies)
+    summary = {"count": len(values)}
+    if values:
+        summary.update({
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+        })
+    return summary
+
+
+def _process_tree(root_pid: int) -> List[int]:
+    """PIDs of root_pid and all of its descendants, read from /proc"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; ppid follows the closing paren
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class ResourceSampler:
+    """Tracks peak RSS and process count of a process tree while a run is active"""
+
+    def __init__(self, root_pid: Optional[int], interval: float = 0.1):
+        self.root_pid = root_pid
+        self.interval = interval
+        self.peak_rss_bytes = 0
+        self.peak_processes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self):
+        if not self.root_pid or not os.path.isdir("/proc"):
+            return
+        pids = _process_tree(self.root_pid)
+        self.peak_processes = max(self.peak_processes, len(pids))
+        self.peak_rss_bytes = max(self.peak_rss_bytes, sum(_rss_bytes(pid) for pid in pids))
+
+    async def _run(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.sample()
+
+    def report(self) -> Dict[str, Any]:
+        if not self.root_pid:
+            return {"peak_rss_mb": None, "peak_processes": None}
+        return {
+            "peak_rss_mb": round(self.peak_rss_bytes / (1024 * 1024), 1),
+            "peak_processes": self.peak_processes,
+        }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_wrapper(mode: str, extra_env: Dict[str, str],
+                        startup_timeout: float) -> Tuple[subprocess.Popen, str]:
+    """Start the wrapper for a transport mode and wait until /health answers"""
+    port = _free_port()
+    env = {**os.environ, **TRANSPORT_MODES[mode], **extra_env,
+           "MCP_HTTP_HOST": "127.0.0.1", "MCP_HTTP_PORT": str(port)}
+    process = subprocess.Popen(
+        [sys.executable, str(WRAPPER_PATH)],
+        cwd=str(BASE_DIR),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + startup_timeout
+    async with httpx.AsyncClient(timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Wrapper exited during startup (code {process.returncode})")
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return process, base_url
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    stop_wrapper(process)
+    raise RuntimeError(f"Wrapper did not become healthy within {startup_timeout}s")
+
+
+def stop_wrapper(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def drive(base_url: str, mix: Dict[str, float], concurrency: int, total_requests: int,
+                timeout: float, seed: int) -> Dict[str, Any]:
+    """Issue total_requests calls from `concurrency` workers and collect per-call results"""
+    rng = random.Random(seed)
+    kinds = list(mix)
+    schedule = rng.choices(kinds, weights=[mix[k] for k in kinds], k=total_requests)
+    calls = [(kind, *build_call(kind, rng)) for kind in schedule]
+
+    results: List[Tuple[str, float, bool, int]] = []  # (kind, seconds, ok, status)
+    next_index = 0
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal next_index
+        while next_index < len(calls):
+            kind, path, body = calls[next_index]
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                status = response.status_code
+                ok = status == 200 and response.json().get("success", False)
+            except httpx.HTTPError:
+                status, ok = 0, False
+            results.append((kind, time.perf_counter() - started, ok, status))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    status_codes: Dict[str, int] = {}
+    for _, _, _, status in results:
+        status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, _, ok, _ in results if not ok),
+        "status_codes": status_codes,
+        "duration_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else None,
+        "latency": latency_summary([seconds for _, seconds, _, _ in results]),
+        "by_call": {
+            kind: latency_summary([seconds for k, seconds, _, _ in results if k == kind])
+            for kind in kinds
+        },
+    }
+
+
+async def drive_batch(base_url: str, items: List[Dict[str, Any]], batch_size: int, concurrency: int,
+                      timeout: float) -> Dict[str, Any]:
+    """Render every item, one generate_diagram call each (batch_size 1) or batch_render_diagrams calls"""
+    if batch_size <= 1:
+        calls = [{"name": "generate_diagram", "arguments": {"code": item["code"], "format": "png"}} for item in items]
+    else:
+        calls = [
+            {"name": "batch_render_diagrams", "arguments": {"items": items[i:i + batch_size], "format": "png"}}
+            for i in range(0, len(items), batch_size)
+        ]
+
+    latencies: List[float] = []
+    failed_items = 0
+    next_index = 0
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal next_index, failed_items
+        while next_index < len(calls):
+            call = calls[next_index]
+            next_index += 1
+            size = len(call["arguments"].get("items", [None]))
+            started = time.perf_counter()
+            try:
+                response = await client.post("/mcp/tools/call", json=call)
+                payload = json.loads(response.json()["result"]["result"]["content"][0]["text"])
+                if call["name"] == "batch_render_diagrams":
+                    failed_items += payload.get("failed", size) if payload.get("success") else size
+                elif not payload.get("success"):
+                    failed_items += 1
+            except (httpx.HTTPError, KeyError, IndexError, TypeError, ValueError):
+                failed_items += size
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "batch_size": batch_size,
+        "diagrams": len(items),
+        "calls": len(calls),
+        "failed_diagrams": failed_items,
+        "duration_seconds": round(elapsed, 3),
+        "diagrams_per_second": round(len(items) / elapsed, 2) if elapsed else None,
+        "call_latency": latency_summary(latencies),
+    }
+
+
+async def benchmark_mode(mode: Optional[str], args, mix: Dict[str, float]) -> Dict[str, Any]:
+    """Benchmark one transport mode, or an already running wrapper when mode is None"""
+    process = None
+    base_url = args.url
+    if mode:
+        extra_env = {} if args.keep_cache else dict(NO_CACHE_ENV)
+        process, base_url = await start_wrapper(mode, extra_env, args.startup_timeout)
+
+    try:
+        if args.warmup:
+            await drive(base_url, mix, args.concurrency, args.warmup, args.timeout, args.seed + 1)
+
+        sampler = ResourceSampler(process.pid if process else args.pid)
+        sampler.start()
+        try:
+            report = await drive(base_url, mix, args.concurrency, args.requests, args.timeout, args.seed)
+        finally:
+            await sampler.stop()
+        report.update(sampler.report())
+
+        if args.batch_sizes:
+            report["render_throughput"] = []
+            for batch_size in (int(size) for size in args.batch_sizes.split(",") if size.strip()):
+                # Fresh titles per run so no run is served from an earlier run's renders
+                items = build_render_items(args.batch_items, offset=batch_size * args.batch_items)
+                report["render_throughput"].append(
+                    await drive_batch(base_url, items, batch_size, args.concurrency, args.timeout)
+                )
+        return report
+    finally:
+        if process:
+            stop_wrapper(process)
+
+
+async def run(args) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    config = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "mix": mix,
+        "seed": args.seed,
+        "cache_enabled": args.keep_cache or bool(args.url),
+        "batch_sizes": args.batch_sizes,
+        "batch_items": args.batch_items,
+    }
+
+    if args.url:
+        return {"config": config, "modes": {"external": await benchmark_mode(None, args, mix)}}
+
+    modes = {}
+    for mode in (m.strip() for m in args.modes.split(",") if m.strip()):
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {', '.join(TRANSPORT_MODES)}")
+        print(f"Benchmarking {mode}...", file=sys.stderr)
+        modes[mode] = await benchmark_mode(mode, args, mix)
+    return {"config": config, "modes": modes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MCP HTTP wrapper")
+    parser.add_argument("--modes", default="spawn,pool,inprocess",
+                        help="Comma separated transport modes to start and compare")
+    parser.add_argument("--url", help="Benchmark an already running wrapper instead of starting one")
+    parser.add_argument("--pid", type=int, help="Wrapper PID to sample RSS from when using --url")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured calls before each run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted call mix, kind=weight,...")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request HTTP timeout")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-sizes", default="",
+                        help="Comma separated batch sizes for the render throughput run (1 = one call per diagram)")
+    parser.add_argument("--batch-items", type=int, default=200, help="Diagrams rendered per throughput run")
+    parser.add_argument("--keep-cache", action="store_true",
+                        help="Leave call coalescing and the result cache enabled")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Bulk Catalog Lint
+Re-validates a corpus of diagram programs (a directory of .py files or an
+NDJSON file of {"id", "code"} records) against the Azure component catalog.
+Each program is parsed once and only its `from diagrams.azure.* import ...`
+statements are looked at. Imported names are deduplicated across the corpus
+and every unknown name is scored against all catalog names at once:
+character-trigram count matrices with NumPy and cosine similarity. Parsing
+and scoring fan out over a process pool. The result is a per-file report
+plus a table of the most frequent mistakes.
+
+Usage:
+    python catalog_lint.py generated_diagrams/ --workers 8 --top 20
+    python catalog_lint.py history.ndjson --output lint.json
+"""
+
+import ast
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Programs parsed per worker task; small enough to balance, large enough to amortize pickling
+PARSE_CHUNK = 200
+# Distinct unknown names scored per worker task
+SCORE_CHUNK = 2000
+
+AZURE_PREFIX = "diagrams.azure."
+
+
+def read_corpus(source: str, root: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], Optional[str], Optional[str]]]:
+    """(id, path, code, error) per program; directory entries carry a path, NDJSON records carry code.
+
+    With root, files that resolve outside it (through symlinks) are skipped.
+    """
+    path = Path(source)
+    if path.is_dir():
+        for file in sorted(path.rglob("*.py")):
+            if root and os.path.commonpath([root, os.path.realpath(file)]) != root:
+                continue
+            yield str(file.relative_to(path)), str(file), None, None
+        return
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield f"line {number}", None, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                record = {}
+            yield _program(record, f"line {number}")
+
+
+def _program(record: Dict[str, Any], default_id: str) -> Tuple[str, None, Optional[str], Optional[str]]:
+    code = record.get("code", record.get("diagram_code"))
+    source_id = str(record.get("id", default_id))
+    if not isinstance(code, str):
+        return source_id, None, None, "Record has no code"
+    return source_id, None, code, None
+
+
+def extract_azure_imports(code: str) -> List[Tuple[int, str, str]]:
+    """(line, submodule, name) for every name imported from diagrams.azure.<submodule>; raises SyntaxError"""
+    imports = []
+    for node in ast.walk(ast.parse(code)):
+        if isinstance(node, ast.ImportFrom) and (node.module or "").startswith(AZURE_PREFIX):
+            submodule = node.module[len(AZURE_PREFIX):]
+            imports.extend((node.lineno, submodule, alias.name) for alias in node.names)
+    return imports
+
+
+def _parse_chunk(items: List[Tuple[str, Optional[str], Optional[str], Optional[str]]]) -> List[Tuple[str, List, Optional[str]]]:
+    results = []
+    for source_id, path, code, error in items:
+        if error:
+            results.append((source_id, [], error))
+            continue
+        try:
+            if path is not None:
+                code = Path(path).read_text(encoding="utf-8")
+            results.append((source_id, extract_azure_imports(code), None))
+        except SyntaxError as e:
+            results.append((source_id, [], f"SyntaxError: {e.msg} (line {e.lineno})"))
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            results.append((source_id, [], str(e)))
+    return results
+
+
+def _trigrams(name: str) -> List[str]:
+    padded = f"^{name.lower()}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class NgramScorer:
+    """Trigram count matrix over the catalog's canonical names, L2-normalized per row"""
+
+    def __init__(self, names: Tuple[str, ...]):
+        import numpy as np
+
+        self.names = names
+        self.vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, name in enumerate(names):
+            for gram in _trigrams(name):
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(gram, len(self.vocabulary)))
+        matrix = np.zeros((len(names), len(self.vocabulary)), dtype=np.float32)
+        np.add.at(matrix, (rows, cols), 1.0)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix
+
+    def score(self, queries: List[str], threshold: float, limit: int) -> Dict[str, List[Tuple[str, float]]]:
+        """Up to `limit` (name, cosine) pairs at or above threshold per query, best first"""
+        import numpy as np
+
+        if not queries:
+            return {}
+        rows, cols = [], []
+        norms = np.zeros(len(queries), dtype=np.float32)
+        for row, query in enumerate(queries):
+            grams = Counter(_trigrams(query))
+            # Trigrams no catalog name has still count toward the query's length
+            norms[row] = sum(count * count for count in grams.values()) ** 0.5
+            for gram, count in grams.items():
+                col = self.vocabulary.get(gram)
+                if col is not None:
+                    rows.extend([row] * count)
+                    cols.extend([col] * count)
+        counts = np.zeros((len(queries), len(self.vocabulary)), dtype=np.float32)
+        np.add.at(counts, (rows, cols), 1.0)
+
+        similarity = (counts @ self.matrix.T) / norms[:, None]
+        limit = min(limit, len(self.names))
+        top = np.argpartition(-similarity, limit - 1, axis=1)[:, :limit]
+        results = {}
+        for row, query in enumerate(queries):
+            ranked = sorted(top[row], key=lambda col: -similarity[row, col])
+            results[query] = [(self.names[col], round(float(similarity[row, col]), 3))
+                              for col in ranked if similarity[row, col] >= threshold]
+        return results
+
+
+def _score_chunk(args: Tuple[List[str], float, int]) -> Dict[str, List[Tuple[str, float]]]:
+    """Score in a worker; the catalog matrix is built once per catalog snapshot"""
+    from azure_catalog import get_azure_catalog
+    scorer = get_azure_catalog().derived("ngram_scorer", lambda catalog: NgramScorer(tuple(catalog.canonical_map)))
+    queries, threshold, limit = args
+    return scorer.score(queries, threshold, limit)
+
+
+def _chunks(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def lint_corpus(source: Optional[str] = None, programs: Optional[List[Dict[str, Any]]] = None,
+                workers: Optional[int] = None, threshold: float = 0.5, top: int = 20,
+                include_clean: bool = False, limit: int = 3, root: Optional[str] = None) -> Dict[str, Any]:
+    """Lint a directory or NDJSON file (source) or in-memory [{"id", "code"}] records (programs); see read_corpus for root"""
+    from component_matcher import get_component_matcher
+
+    started = time.perf_counter()
+    # The matcher and the catalog it was built from, one snapshot for the whole run
+    matcher = get_component_matcher()
+    catalog = matcher.catalog
+
+    if programs is not None:
+        items = [_program(p if isinstance(p, dict) else {}, str(i)) for i, p in enumerate(programs)]
+    else:
+        items = list(read_corpus(source, root))
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(items, PARSE_CHUNK)
+
+    pool = None
+    if workers > 1 and len(chunks) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=get_context("spawn"))
+    try:
+        parsed = [result for chunk in (pool.map(_parse_chunk, chunks) if pool else map(_parse_chunk, chunks))
+                  for result in chunk]
+
+        # Each distinct (submodule, name) is classified once however many files import it
+        pairs = Counter((submodule, name) for _, imports, _ in parsed for _, submodule, name in imports)
+        unknown = sorted({name for _, name in pairs if catalog.resolve(name) is None and not matcher.exact(name)})
+        jobs = [(chunk, threshold, limit) for chunk in _chunks(unknown, SCORE_CHUNK)]
+        scored: Dict[str, List[Tuple[str, float]]] = {}
+        for result in (pool.map(_score_chunk, jobs) if pool and len(jobs) > 1 else map(_score_chunk, jobs)):
+            scored.update(result)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    verdicts: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+    for submodule, name in pairs:
+        verdicts[(submodule, name)] = _classify(catalog, matcher, scored, submodule, name)
+
+    reports = []
+    mistakes: Counter = Counter()
+    mistake_files: Counter = Counter()
+    files_with_issues = parse_errors = 0
+    for source_id, imports, error in parsed:
+        issues = []
+        if error:
+            parse_errors += 1
+            issues.append({"kind": "parse_error", "error": error})
+        seen = set()
+        for line, submodule, name in imports:
+            verdict = verdicts[(submodule, name)]
+            if verdict:
+                issues.append({"line": line, **verdict})
+                mistakes[(submodule, name)] += 1
+                if (submodule, name) not in seen:
+                    seen.add((submodule, name))
+                    mistake_files[(submodule, name)] += 1
+        if issues:
+            files_with_issues += 1
+        if issues or include_clean:
+            reports.append({"file": source_id, "imports": len(imports), "issues": issues})
+
+    top_mistakes = [
+        {**verdicts[key], "count": count, "files": mistake_files[key]}
+        for key, count in mistakes.most_common(top)
+    ]
+    return {
+        "success": True,
+        "catalog_sha256": catalog.source_sha256,
+        "files": len(parsed),
+        "files_with_issues": files_with_issues,
+        "parse_errors": parse_errors,
+        "distinct_imports": len(pairs),
+        "distinct_unknown_names": len(unknown),
+        "threshold": threshold,
+        "workers": min(workers, len(chunks)) if pool else 1,
+        "seconds": round(time.perf_counter() - started, 3),
+        "top_mistakes": top_mistakes,
+        "reports": reports,
+    }
+
+
+def _classify(catalog, matcher, scored: Dict[str, List[Tuple[str, float]]],
+              submodule: str, name: str) -> Optional[Dict[str, Any]]:
+    """None for a correct import, else the issue with its suggested fix"""
+    issue = {"module": f"{AZURE_PREFIX}{submodule}", "name": name}
+    if submodule not in catalog.submodule_components:
+        issue["kind"] = "unknown_module"
+    comp = catalog.resolve(name)
+    if comp is not None:
+        if submodule in catalog.submodule_components and (
+                comp.submodule == submodule or comp.canonical in catalog.submodule_components[submodule]):
+            return None
+        issue.setdefault("kind", "wrong_module")
+        issue.update(suggestion=comp.canonical, suggested_module=comp.import_path, score=1.0)
+        return issue
+
+    issue.setdefault("kind", "unknown_name")
+    exact = matcher.exact(name)
+    if exact:
+        candidates = [(exact[0], 1.0)]
+    else:
+        candidates = scored.get(name, [])
+    if candidates:
+        best, score = candidates[0]
+        issue.update(suggestion=best, suggested_module=catalog.canonical_map[best].import_path, score=score,
+                     alternatives=[candidate for candidate, _ in candidates[1:]])
+    return issue
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lint a corpus of diagram programs against the Azure catalog")
+    parser.add_argument("source", help="Directory of .py programs or an NDJSON file of {\"id\", \"code\"} records")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (1 = in-process)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Lowest cosine similarity a suggestion needs")
+    parser.add_argument("--top", type=int, default=20, help="Rows in the most-frequent-mistakes table")
+    parser.add_argument("--include-clean", action="store_true", help="List files without issues too")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = lint_corpus(args.source, workers=args.workers, threshold=args.threshold, top=args.top,
+                         include_clean=args.include_clean)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
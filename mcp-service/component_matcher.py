@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Azure Component Matcher
+Ranked "did you mean" candidates for a component name that is not in the
+catalog. Exact lookups (case and "Azure" prefix ignored, aliases, known
+misspellings) score 1.0. Otherwise candidates come from a character-trigram
+inverted index plus the catalog's keyword index and are scored by edit
+distance (bit-parallel Levenshtein against per-name bitmasks prepared at build
+time), trigram overlap and shared words. Built once per catalog snapshot from
+the shared Azure catalog, so a reload brings its own matcher.
+"""
+
+import os
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from azure_catalog import AzureCatalog, get_azure_catalog
+
+# Service names models use that are not class names, by canonical name
+SERVICE_ALIASES = {
+    "ACR": ("ContainerRegistry", "AzureContainerRegistry"),
+    "ActiveDirectory": ("AzureAD", "AAD", "EntraID", "AzureActiveDirectory"),
+    "AKS": ("AzureKubernetesService", "Kubernetes", "KubernetesService", "KubernetesServices"),
+    "ApplicationInsights": ("AppInsights",),
+    "AppServices": ("WebApp", "WebApps", "AppService"),
+    "AzureOpenAI": ("OpenAI", "OpenAIService"),
+    "CacheForRedis": ("Redis", "RedisCache", "AzureCacheForRedis"),
+    "DatabaseForMysqlServers": ("MySQL", "MySQLServer", "AzureDatabaseForMySQL"),
+    "DatabaseForPostgresqlServers": ("PostgreSQL", "Postgres", "PostgreSQLServer", "AzureDatabaseForPostgreSQL"),
+    "ExpressrouteCircuits": ("ExpressRoute",),
+    "FunctionApps": ("Functions", "AzureFunctions", "FunctionApp"),
+    "NetworkSecurityGroupsClassic": ("NSG", "NetworkSecurityGroup", "NetworkSecurityGroups"),
+    "Search": ("CognitiveSearch", "AzureSearch", "AISearch"),
+    "SQLDatabases": ("AzureSQL", "SQLDatabase", "SqlDatabase"),
+    "VirtualNetworkGateways": ("VPNGateway", "VNetGateway"),
+    "VirtualNetworks": ("VNet", "VNets", "VirtualNetwork"),
+    "VM": ("VirtualMachine", "VirtualMachines"),
+    "VMSS": ("VMScaleSets", "VirtualMachineScaleSet", "VirtualMachineScaleSets"),
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+_WORDS = re.compile(r"[A-Z]+(?![a-z])|[A-Z][a-z]*|[a-z]+|[0-9]+")
+
+# Words too common in class names to say anything about a match
+STOP_WORDS = frozenset({"azure", "service", "services", "for", "and", "of", "the", "classic"})
+
+# Trigram candidates rescored with edit distance; the rest are too dissimilar to rank
+RESCORE_CANDIDATES = 16
+
+
+def normalize(name: str) -> str:
+    return _NON_ALNUM.sub("", name.lower())
+
+
+def _words(name: str) -> frozenset:
+    return frozenset(w.lower() for w in _WORDS.findall(name)) - STOP_WORDS
+
+
+def _trigrams(key: str) -> List[str]:
+    padded = f"^{key}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _edit_masks(key: str) -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(key):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def _levenshtein(masks: Dict[str, int], length: int, text: str) -> int:
+    """Edit distance between the indexed key (given by its masks) and text (Hyyro's bit-vector algorithm)"""
+    if not length:
+        return len(text)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    pv, mv, distance = full, 0, length
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            distance += 1
+        elif mh & last:
+            distance -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return distance
+
+
+class ComponentMatcher:
+    """Trigram, keyword and exact-name indexes over the catalog's canonical names"""
+
+    def __init__(self, catalog: AzureCatalog, threshold: float = 0.5, limit: int = 5):
+        self.catalog = catalog
+        self.threshold = threshold
+        self.limit = limit
+
+        self.names: Tuple[str, ...] = tuple(catalog.canonical_map)
+        self._keys = tuple(normalize(name) for name in self.names)
+        self._masks = tuple(_edit_masks(key) for key in self._keys)
+        self._grams = tuple(len(_trigrams(key)) for key in self._keys)
+        self._name_words = tuple(_words(name) for name in self.names)
+        ids = {name: i for i, name in enumerate(self.names)}
+
+        postings: Dict[str, List[int]] = {}
+        for i, key in enumerate(self._keys):
+            for gram in set(_trigrams(key)):
+                postings.setdefault(gram, []).append(i)
+        self._trigram_index: Dict[str, Tuple[int, ...]] = {gram: tuple(hits) for gram, hits in postings.items()}
+
+        self._word_index: Dict[str, Tuple[int, ...]] = {
+            word: tuple(sorted({ids[canonical] for _, canonical in hits if canonical in ids}))
+            for word, hits in catalog.keyword_map.items() if word not in STOP_WORDS
+        }
+
+        # Normalized spelling -> (name id, reason); later tables never override earlier ones
+        self._exact: Dict[str, Tuple[int, str]] = {}
+        for i, key in enumerate(self._keys):
+            self._exact.setdefault(key, (i, "same name, different case"))
+        for key_source, reason in ((catalog.alias_map, "alias"), (catalog.common_mistakes, "known misspelling")):
+            for spelling, canonical in key_source.items():
+                target = catalog.resolve(canonical)
+                if target is not None:
+                    self._exact.setdefault(normalize(spelling), (ids[target.canonical], reason))
+        for canonical, spellings in SERVICE_ALIASES.items():
+            if canonical in ids:
+                for spelling in spellings:
+                    self._exact.setdefault(normalize(spelling), (ids[canonical], "service name"))
+
+    def _exact_id(self, key: str) -> Optional[Tuple[int, str]]:
+        for variant in (key, key[len("azure"):] if key.startswith("azure") else None):
+            if variant and variant in self._exact:
+                return self._exact[variant]
+        return None
+
+    def exact(self, name: str) -> Optional[Tuple[str, str]]:
+        """(canonical name, reason) when name is a known spelling of exactly one component"""
+        found = self._exact_id(normalize(name))
+        return (self.names[found[0]], found[1]) if found else None
+
+    def match(self, name: str, threshold: Optional[float] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Candidates for name as [{"name", "submodule", "score", "reason"}], best first, scoring >= threshold"""
+        threshold = self.threshold if threshold is None else threshold
+        limit = self.limit if limit is None else limit
+        key = normalize(name)
+        if not key:
+            return []
+
+        scores: Dict[int, Tuple[float, str]] = {}
+        exact = self._exact_id(key)
+        if exact:
+            scores[exact[0]] = (1.0, exact[1])
+
+        # Names sharing the most trigrams, then every name sharing a word
+        query_grams = set(_trigrams(key))
+        shared: Dict[int, int] = {}
+        for gram in query_grams:
+            for i in self._trigram_index.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        candidates = sorted(shared, key=shared.get, reverse=True)[:RESCORE_CANDIDATES]
+        query_words = _words(name)
+        for word in query_words:
+            candidates.extend(self._word_index.get(word, ()))
+
+        for i in set(candidates):
+            if i in scores:
+                continue
+            length = len(self._keys[i])
+            longest = max(length, len(key))
+            dice = 2.0 * shared.get(i, 0) / (len(query_grams) + self._grams[i])
+            words = self._name_words[i]
+            overlap = len(query_words & words) / len(query_words | words) if query_words or words else 0.0
+            # The length difference bounds the edit distance from below; skip names that cannot reach the threshold
+            partial = 0.3 * dice + 0.2 * overlap
+            if partial + 0.5 * (1.0 - abs(length - len(key)) / longest) < threshold:
+                continue
+            edit = 1.0 - _levenshtein(self._masks[i], length, key) / longest
+            score = 0.5 * edit + partial
+            if score >= threshold:
+                reason = "similar spelling" if edit >= overlap else "shares words"
+                scores[i] = (round(score, 3), reason)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], self.names[item[0]]))[:limit]
+        return [
+            {
+                "name": self.names[i],
+                "submodule": self.catalog.canonical_map[self.names[i]].submodule,
+                "score": score,
+                "reason": reason,
+            }
+            for i, (score, reason) in ranked
+        ]
+
+
+def _build_matcher(catalog: AzureCatalog) -> ComponentMatcher:
+    return ComponentMatcher(
+        catalog,
+        threshold=float(os.getenv("MCP_MATCH_THRESHOLD", "0.5")),
+        limit=int(os.getenv("MCP_MATCH_LIMIT", "5"))
+    )
+
+
+def matcher_for(catalog: AzureCatalog) -> ComponentMatcher:
+    """The matcher of one catalog snapshot, built on first use"""
+    return catalog.derived("component_matcher", _build_matcher)
+
+
+def get_component_matcher() -> ComponentMatcher:
+    """Matcher over the current shared catalog; MCP_MATCH_THRESHOLD sets the minimum score"""
+    return matcher_for(get_azure_catalog())
@@ -0,0 +1,907 @@
+#!/usr/bin/env python3
+"""
+Diagrams Code to Graphviz DOT Compiler
+Builds the same graph the diagrams library would, by walking the code's AST
+instead of executing it. Node classes are resolved against a static index of
+the installed provider modules, so neither user code nor the diagrams runtime
+is ever imported or run. Code outside the supported subset raises
+UnsupportedDiagramCode and callers fall back to the sandboxed exec path.
+
+The compiled graph also carries a topology key (nodes, clusters, edges and the
+attributes that move them), so a layout computed for one compile can be pinned
+onto a later compile that only changed labels, icons or colours.
+"""
+
+import ast
+import hashlib
+import importlib.util
+import operator
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from graphviz import Digraph
+
+# Evaluation budgets; anything larger is left to the sandboxed exec path
+MAX_STEPS = 200_000
+MAX_NODES = 5_000
+MAX_RANGE = 10_000
+MAX_STRING = 100_000
+
+
+# Attributes that change how things are drawn but never where Graphviz places them
+_COSMETIC_ATTRS = frozenset({
+    "image", "imagescale", "color", "fillcolor", "fontcolor", "bgcolor", "pencolor",
+    "style", "penwidth", "tooltip", "URL", "href", "target", "id", "class",
+})
+# Fixed-size nodes are not resized to fit their label
+_FIXEDSIZE_COSMETIC_ATTRS = _COSMETIC_ATTRS | {"label", "fontname", "fontsize", "labelloc"}
+
+
+class UnsupportedDiagramCode(Exception):
+    """The code uses something the compiler does not model"""
+
+
+def _layout_attrs(attrs: Dict[str, Any], fixedsize: bool = False) -> Tuple[Tuple[str, str], ...]:
+    skip = _FIXEDSIZE_COSMETIC_ATTRS if fixedsize else _COSMETIC_ATTRS
+    return tuple(sorted((k, str(v)) for k, v in attrs.items() if k not in skip and v is not None))
+
+
+# ---------------------------------------------------------------------------
+# Static index of diagrams node classes
+# ---------------------------------------------------------------------------
+
+def _diagrams_package_dir() -> Optional[Path]:
+    # find_spec on a top-level package locates it without executing it
+    spec = importlib.util.find_spec("diagrams")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return Path(list(spec.submodule_search_locations)[0])
+
+
+def _class_attrs(tree: ast.Module) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """Class-level string attributes and base names per class, plus module-level aliases"""
+    classes, aliases = {}, {}
+    for stmt in tree.body:
+        if isinstance(stmt, ast.ClassDef):
+            attrs = {"__bases__": [b.id for b in stmt.bases if isinstance(b, ast.Name)]}
+            for item in stmt.body:
+                if (isinstance(item, ast.Assign) and len(item.targets) == 1
+                        and isinstance(item.targets[0], ast.Name)
+                        and isinstance(item.value, ast.Constant)):
+                    attrs[item.targets[0].id] = item.value.value
+            classes[stmt.name] = attrs
+        elif (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+              and isinstance(stmt.targets[0], ast.Name) and isinstance(stmt.value, ast.Name)):
+            aliases[stmt.targets[0].id] = stmt.value.id
+    return classes, aliases
+
+
+def _resolve_attr(name: str, attr: str, scopes: List[Dict[str, Dict[str, Any]]]) -> Any:
+    for scope in scopes:
+        cls = scope.get(name)
+        if cls is None:
+            continue
+        if attr in cls:
+            return cls[attr]
+        for base in cls["__bases__"]:
+            value = _resolve_attr(base, attr, scopes)
+            if value is not None:
+                return value
+        return None
+    return None
+
+
+def _top_level_names(tree: ast.Module) -> List[str]:
+    names = []
+    for stmt in tree.body:
+        if isinstance(stmt, (ast.ClassDef, ast.FunctionDef)):
+            names.append(stmt.name)
+        elif isinstance(stmt, ast.Assign):
+            names.extend(t.id for t in stmt.targets if isinstance(t, ast.Name))
+        elif isinstance(stmt, (ast.Import, ast.ImportFrom)):
+            names.extend((alias.asname or alias.name).split(".")[0] for alias in stmt.names)
+    return names
+
+
+@lru_cache(maxsize=1)
+def _scan_diagrams() -> Tuple[Dict[str, Dict[str, Dict[str, Any]]], Dict[str, Set[str]]]:
+    package_dir = _diagrams_package_dir()
+    index: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    exports: Dict[str, Set[str]] = {}
+    if package_dir is None:
+        return index, exports
+
+    exports["diagrams"] = set(_top_level_names(ast.parse((package_dir / "__init__.py").read_text())))
+    # Node._load_icon joins the icon dir onto the directory that contains the package
+    resources_root = package_dir.parent
+    for provider_dir in sorted(p for p in package_dir.iterdir() if (p / "__init__.py").exists()):
+        provider_init = ast.parse((provider_dir / "__init__.py").read_text())
+        provider_classes, _ = _class_attrs(provider_init)
+        module_files = [provider_dir / "__init__.py"] + sorted(
+            p for p in provider_dir.glob("*.py") if p.name != "__init__.py"
+        )
+        for module_file in module_files:
+            module_name = f"diagrams.{provider_dir.name}"
+            if module_file.name != "__init__.py":
+                module_name += f".{module_file.stem}"
+                tree = ast.parse(module_file.read_text())
+                classes, aliases = _class_attrs(tree)
+            else:
+                tree = provider_init
+                classes, aliases = provider_classes, {}
+            exports[module_name] = set(_top_level_names(tree))
+
+            scopes = [classes, provider_classes]
+            entries = {}
+            for class_name in classes:
+                if class_name.startswith("_"):
+                    continue
+                icon = _resolve_attr(class_name, "_icon", scopes)
+                icon_dir = _resolve_attr(class_name, "_icon_dir", scopes)
+                if not icon or not icon_dir:
+                    continue
+                entries[class_name] = {
+                    "class": class_name,
+                    "icon": os.path.join(resources_root, icon_dir, icon),
+                    "provider": _resolve_attr(class_name, "_provider", scopes),
+                    "type": _resolve_attr(class_name, "_type", scopes),
+                }
+            for alias, target in aliases.items():
+                if target in entries:
+                    entries[alias] = entries[target]
+            if entries:
+                index[module_name] = entries
+    return index, exports
+
+
+def load_node_index() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """{module: {class name or alias: {"class", "icon", "provider", "type"}}} parsed from the diagrams sources"""
+    return _scan_diagrams()[0]
+
+
+def check_diagrams_import(module: str, names: List[str]) -> Optional[str]:
+    """Error message the import would raise, checked against the diagrams sources without importing"""
+    exports = _scan_diagrams()[1]
+    if module not in exports:
+        return f"No module named '{module}'"
+    for name in names:
+        # A star import only needs the module to exist
+        if name == "*":
+            continue
+        if name not in exports[module] and f"{module}.{name}" not in exports:
+            return f"cannot import name '{name}' from '{module}'"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Graph model mirroring diagrams.Diagram / Cluster / Node / Edge
+# ---------------------------------------------------------------------------
+
+class _Diagram:
+    _default_graph_attrs = {
+        "pad": "2.0",
+        "splines": "ortho",
+        "nodesep": "0.60",
+        "ranksep": "0.75",
+        "fontname": "Sans-Serif",
+        "fontsize": "15",
+        "fontcolor": "#2D3436",
+    }
+    _default_node_attrs = {
+        "shape": "box",
+        "style": "rounded",
+        "fixedsize": "true",
+        "width": "1.4",
+        "height": "1.4",
+        "labelloc": "b",
+        "imagescale": "true",
+        "fontname": "Sans-Serif",
+        "fontsize": "13",
+        "fontcolor": "#2D3436",
+    }
+    _default_edge_attrs = {"color": "#7B8894"}
+    _directions = ("TB", "BT", "LR", "RL")
+    _curvestyles = ("ortho", "curved")
+    _outformats = ("png", "jpg", "svg", "pdf", "dot")
+
+    def __init__(self, name: str = "", filename: str = "", direction: str = "LR",
+                 curvestyle: str = "ortho", outformat: Any = "png", autolabel: bool = False,
+                 show: bool = True, strict: bool = False, graph_attr: Optional[dict] = None,
+                 node_attr: Optional[dict] = None, edge_attr: Optional[dict] = None):
+        self.name = name
+        if not name and not filename:
+            filename = "diagrams_image"
+        elif not filename:
+            filename = "_".join(self.name.split()).lower()
+        self.filename = filename
+        self.dot = Digraph(self.name, filename=self.filename, strict=strict)
+
+        for k, v in self._default_graph_attrs.items():
+            self.dot.graph_attr[k] = v
+        self.dot.graph_attr["label"] = self.name
+        for k, v in self._default_node_attrs.items():
+            self.dot.node_attr[k] = v
+        for k, v in self._default_edge_attrs.items():
+            self.dot.edge_attr[k] = v
+
+        if direction.upper() not in self._directions:
+            raise ValueError(f'"{direction}" is not a valid direction')
+        self.dot.graph_attr["rankdir"] = direction
+        if curvestyle.lower() not in self._curvestyles:
+            raise ValueError(f'"{curvestyle}" is not a valid curvestyle')
+        self.dot.graph_attr["splines"] = curvestyle
+        for one_format in (outformat if isinstance(outformat, list) else [outformat]):
+            if one_format.lower() not in self._outformats:
+                raise ValueError(f'"{one_format}" is not a valid output format')
+        self.outformat = outformat
+
+        self.dot.graph_attr.update(graph_attr or {})
+        self.dot.node_attr.update(node_attr or {})
+        self.dot.edge_attr.update(edge_attr or {})
+        self.autolabel = autolabel
+
+        # Positions to pin onto this graph, as parsed by layout_cache.parse_graphviz_json
+        self.layout: Optional[Dict[str, Any]] = None
+        self._topology: List[Tuple[Any, ...]] = []
+        self._edge_counts: Dict[Tuple[str, str], int] = {}
+
+    def node(self, nodeid: str, label: str, **attrs):
+        self.dot.node(nodeid, label=label, **self.track_node(nodeid, "", label, attrs))
+
+    def connect(self, node: "_Node", node2: "_Node", edge: "_Edge"):
+        attrs = edge.attrs
+        self._topology.append(("edge", node.nodeid, node2.nodeid, _layout_attrs(attrs)))
+        pair = (node.nodeid, node2.nodeid)
+        # Parallel edges are told apart by their order, as Graphviz lists them
+        occurrence = self._edge_counts.get(pair, 0)
+        self._edge_counts[pair] = occurrence + 1
+        if self.layout:
+            attrs = {**attrs, **self.layout["edges"].get((*pair, occurrence), {})}
+        self.dot.edge(node.nodeid, node2.nodeid, **attrs)
+
+    def subgraph(self, dot: Digraph):
+        self.dot.subgraph(dot)
+
+    def track_node(self, nodeid: str, container: str, label: str, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a node's layout-relevant attributes; returns attrs plus its pinned position"""
+        fixedsize = str(attrs.get("fixedsize", self.dot.node_attr.get("fixedsize", ""))).lower() == "true"
+        self._topology.append(("node", nodeid, container, _layout_attrs({"label": label, **attrs}, fixedsize)))
+        if self.layout and nodeid in self.layout["nodes"]:
+            return {**attrs, **self.layout["nodes"][nodeid]}
+        return attrs
+
+    def track_cluster(self, name: str, parent: str, dot: Digraph):
+        self._topology.append(("cluster", name, parent, _layout_attrs(dot.graph_attr)))
+        if self.layout and name in self.layout["clusters"]:
+            dot.graph_attr.update(self.layout["clusters"][name])
+
+    def topology_key(self) -> str:
+        """Hash of everything that decides where Graphviz puts nodes, clusters and edges"""
+        fixedsize = str(self.dot.node_attr.get("fixedsize", "")).lower() == "true"
+        signature = (
+            self.dot.strict,
+            _layout_attrs(self.dot.graph_attr),
+            _layout_attrs(self.dot.node_attr, fixedsize),
+            _layout_attrs(self.dot.edge_attr),
+            self._topology,
+        )
+        return hashlib.sha256(repr(signature).encode()).hexdigest()
+
+
+class _Cluster:
+    _default_graph_attrs = {
+        "shape": "box",
+        "style": "rounded",
+        "labeljust": "l",
+        "pencolor": "#AEB6BE",
+        "fontname": "Sans-Serif",
+        "fontsize": "12",
+    }
+    _bgcolors = ("#E5F5FD", "#EBF3E7", "#ECE8F6", "#FDF7E3")
+
+    def __init__(self, compiler: "DiagramCompiler", label: str = "cluster", direction: str = "LR",
+                 graph_attr: Optional[dict] = None):
+        self.label = label
+        self.name = "cluster_" + self.label
+        self.dot = Digraph(self.name)
+        for k, v in self._default_graph_attrs.items():
+            self.dot.graph_attr[k] = v
+        self.dot.graph_attr["label"] = self.label
+        if direction.upper() not in _Diagram._directions:
+            raise ValueError(f'"{direction}" is not a valid direction')
+        self.dot.graph_attr["rankdir"] = direction
+
+        self._diagram = compiler.diagram
+        self._parent = compiler.cluster
+        self.depth = self._parent.depth + 1 if self._parent else 0
+        self.dot.graph_attr["bgcolor"] = self._bgcolors[self.depth % len(self._bgcolors)]
+        self.dot.graph_attr.update(graph_attr or {})
+
+    def close(self):
+        self._diagram.track_cluster(self.name, self._parent.name if self._parent else "", self.dot)
+        (self._parent or self._diagram).subgraph(self.dot)
+
+    def node(self, nodeid: str, label: str, **attrs):
+        self.dot.node(nodeid, label=label, **self._diagram.track_node(nodeid, self.name, label, attrs))
+
+    def subgraph(self, dot: Digraph):
+        self.dot.subgraph(dot)
+
+
+class _Node:
+    _height = 1.9
+
+    def __init__(self, compiler: "DiagramCompiler", class_name: str, icon: Optional[str],
+                 label: str = "", nodeid: Optional[str] = None, **attrs):
+        if not isinstance(label, str):
+            raise UnsupportedDiagramCode("Node labels must be strings")
+        self._id = nodeid or compiler.next_node_id()
+        self.label = label
+        self._diagram = compiler.diagram
+        if self._diagram.autolabel:
+            self.label = class_name + "\n" + self.label if self.label else class_name
+
+        padding = 0.4 * (self.label.count("\n"))
+        self._attrs = {
+            "shape": "none",
+            "height": str(self._height + padding),
+            "image": icon,
+        } if icon else {}
+        self._attrs.update(attrs)
+
+        cluster = compiler.cluster
+        (cluster or self._diagram).node(self._id, self.label, **self._attrs)
+
+    @property
+    def nodeid(self) -> str:
+        return self._id
+
+    def connect(self, node: "_Node", edge: "_Edge"):
+        if not isinstance(node, _Node):
+            raise UnsupportedDiagramCode(f"Cannot connect to {type(node).__name__}")
+        self._diagram.connect(self, node, edge)
+        return node
+
+    def __sub__(self, other):
+        if isinstance(other, list):
+            for node in other:
+                self.connect(node, _Edge(self))
+            return other
+        elif isinstance(other, _Node):
+            return self.connect(other, _Edge(self))
+        other.node = self
+        return other
+
+    def __rsub__(self, other):
+        for o in other:
+            if isinstance(o, _Edge):
+                o.connect(self)
+            else:
+                o.connect(self, _Edge(self))
+        return self
+
+    def __rshift__(self, other):
+        if isinstance(other, list):
+            for node in other:
+                self.connect(node, _Edge(self, forward=True))
+            return other
+        elif isinstance(other, _Node):
+            return self.connect(other, _Edge(self, forward=True))
+        other.forward = True
+        other.node = self
+        return other
+
+    def __lshift__(self, other):
+        if isinstance(other, list):
+            for node in other:
+                self.connect(node, _Edge(self, reverse=True))
+            return other
+        elif isinstance(other, _Node):
+            return self.connect(other, _Edge(self, reverse=True))
+        other.reverse = True
+        return other.connect(self)
+
+    def __rrshift__(self, other):
+        for o in other:
+            if isinstance(o, _Edge):
+                o.forward = True
+                o.connect(self)
+            else:
+                o.connect(self, _Edge(self, forward=True))
+        return self
+
+    def __rlshift__(self, other):
+        for o in other:
+            if isinstance(o, _Edge):
+                o.reverse = True
+                o.connect(self)
+            else:
+                o.connect(self, _Edge(self, reverse=True))
+        return self
+
+
+class _Edge:
+    _default_edge_attrs = {
+        "fontcolor": "#2D3436",
+        "fontname": "Sans-Serif",
+        "fontsize": "13",
+    }
+
+    def __init__(self, node: Optional[_Node] = None, forward: bool = False, reverse: bool = False,
+                 label: str = "", color: str = "", style: str = "", **attrs):
+        if node is not None and not isinstance(node, _Node):
+            raise UnsupportedDiagramCode("Edge(node) must be a node")
+        self.node = node
+        self.forward = forward
+        self.reverse = reverse
+        self._attrs = dict(self._default_edge_attrs)
+        if label:
+            self._attrs["label"] = label
+        if color:
+            self._attrs["color"] = color
+        if style:
+            self._attrs["style"] = style
+        self._attrs.update(attrs)
+
+    def __sub__(self, other):
+        return self.connect(other)
+
+    def __rsub__(self, other):
+        return self.append(other)
+
+    def __rshift__(self, other):
+        self.forward = True
+        return self.connect(other)
+
+    def __lshift__(self, other):
+        self.reverse = True
+        return self.connect(other)
+
+    def __rrshift__(self, other):
+        return self.append(other, forward=True)
+
+    def __rlshift__(self, other):
+        return self.append(other, reverse=True)
+
+    def append(self, other, forward=None, reverse=None):
+        result = []
+        for o in other:
+            if isinstance(o, _Edge):
+                o.forward = forward if forward else o.forward
+                o.reverse = reverse if reverse else o.reverse
+                self._attrs = o.attrs.copy()
+                result.append(o)
+            else:
+                result.append(_Edge(o, forward=forward, reverse=reverse, **self._attrs))
+        return result
+
+    def connect(self, other):
+        if isinstance(other, list):
+            if self.node is None:
+                raise UnsupportedDiagramCode("Edge has no source node")
+            for node in other:
+                self.node.connect(node, self)
+            return other
+        elif isinstance(other, _Edge):
+            self._attrs = other._attrs.copy()
+            return self
+        if self.node is not None:
+            return self.node.connect(other, self)
+        self.node = other
+        return self
+
+    @property
+    def attrs(self) -> Dict[str, Any]:
+        if self.forward and self.reverse:
+            direction = "both"
+        elif self.forward:
+            direction = "forward"
+        elif self.reverse:
+            direction = "back"
+        else:
+            direction = "none"
+        return {**self._attrs, "dir": direction}
+
+
+# ---------------------------------------------------------------------------
+# AST evaluation
+# ---------------------------------------------------------------------------
+
+class _NodeClass:
+    def __init__(self, name: str, icon: Optional[str], custom: bool = False):
+        self.name = name
+        self.icon = icon
+        self.custom = custom
+
+
+class _Module:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class _Builtin:
+    def __init__(self, name: str):
+        self.name = name
+
+
+_DIAGRAM, _CLUSTER, _EDGE = object(), object(), object()
+_BUILTINS = {name: _Builtin(name) for name in ("range", "enumerate", "len", "str")}
+_DIAGRAMS_EXPORTS = {"Diagram": _DIAGRAM, "Cluster": _CLUSTER, "Group": _CLUSTER, "Edge": _EDGE}
+
+_BIN_OPS = {
+    ast.RShift: operator.rshift,
+    ast.LShift: operator.lshift,
+    ast.Sub: operator.sub,
+    ast.Add: operator.add,
+    ast.Mult: operator.mul,
+    ast.Mod: operator.mod,
+}
+_COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+    ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+class DiagramCompiler:
+    """Evaluates the supported subset of diagrams code into a Graphviz Digraph"""
+
+    def __init__(self, node_index: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+                 layout: Optional[Dict[str, Any]] = None):
+        self.node_index = load_node_index() if node_index is None else node_index
+        self.layout = layout
+        self.diagram: Optional[_Diagram] = None
+        self.cluster: Optional[_Cluster] = None
+        self.env: Dict[str, Any] = {"__name__": "__main__"}
+        self._steps = 0
+        self._nodes = 0
+        self._finished: Optional[_Diagram] = None
+
+    def next_node_id(self) -> str:
+        self._nodes += 1
+        if self._nodes > MAX_NODES:
+            raise UnsupportedDiagramCode(f"More than {MAX_NODES} nodes")
+        # Deterministic ids keep the DOT (and anything keyed on it) stable across compiles
+        return f"n{self._nodes}"
+
+    def compile(self, code: str) -> _Diagram:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            raise UnsupportedDiagramCode(f"Syntax error: {e}")
+        self._exec_body(tree.body)
+        if self._finished is None:
+            raise UnsupportedDiagramCode("No 'with Diagram(...)' block found")
+        return self._finished
+
+    # Statements
+
+    def _exec_body(self, body: List[ast.stmt]):
+        for stmt in body:
+            self._exec(stmt)
+
+    def _exec(self, stmt: ast.stmt):
+        self._tick()
+        if isinstance(stmt, ast.ImportFrom):
+            self._import_from(stmt)
+        elif isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                if alias.name != "diagrams" and not alias.name.startswith("diagrams."):
+                    raise UnsupportedDiagramCode(f"Import of '{alias.name}'")
+                if alias.asname:
+                    self.env[alias.asname] = self._module(alias.name)
+                else:
+                    self.env[alias.name.split(".")[0]] = _Module("diagrams")
+        elif isinstance(stmt, ast.Assign):
+            value = self._eval(stmt.value)
+            for target in stmt.targets:
+                self._assign(target, value)
+        elif isinstance(stmt, ast.Expr):
+            self._eval(stmt.value)
+        elif isinstance(stmt, ast.With):
+            self._with(stmt)
+        elif isinstance(stmt, ast.For):
+            if stmt.orelse:
+                raise UnsupportedDiagramCode("for/else")
+            for item in self._iterable(stmt.iter):
+                self._assign(stmt.target, item)
+                self._exec_body(stmt.body)
+        elif isinstance(stmt, ast.If):
+            self._exec_body(stmt.body if self._eval(stmt.test) else stmt.orelse)
+        elif isinstance(stmt, ast.Pass):
+            pass
+        else:
+            raise UnsupportedDiagramCode(f"'{type(stmt).__name__}' statement")
+
+    def _import_from(self, stmt: ast.ImportFrom):
+        module = stmt.module or ""
+        if stmt.level or not (module == "diagrams" or module.startswith("diagrams.")):
+            raise UnsupportedDiagramCode(f"Import from '{module}'")
+        for alias in stmt.names:
+            name = alias.asname or alias.name
+            if alias.name == "*":
+                raise UnsupportedDiagramCode("Wildcard import")
+            if module == "diagrams" and alias.name in _DIAGRAMS_EXPORTS:
+                self.env[name] = _DIAGRAMS_EXPORTS[alias.name]
+            elif module == "diagrams.custom" and alias.name == "Custom":
+                self.env[name] = _NodeClass("Custom", None, custom=True)
+            elif f"{module}.{alias.name}" in self.node_index:
+                self.env[name] = _Module(f"{module}.{alias.name}")
+            else:
+                self.env[name] = self._node_class(module, alias.name)
+
+    def _module(self, name: str) -> _Module:
+        if name != "diagrams" and name not in self.node_index and not any(
+                m.startswith(name + ".") for m in self.node_index):
+            raise UnsupportedDiagramCode(f"Unknown module '{name}'")
+        return _Module(name)
+
+    def _node_class(self, module: str, name: str) -> _NodeClass:
+        entry = self.node_index.get(module, {}).get(name)
+        if entry is None:
+            raise UnsupportedDiagramCode(f"Unknown node class '{module}.{name}'")
+        # Aliases (e.g. AKS) label nodes with the class they point to, as the runtime does
+        return _NodeClass(entry["class"], entry["icon"])
+
+    def _with(self, stmt: ast.With):
+        if len(stmt.items) != 1:
+            raise UnsupportedDiagramCode("'with' with several context managers")
+        item = stmt.items[0]
+        call = item.context_expr
+        if not isinstance(call, ast.Call):
+            raise UnsupportedDiagramCode("'with' on something other than Diagram/Cluster")
+        kind = self._eval(call.func)
+        args, kwargs = self._call_args(call)
+
+        if kind is _DIAGRAM:
+            if self.diagram is not None or self._finished is not None:
+                raise UnsupportedDiagramCode("More than one Diagram")
+            context = self.diagram = _Diagram(*args, **kwargs)
+            context.layout = self.layout
+        elif kind is _CLUSTER:
+            if self.diagram is None:
+                raise UnsupportedDiagramCode("Cluster outside a Diagram")
+            context = _Cluster(self, *args, **kwargs)
+            parent, self.cluster = self.cluster, context
+        else:
+            raise UnsupportedDiagramCode("'with' on something other than Diagram/Cluster")
+
+        if item.optional_vars is not None:
+            self._assign(item.optional_vars, context)
+        self._exec_body(stmt.body)
+
+        if kind is _DIAGRAM:
+            self._finished, self.diagram = self.diagram, None
+        else:
+            context.close()
+            self.cluster = parent
+
+    def _assign(self, target: ast.expr, value: Any):
+        if isinstance(target, ast.Name):
+            self.env[target.id] = value
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            values = list(value)
+            if len(values) != len(target.elts):
+                raise UnsupportedDiagramCode("Unpacking length mismatch")
+            for element, item in zip(target.elts, values):
+                self._assign(element, item)
+        else:
+            raise UnsupportedDiagramCode(f"Assignment to '{type(target).__name__}'")
+
+    # Expressions
+
+    def _tick(self):
+        self._steps += 1
+        if self._steps > MAX_STEPS:
+            raise UnsupportedDiagramCode("Evaluation budget exceeded")
+
+    def _eval(self, node: ast.expr) -> Any:
+        self._tick()
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id in self.env:
+                return self.env[node.id]
+            if node.id in _BUILTINS:
+                return _BUILTINS[node.id]
+            raise UnsupportedDiagramCode(f"Unknown name '{node.id}'")
+        if isinstance(node, ast.JoinedStr):
+            return self._check_string("".join(self._format(value) for value in node.values))
+        if isinstance(node, (ast.List, ast.Tuple)):
+            values = [self._eval(element) for element in node.elts]
+            return values if isinstance(node, ast.List) else tuple(values)
+        if isinstance(node, ast.Dict):
+            if any(key is None for key in node.keys):
+                raise UnsupportedDiagramCode("Dict unpacking")
+            return {self._eval(k): self._eval(v) for k, v in zip(node.keys, node.values)}
+        if isinstance(node, ast.Attribute):
+            return self._attribute(node)
+        if isinstance(node, ast.Subscript):
+            container = self._eval(node.value)
+            index = self._eval(node.slice)
+            if not isinstance(container, (list, tuple, dict)) or not isinstance(index, (int, str)):
+                raise UnsupportedDiagramCode("Unsupported subscript")
+            return container[index]
+        if isinstance(node, ast.BinOp):
+            return self._binop(node)
+        if isinstance(node, ast.UnaryOp):
+            operand = self._eval(node.operand)
+            if isinstance(node.op, ast.USub) and isinstance(operand, (int, float)):
+                return -operand
+            if isinstance(node.op, ast.Not):
+                return not operand
+            raise UnsupportedDiagramCode("Unsupported unary operator")
+        if isinstance(node, ast.Compare):
+            left = self._eval(node.left)
+            for op, comparator in zip(node.ops, node.comparators):
+                right = self._eval(comparator)
+                if type(op) not in _COMPARE_OPS or not isinstance(left, _PRIMITIVES) \
+                        or not isinstance(right, _PRIMITIVES):
+                    raise UnsupportedDiagramCode("Unsupported comparison")
+                if not _COMPARE_OPS[type(op)](left, right):
+                    return False
+                left = right
+            return True
+        if isinstance(node, ast.ListComp):
+            return self._list_comp(node)
+        if isinstance(node, ast.Call):
+            return self._call(node)
+        raise UnsupportedDiagramCode(f"'{type(node).__name__}' expression")
+
+    def _format(self, value: ast.expr) -> str:
+        if isinstance(value, ast.Constant):
+            return str(value.value)
+        if not isinstance(value, ast.FormattedValue):
+            raise UnsupportedDiagramCode("Unsupported f-string part")
+        result = self._eval(value.value)
+        if not isinstance(result, _PRIMITIVES):
+            raise UnsupportedDiagramCode("f-string of a non-primitive value")
+        if value.conversion == ord("r"):
+            result = repr(result)
+        elif value.conversion == ord("s"):
+            result = str(result)
+        spec = self._eval(value.format_spec) if value.format_spec else ""
+        return format(result, spec)
+
+    def _check_string(self, value: Any) -> Any:
+        if isinstance(value, (str, list)) and len(value) > MAX_STRING:
+            raise UnsupportedDiagramCode("Value too large")
+        return value
+
+    def _attribute(self, node: ast.Attribute) -> Any:
+        base = self._eval(node.value)
+        if not isinstance(base, _Module):
+            raise UnsupportedDiagramCode(f"Attribute '{node.attr}' of a non-module")
+        if base.name == "diagrams" and node.attr in _DIAGRAMS_EXPORTS:
+            return _DIAGRAMS_EXPORTS[node.attr]
+        qualified = f"{base.name}.{node.attr}"
+        if qualified == "diagrams.custom.Custom":
+            return _NodeClass("Custom", None, custom=True)
+        if qualified in self.node_index or any(m.startswith(qualified + ".") for m in self.node_index) \
+                or qualified == "diagrams.custom":
+            return _Module(qualified)
+        return self._node_class(base.name, node.attr)
+
+    def _binop(self, node: ast.BinOp) -> Any:
+        left = self._eval(node.left)
+        right = self._eval(node.right)
+        op = _BIN_OPS.get(type(node.op))
+        if op is None:
+            raise UnsupportedDiagramCode(f"'{type(node.op).__name__}' operator")
+
+        graph_operands = any(isinstance(v, (_Node, _Edge, list)) for v in (left, right))
+        if isinstance(node.op, (ast.RShift, ast.LShift, ast.Sub)) and graph_operands:
+            if not any(isinstance(v, (_Node, _Edge)) for v in (left, right)):
+                raise UnsupportedDiagramCode("Connection between two lists")
+            return op(left, right)
+        if isinstance(node.op, ast.Mult) and (isinstance(left, (str, list)) or isinstance(right, (str, list))):
+            count = right if isinstance(left, (str, list)) else left
+            size = len(left if isinstance(left, (str, list)) else right)
+            if not isinstance(count, int) or count * size > MAX_STRING:
+                raise UnsupportedDiagramCode("Value too large")
+        if not all(isinstance(v, _PRIMITIVES + (list,)) for v in (left, right)):
+            raise UnsupportedDiagramCode("Arithmetic on graph objects")
+        return self._check_string(op(left, right))
+
+    def _iterable(self, node: ast.expr) -> List[Any]:
+        value = self._eval(node)
+        if isinstance(value, (list, tuple, str)):
+            return list(value)
+        raise UnsupportedDiagramCode("Iteration over an unsupported value")
+
+    def _list_comp(self, node: ast.ListComp) -> List[Any]:
+        saved = dict(self.env)
+        result = []
+
+        def generate(generators):
+            if not generators:
+                result.append(self._eval(node.elt))
+                return
+            generator = generators[0]
+            if generator.is_async:
+                raise UnsupportedDiagramCode("Async comprehension")
+            for item in self._iterable(generator.iter):
+                self._assign(generator.target, item)
+                if all(self._eval(condition) for condition in generator.ifs):
+                    generate(generators[1:])
+
+        try:
+            generate(node.generators)
+        finally:
+            self.env = saved
+        return result
+
+    def _call_args(self, call: ast.Call) -> Tuple[List[Any], Dict[str, Any]]:
+        args = []
+        for arg in call.args:
+            if isinstance(arg, ast.Starred):
+                raise UnsupportedDiagramCode("Star arguments")
+            args.append(self._eval(arg))
+        kwargs = {}
+        for keyword in call.keywords:
+            if keyword.arg is None:
+                raise UnsupportedDiagramCode("**kwargs")
+            kwargs[keyword.arg] = self._eval(keyword.value)
+        return args, kwargs
+
+    def _call(self, call: ast.Call) -> Any:
+        func = self._eval(call.func)
+        args, kwargs = self._call_args(call)
+
+        if isinstance(func, _NodeClass):
+            if self.diagram is None:
+                raise UnsupportedDiagramCode("Node outside a Diagram")
+            if func.custom:
+                if len(args) < 2 and "icon_path" not in kwargs:
+                    raise UnsupportedDiagramCode("Custom() without an icon path")
+                label = args[0] if args else kwargs.pop("label", "")
+                icon = args[1] if len(args) > 1 else kwargs.pop("icon_path")
+                return _Node(self, "Custom", icon, label, **kwargs)
+            if len(args) > 1:
+                raise UnsupportedDiagramCode("Node with several positional arguments")
+            return _Node(self, func.name, func.icon, *args, **kwargs)
+        if func is _EDGE:
+            return _Edge(*args, **kwargs)
+        if not isinstance(func, _Builtin):
+            raise UnsupportedDiagramCode("Unsupported call")
+        if func.name == "range":
+            if not all(isinstance(a, int) for a in args):
+                raise UnsupportedDiagramCode("range() of non-integers")
+            values = range(*args)
+            if len(values) > MAX_RANGE:
+                raise UnsupportedDiagramCode("range() too large")
+            return list(values)
+        if func.name == "enumerate":
+            return list(enumerate(*args))
+        if func.name == "len":
+            return len(*args)
+        if not all(isinstance(a, _PRIMITIVES) for a in args):
+            raise UnsupportedDiagramCode("str() of a graph object")
+        return str(*args)
+
+
+def compile_diagram(code: str, layout: Optional[Dict[str, Any]] = None,
+                    compiler: Optional[DiagramCompiler] = None) -> _Diagram:
+    """Compiled graph for diagrams code, with `layout` positions pinned on when given.
+
+    Pass `compiler` to read its variables (compiler.env) after compiling.
+    """
+    compiler = compiler or DiagramCompiler(layout=layout)
+    try:
+        diagram = compiler.compile(code)
+    except UnsupportedDiagramCode:
+        raise
+    except Exception as e:
+        # Any evaluation error (ZeroDivisionError, RecursionError, ...) falls back to exec, which reports it
+        raise UnsupportedDiagramCode(f"{type(e).__name__}: {e}") from e
+    if layout:
+        diagram.dot.graph_attr.update(layout["graph"])
+    return diagram
+
+
+def compile_to_dot(code: str) -> str:
+    """DOT source for diagrams code, or UnsupportedDiagramCode if it needs the exec path"""
+    return compile_diagram(code).dot.source
+
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Diagram Template Library
+Architecture patterns written once as provider-neutral graph specs: nodes name a
+role ("db", "queue", ...) that is resolved to a node class per provider. Every
+(template, provider) base spec is rendered ahead of time, at startup or at image
+build time (`python diagram_templates.py --prerender`), which leaves its image in
+the render cache and its layout in the layout cache and a layouts file. A
+customization that only relabels or swaps node classes keeps the base topology
+and is redrawn on the pinned base layout; added or removed nodes are laid out
+once and cached like any other graph.
+"""
+
+import copy
+import json
+import os
+import tempfile
+from typing import Dict, Any, List, Optional, Tuple
+
+DEFAULT_PROVIDER = "azure"
+
+# Node class per provider for each role a template can use
+ROLE_CLASSES = {
+    "azure": {
+        "cdn": "azure.network.CDNProfiles",
+        "lb": "azure.network.LoadBalancers",
+        "web": "azure.web.AppServices",
+        "api": "azure.compute.AppServices",
+        "container": "azure.compute.KubernetesServices",
+        "gateway": "azure.integration.APIManagement",
+        "functions": "azure.compute.FunctionApps",
+        "queue": "azure.integration.ServiceBus",
+        "stream": "azure.analytics.EventHubs",
+        "db": "azure.database.SQLDatabases",
+        "nosql": "azure.database.CosmosDb",
+        "cache": "azure.database.CacheForRedis",
+        "storage": "azure.storage.StorageAccounts",
+        "etl": "azure.analytics.DataFactories",
+        "spark": "azure.analytics.Databricks",
+        "warehouse": "azure.analytics.SynapseAnalytics",
+        "monitoring": "azure.monitor.Monitor",
+        "identity": "azure.identity.ActiveDirectory",
+    },
+    "aws": {
+        "cdn": "aws.network.CloudFront",
+        "lb": "aws.network.ELB",
+        "web": "aws.compute.EC2",
+        "api": "aws.compute.EC2",
+        "container": "aws.compute.ECS",
+        "gateway": "aws.network.APIGateway",
+        "functions": "aws.compute.Lambda",
+        "queue": "aws.integration.SQS",
+        "stream": "aws.analytics.Kinesis",
+        "db": "aws.database.RDS",
+        "nosql": "aws.database.Dynamodb",
+        "cache": "aws.database.ElastiCache",
+        "storage": "aws.storage.S3",
+        "etl": "aws.analytics.Glue",
+        "spark": "aws.analytics.EMR",
+        "warehouse": "aws.analytics.Redshift",
+        "monitoring": "aws.management.Cloudwatch",
+        "identity": "aws.security.Cognito",
+    },
+    "gcp": {
+        "cdn": "gcp.network.CDN",
+        "lb": "gcp.network.LoadBalancing",
+        "web": "gcp.compute.AppEngine",
+        "api": "gcp.compute.Run",
+        "container": "gcp.compute.GKE",
+        "gateway": "gcp.api.APIGateway",
+        "functions": "gcp.compute.Functions",
+        "queue": "gcp.analytics.PubSub",
+        "stream": "gcp.analytics.PubSub",
+        "db": "gcp.database.SQL",
+        "nosql": "gcp.database.Firestore",
+        "cache": "gcp.database.Memorystore",
+        "storage": "gcp.storage.GCS",
+        "etl": "gcp.analytics.Dataflow",
+        "spark": "gcp.analytics.Dataproc",
+        "warehouse": "gcp.analytics.Bigquery",
+        "monitoring": "gcp.operations.Monitoring",
+        "identity": "gcp.security.Iam",
+    },
+}
+
+TEMPLATES = {
+    "3-tier-web": {
+        "description": "CDN and load balancer in front of a web tier, an application tier and a data tier",
+        "spec": {
+            "title": "Three-Tier Web Application",
+            "direction": "LR",
+            "clusters": [
+                {"id": "edge", "label": "Edge"},
+                {"id": "web", "label": "Web Tier"},
+                {"id": "app", "label": "Application Tier"},
+                {"id": "data", "label": "Data Tier"},
+            ],
+            "nodes": [
+                {"id": "cdn", "role": "cdn", "label": "CDN", "cluster": "edge"},
+                {"id": "lb", "role": "lb", "label": "Load Balancer", "cluster": "edge"},
+                {"id": "web1", "role": "web", "label": "Web 1", "cluster": "web"},
+                {"id": "web2", "role": "web", "label": "Web 2", "cluster": "web"},
+                {"id": "app", "role": "api", "label": "App Server", "cluster": "app"},
+                {"id": "cache", "role": "cache", "label": "Cache", "cluster": "data"},
+                {"id": "db", "role": "db", "label": "Database", "cluster": "data"},
+            ],
+            "edges": [
+                {"from": "cdn", "to": "lb"},
+                {"from": "lb", "to": "web1"},
+                {"from": "lb", "to": "web2"},
+                {"from": "web1", "to": "app"},
+                {"from": "web2", "to": "app"},
+                {"from": "app", "to": "cache"},
+                {"from": "app", "to": "db"},
+            ],
+        },
+    },
+    "microservices": {
+        "description": "API gateway routing to containerized services with their own data stores and an event bus",
+        "spec": {
+            "title": "Microservices Architecture",
+            "direction": "LR",
+            "clusters": [
+                {"id": "services", "label": "Services"},
+                {"id": "data", "label": "Data Stores"},
+            ],
+            "nodes": [
+                {"id": "identity", "role": "identity", "label": "Identity"},
+                {"id": "gateway", "role": "gateway", "label": "API Gateway"},
+                {"id": "users", "role": "container", "label": "User Service", "cluster": "services"},
+                {"id": "orders", "role": "container", "label": "Order Service", "cluster": "services"},
+                {"id": "payments", "role": "container", "label": "Payment Service", "cluster": "services"},
+                {"id": "bus", "role": "queue", "label": "Event Bus"},
+                {"id": "users_db", "role": "db", "label": "Users DB", "cluster": "data"},
+                {"id": "orders_db", "role": "nosql", "label": "Orders DB", "cluster": "data"},
+                {"id": "cache", "role": "cache", "label": "Cache", "cluster": "data"},
+                {"id": "monitoring", "role": "monitoring", "label": "Monitoring"},
+            ],
+            "edges": [
+                {"from": "gateway", "to": "identity", "style": "dashed"},
+                {"from": "gateway", "to": "users"},
+                {"from": "gateway", "to": "orders"},
+                {"from": "gateway", "to": "payments"},
+                {"from": "users", "to": "users_db"},
+                {"from": "orders", "to": "orders_db"},
+                {"from": "orders", "to": "cache"},
+                {"from": "orders", "to": "bus", "label": "OrderPlaced"},
+                {"from": "bus", "to": "payments"},
+                {"from": "payments", "to": "monitoring", "style": "dotted"},
+            ],
+        },
+    },
+    "serverless": {
+        "description": "Static site and API gateway in front of functions, a NoSQL store and a background queue",
+        "spec": {
+            "title": "Serverless Application",
+            "direction": "LR",
+            "clusters": [
+                {"id": "frontend", "label": "Frontend"},
+                {"id": "backend", "label": "Backend"},
+            ],
+            "nodes": [
+                {"id": "cdn", "role": "cdn", "label": "CDN", "cluster": "frontend"},
+                {"id": "site", "role": "storage", "label": "Static Site", "cluster": "frontend"},
+                {"id": "gateway", "role": "gateway", "label": "API Gateway", "cluster": "backend"},
+                {"id": "api", "role": "functions", "label": "API Functions", "cluster": "backend"},
+                {"id": "queue", "role": "queue", "label": "Job Queue", "cluster": "backend"},
+                {"id": "worker", "role": "functions", "label": "Worker Functions", "cluster": "backend"},
+                {"id": "table", "role": "nosql", "label": "Database"},
+                {"id": "uploads", "role": "storage", "label": "Uploads"},
+            ],
+            "edges": [
+                {"from": "cdn", "to": "site"},
+                {"from": "cdn", "to": "gateway", "label": "/api"},
+                {"from": "gateway", "to": "api"},
+                {"from": "api", "to": "table"},
+                {"from": "api", "to": "queue"},
+                {"from": "queue", "to": "worker"},
+                {"from": "worker", "to": "uploads"},
+                {"from": "worker", "to": "table"},
+            ],
+        },
+    },
+    "event-driven": {
+        "description": "Producers publishing to an event stream consumed by independent subscribers",
+        "spec": {
+            "title": "Event-Driven Architecture",
+            "direction": "LR",
+            "clusters": [
+                {"id": "producers", "label": "Producers"},
+                {"id": "consumers", "label": "Consumers"},
+            ],
+            "nodes": [
+                {"id": "web", "role": "web", "label": "Web App", "cluster": "producers"},
+                {"id": "api", "role": "api", "label": "Partner API", "cluster": "producers"},
+                {"id": "stream", "role": "stream", "label": "Event Stream"},
+                {"id": "projector", "role": "functions", "label": "Projector", "cluster": "consumers"},
+                {"id": "notifier", "role": "functions", "label": "Notifier", "cluster": "consumers"},
+                {"id": "archiver", "role": "functions", "label": "Archiver", "cluster": "consumers"},
+                {"id": "views", "role": "nosql", "label": "Read Models"},
+                {"id": "notify_queue", "role": "queue", "label": "Notifications"},
+                {"id": "archive", "role": "storage", "label": "Event Archive"},
+            ],
+            "edges": [
+                {"from": "web", "to": "stream", "label": "publish"},
+                {"from": "api", "to": "stream", "label": "publish"},
+                {"from": "stream", "to": "projector"},
+                {"from": "stream", "to": "notifier"},
+                {"from": "stream", "to": "archiver"},
+                {"from": "projector", "to": "views"},
+                {"from": "notifier", "to": "notify_queue"},
+                {"from": "archiver", "to": "archive"},
+            ],
+        },
+    },
+    "data-platform": {
+        "description": "Batch and streaming ingestion into a data lake, Spark processing and a warehouse",
+        "spec": {
+            "title": "Data Platform",
+            "direction": "LR",
+            "clusters": [
+                {"id": "sources", "label": "Sources"},
+                {"id": "ingestion", "label": "Ingestion"},
+                {"id": "platform", "label": "Lake and Processing"},
+            ],
+            "nodes": [
+                {"id": "operational_db", "role": "db", "label": "Operational DB", "cluster": "sources"},
+                {"id": "events", "role": "stream", "label": "Event Stream", "cluster": "sources"},
+                {"id": "batch", "role": "etl", "label": "Batch Ingestion", "cluster": "ingestion"},
+                {"id": "lake", "role": "storage", "label": "Data Lake", "cluster": "platform"},
+                {"id": "processing", "role": "spark", "label": "Processing", "cluster": "platform"},
+                {"id": "warehouse", "role": "warehouse", "label": "Warehouse"},
+                {"id": "monitoring", "role": "monitoring", "label": "Monitoring"},
+            ],
+            "edges": [
+                {"from": "operational_db", "to": "batch"},
+                {"from": "batch", "to": "lake"},
+                {"from": "events", "to": "lake", "label": "capture"},
+                {"from": "lake", "to": "processing"},
+                {"from": "processing", "to": "warehouse"},
+                {"from": "processing", "to": "monitoring", "style": "dotted"},
+            ],
+        },
+    },
+}
+
+# Other names callers use for the same patterns
+TEMPLATE_ALIASES = {
+    "three-tier": "3-tier-web",
+    "3-tier": "3-tier-web",
+    "web-app": "3-tier-web",
+    "web": "3-tier-web",
+    "microservice": "microservices",
+    "functions": "serverless",
+    "event-driven-architecture": "event-driven",
+    "events": "event-driven",
+    "data": "data-platform",
+    "data-pipeline": "data-platform",
+    "analytics": "data-platform",
+}
+
+CUSTOMIZATION_KEYS = ("title", "direction", "labels", "classes", "add_nodes", "add_edges", "remove_nodes")
+
+
+class TemplateError(ValueError):
+    """The template or its customizations are invalid; `errors` lists every problem found"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def resolve_template_name(template_type: str) -> Optional[str]:
+    key = str(template_type or "").strip().lower().replace("_", "-").replace(" ", "-")
+    key = TEMPLATE_ALIASES.get(key, key)
+    return key if key in TEMPLATES else None
+
+
+def list_templates() -> List[Dict[str, Any]]:
+    return [
+        {
+            "template_type": name,
+            "description": template["description"],
+            "node_ids": [node["id"] for node in template["spec"]["nodes"]],
+            "cluster_ids": [cluster["id"] for cluster in template["spec"]["clusters"]],
+        }
+        for name, template in TEMPLATES.items()
+    ]
+
+
+def _resolve_role(node: Dict[str, Any], roles: Dict[str, str], where: str, errors: List[str]) -> Dict[str, Any]:
+    """Spec node with its role replaced by the provider's class"""
+    node = dict(node)
+    role = node.pop("role", None)
+    if role is not None and "class" not in node and "icon" not in node:
+        if role in roles:
+            node["class"] = roles[role]
+        else:
+            errors.append(f"{where}.role '{role}' must be one of {', '.join(sorted(roles))}")
+    return node
+
+
+def build_template_spec(template_type: str, provider: Optional[str] = None,
+                        customizations: Optional[Dict[str, Any]] = None) -> Tuple[str, str, Dict[str, Any]]:
+    """(template name, provider, graph spec) for a template with customizations applied; raises TemplateError
+
+    Customizations: title, direction, labels {node_id: label}, classes {node_id: role or
+    provider.category.Class}, add_nodes [spec node with role or class], add_edges [spec edge],
+    remove_nodes [node_id] (their edges go too).
+    """
+    name = resolve_template_name(template_type)
+    if name is None:
+        raise TemplateError([f"Unknown template '{template_type}'; available: {', '.join(TEMPLATES)}"])
+    provider = (provider or DEFAULT_PROVIDER).lower()
+    roles = ROLE_CLASSES.get(provider)
+    if roles is None:
+        raise TemplateError([f"Provider '{provider}' has no templates; available: {', '.join(ROLE_CLASSES)}"])
+
+    customizations = customizations or {}
+    errors: List[str] = []
+    if not isinstance(customizations, dict):
+        raise TemplateError(["customizations must be an object"])
+    unknown = sorted(set(customizations) - set(CUSTOMIZATION_KEYS))
+    if unknown:
+        errors.append(f"Unknown customizations {', '.join(unknown)}; supported: {', '.join(CUSTOMIZATION_KEYS)}")
+
+    spec = copy.deepcopy(TEMPLATES[name]["spec"])
+    for key in ("title", "direction"):
+        if key in customizations:
+            spec[key] = customizations[key]
+
+    removed = customizations.get("remove_nodes") or []
+    if not isinstance(removed, list):
+        errors.append("remove_nodes must be a list of node ids")
+        removed = []
+    spec["nodes"] = [node for node in spec["nodes"] if node["id"] not in removed]
+    spec["edges"] = [edge for edge in spec["edges"] if edge["from"] not in removed and edge["to"] not in removed]
+
+    nodes = {node["id"]: node for node in spec["nodes"]}
+    for key in ("labels", "classes"):
+        value = customizations.get(key) or {}
+        if not isinstance(value, dict):
+            errors.append(f"{key} must be an object keyed by node id")
+            continue
+        for node_id, setting in value.items():
+            node = nodes.get(node_id)
+            if node is None:
+                errors.append(f"{key}: '{node_id}' is not a node of the {name} template")
+            elif key == "labels":
+                node["label"] = setting
+            elif isinstance(setting, str) and setting in roles:
+                node["role"] = setting
+            else:
+                node.pop("role", None)
+                node["class"] = setting
+
+    for key in ("add_nodes", "add_edges"):
+        value = customizations.get(key) or []
+        if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+            errors.append(f"{key} must be a list of objects")
+            continue
+        spec["nodes" if key == "add_nodes" else "edges"].extend(copy.deepcopy(value))
+
+    spec["nodes"] = [_resolve_role(node, roles, f"nodes[{i}]", errors) for i, node in enumerate(spec["nodes"])]
+    if errors:
+        raise TemplateError(errors)
+    return name, provider, spec
+
+
+def base_specs() -> List[Tuple[str, str, Dict[str, Any]]]:
+    """Uncustomized spec of every template for every provider"""
+    return [build_template_spec(name, provider) for name in TEMPLATES for provider in ROLE_CLASSES]
+
+
+def template_layouts_path() -> str:
+    return os.getenv("MCP_TEMPLATE_LAYOUTS", os.path.join(tempfile.gettempdir(), "mcp-template-layouts.json"))
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import sys
+
+    parser = argparse.ArgumentParser(description="Diagram template library")
+    parser.add_argument("--prerender", action="store_true",
+                        help="Render every template for every provider and save the base layouts")
+    parser.add_argument("--formats", default=os.getenv("MCP_TEMPLATE_PRERENDER_FORMATS", "png"),
+                        help="Comma-separated formats to pre-render")
+    parser.add_argument("--strict", action="store_true",
+                        help="Exit 1 when any template fails to render (for CI); warming alone never fails")
+    args = parser.parse_args()
+
+    if not args.prerender:
+        print(json.dumps(list_templates(), indent=2))
+        sys.exit(0)
+
+    from mcp_diagrams_server import prerender_diagram_templates
+
+    summary = asyncio.run(prerender_diagram_templates([f.strip() for f in args.formats.split(",") if f.strip()]))
+    print(json.dumps(summary, indent=2))
+    for failure in summary["failed"]:
+        print(f"Template pre-render failed: {json.dumps(failure)}", file=sys.stderr)
+    sys.exit(1 if args.strict and summary["failed"] else 0)
@@ -6,102 +6,47 @@ Uses the comprehensive azure_nodes.json to ensure all components are valid
 and provides intelligent suggestions for alternatives.
 """
 
-import json
-import os
-from typing import Dict, List, Any, Optional, Tuple
-from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from azure_catalog import AzureCatalog, extract_keywords, get_azure_catalog, load_catalog
+from component_matcher import matcher_for
 
 class AzureComponentValidator:
     """Validates and suggests Azure diagram components using the canonical list"""
     
-    def __init__(self, azure_nodes_path: str = None):
-        if azure_nodes_path is None:
-            azure_nodes_path = os.path.join(os.path.dirname(__file__), "azure_nodes.json")
-        
-        with open(azure_nodes_path, 'r', encoding='utf-8') as f:
-            self.azure_data = json.load(f)
-        
-        # Build lookup tables
-        self._build_lookups()
-    
-    def _build_lookups(self):
-        """Build efficient lookup tables for validation and suggestions"""
-        self.canonical_map = {}  # canonical_name -> (submodule, class_info)
-        self.alias_map = {}      # alias -> canonical_name
-        self.keyword_map = {}    # keyword -> [(submodule, canonical_name)]
-        self.submodule_components = {}  # submodule -> [canonical_names]
-        
-        for submodule, components in self.azure_data.items():
-            self.submodule_components[submodule] = []
-            
-            for comp in components:
-                canonical = comp["canonical"]
-                class_name = comp["class"]
-                
-                # Skip private classes
-                if canonical.startswith('_'):
-                    continue
-                
-                self.canonical_map[canonical] = (submodule, comp)
-                self.submodule_components[submodule].append(canonical)
-                
-                # Map aliases
-                for alias in comp.get("aliases", []):
-                    self.alias_map[alias] = canonical
-                
-                # Build keyword map for smart suggestions
-                keywords = self._extract_keywords(canonical)
-                for keyword in keywords:
-                    if keyword not in self.keyword_map:
-                        self.keyword_map[keyword] = []
-                    self.keyword_map[keyword].append((submodule, canonical))
+    def __init__(self, azure_nodes_path: str = None, catalog: Optional[AzureCatalog] = None):
+        # The process-wide catalog unless a specific azure_nodes.json is asked for
+        if catalog is None:
+            catalog = load_catalog(azure_nodes_path, None) if azure_nodes_path else get_azure_catalog()
+        self.catalog = catalog
+        self.canonical_map = catalog.canonical_map            # canonical_name -> AzureComponent
+        self.alias_map = catalog.alias_map                    # alias -> canonical_name
+        self.keyword_map = catalog.keyword_map                # keyword -> ((submodule, canonical_name), ...)
+        self.submodule_components = catalog.submodule_components  # submodule -> (canonical_names, ...)
+        self.matcher = matcher_for(catalog)
     
     def _extract_keywords(self, name: str) -> List[str]:
         """Extract searchable keywords from component names"""
-        import re
-        # Split camelCase and handle common patterns
-        words = re.findall(r'[A-Z][a-z]*|[a-z]+', name)
-        keywords = [w.lower() for w in words]
-        
-        # Add full name variations
-        keywords.extend([
-            name.lower(),
-            name.lower().replace('services', '').replace('service', ''),
-            name.lower().replace('apps', '').replace('app', ''),
-        ])
-        
-        return list(set(keywords))
+        return extract_keywords(name)
     
-    def validate_component(self, name: str) -> Dict[str, Any]:
-        """Validate a component name and provide suggestions"""
-        # Direct canonical match
-        if name in self.canonical_map:
-            submodule, comp_info = self.canonical_map[name]
-            return {
-                "valid": True,
-                "canonical": name,
-                "submodule": submodule,
-                "class": comp_info["class"],
-                "import_path": f"diagrams.azure.{submodule}",
-                "aliases": comp_info.get("aliases", [])
-            }
-        
-        # Alias match
-        if name in self.alias_map:
-            canonical = self.alias_map[name]
-            submodule, comp_info = self.canonical_map[canonical]
-            return {
+    def validate_component(self, name: str, threshold: Optional[float] = None) -> Dict[str, Any]:
+        """Validate a component name and provide suggestions scoring at least threshold"""
+        comp = self.catalog.resolve(name)
+        if comp is not None:
+            result = {
                 "valid": True,
-                "canonical": canonical,
-                "submodule": submodule,
-                "class": comp_info["class"],
-                "import_path": f"diagrams.azure.{submodule}",
-                "aliases": comp_info.get("aliases", []),
-                "note": f"'{name}' is an alias for '{canonical}'"
+                "canonical": comp.canonical,
+                "submodule": comp.submodule,
+                "class": comp.class_name,
+                "import_path": comp.import_path,
+                "aliases": list(comp.aliases)
             }
+            if comp.canonical != name:
+                result["note"] = f"'{name}' is an alias for '{comp.canonical}'"
+            return result
         
         # Not found - provide suggestions
-        suggestions = self._find_suggestions(name)
+        suggestions = self._find_suggestions(name, threshold)
         return {
             "valid": False,
             "requested": name,
@@ -109,48 +54,9 @@ class AzureComponentValidator:
             "error": f"Component '{name}' not found in Azure diagrams library"
         }
     
-    def _find_suggestions(self, name: str) -> List[Dict[str, str]]:
-        """Find similar component names"""
-        name_lower = name.lower()
-        suggestions = []
-        
-        # Keyword-based matching
-        for keyword in self._extract_keywords(name):
-            if keyword in self.keyword_map:
-                for submodule, canonical in self.keyword_map[keyword]:
-                    suggestions.append({
-                        "name": canonical,
-                        "submodule": submodule,
-                        "reason": f"matches keyword '{keyword}'"
-                    })
-        
-        # Fuzzy string matching for close names
-        for canonical in self.canonical_map:
-            if self._similarity_score(name_lower, canonical.lower()) > 0.6:
-                submodule, _ = self.canonical_map[canonical]
-                suggestions.append({
-                    "name": canonical,
-                    "submodule": submodule,
-                    "reason": "similar name"
-                })
-        
-        # Remove duplicates and limit
-        seen = set()
-        unique_suggestions = []
-        for sugg in suggestions:
-            if sugg["name"] not in seen:
-                seen.add(sugg["name"])
-                unique_suggestions.append(sugg)
-        
-        return unique_suggestions[:5]  # Top 5 suggestions
-    
-    def _similarity_score(self, a: str, b: str) -> float:
-        """Simple similarity score based on common characters"""
-        if not a or not b:
-            return 0.0
-        
-        common = sum(1 for char in a if char in b)
-        return common / max(len(a), len(b))
+    def _find_suggestions(self, name: str, threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Ranked similar component names, best first"""
+        return self.matcher.match(name, threshold)
     
     def suggest_components_for_architecture(self, description: str, 
                                          provider: str = "azure") -> Dict[str, Any]:
@@ -286,14 +192,18 @@ class AzureComponentValidator:
         
         return "\n".join(code_lines)
 
+def get_validator() -> AzureComponentValidator:
+    """Validator over the current catalog; it holds no per-call state, so each catalog snapshot shares one"""
+    return get_azure_catalog().derived("validator", lambda catalog: AzureComponentValidator(catalog=catalog))
+
 # Validation Tool Functions for MCP Integration
-def validate_component_names(names: List[str]) -> Dict[str, Any]:
+def validate_component_names(names: List[str], threshold: Optional[float] = None) -> Dict[str, Any]:
     """MCP tool function for validating component names"""
-    validator = AzureComponentValidator()
+    validator = get_validator()
     results = {}
     
     for name in names:
-        results[name] = validator.validate_component(name)
+        results[name] = validator.validate_component(name, threshold)
     
     return {
         "validation_results": results,
@@ -304,12 +214,12 @@ def validate_component_names(names: List[str]) -> Dict[str, Any]:
 
 def suggest_architecture_components(description: str, provider: str = "azure") -> Dict[str, Any]:
     """MCP tool function for suggesting architecture components"""
-    validator = AzureComponentValidator()
+    validator = get_validator()
     return validator.suggest_components_for_architecture(description, provider)
 
 def generate_validated_diagram(description: str, provider: str = "azure") -> Dict[str, Any]:
     """MCP tool function that combines suggestion and code generation"""
-    validator = AzureComponentValidator()
+    validator = get_validator()
     
     # Get component suggestions
     suggestions = validator.suggest_components_for_architecture(description, provider)
@@ -338,7 +248,7 @@ def generate_validated_diagram(description: str, provider: str = "azure") -> Dic
 
 if __name__ == "__main__":
     # Example usage
-    validator = AzureComponentValidator()
+    validator = get_validator()
     
     # Test validation
     print("=== Component Validation ===")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Graph Spec Compiler
+Compiles a JSON graph spec (catalog node classes, nested clusters, edges with
+attributes) into the same Graphviz graph the equivalent diagrams code would
+build. The spec is validated against the node catalog up front and no Python
+is generated or executed. Nodes with a local "icon" file instead of a "class"
+become diagrams.custom.Custom nodes.
+
+    {
+        "title": "Web Application", "direction": "LR",
+        "clusters": [{"id": "app", "label": "App Tier", "parent": null}],
+        "nodes": [{"id": "web", "class": "azure.compute.AppServices", "label": "Web", "cluster": "app"}],
+        "edges": [{"from": "gw", "to": "web", "label": "HTTPS", "direction": "forward"}]
+    }
+"""
+
+import difflib
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+from diagram_compiler import (
+    MAX_NODES, DiagramCompiler, UnsupportedDiagramCode, _Cluster, _Diagram, _Edge, _Node, compile_diagram,
+    load_node_index
+)
+
+DIRECTIONS = ("TB", "BT", "LR", "RL")
+CURVESTYLES = ("ortho", "curved")
+EDGE_DIRECTIONS = {
+    "forward": (True, False),
+    "back": (False, True),
+    "both": (True, True),
+    "none": (False, False),
+}
+
+
+class GraphSpecError(ValueError):
+    """The spec does not describe a valid graph; `errors` lists every problem found"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def resolve_node_class(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Catalog entry for "azure.compute.AppServices" (diagrams. prefix optional), or (None, error)"""
+    index = load_node_index()
+    if not isinstance(path, str) or path.count(".") < 2:
+        return None, f"Node class '{path}' must look like provider.category.Class"
+    module, _, name = path.rpartition(".")
+    if not module.startswith("diagrams."):
+        module = f"diagrams.{module}"
+
+    classes = index.get(module)
+    if classes is None:
+        close = difflib.get_close_matches(module, list(index), n=3, cutoff=0.6)
+        hint = f"; did you mean {', '.join(m[len('diagrams.'):] for m in close)}?" if close else ""
+        return None, f"Unknown category '{module[len('diagrams.'):]}'{hint}"
+    if name not in classes:
+        close = difflib.get_close_matches(name, list(classes), n=3, cutoff=0.6)
+        hint = f"; did you mean {', '.join(close)}?" if close else ""
+        return None, f"Unknown node class '{name}' in {module[len('diagrams.'):]}{hint}"
+    return classes[name], None
+
+
+def _attrs(value: Any, where: str, errors: List[str]) -> Dict[str, str]:
+    if value is None:
+        return {}
+    if not isinstance(value, dict) or not all(
+            isinstance(v, (str, int, float, bool)) for v in value.values()):
+        errors.append(f"{where} must be an object of string/number/boolean values")
+        return {}
+    return {str(k): str(v).lower() if isinstance(v, bool) else str(v) for k, v in value.items()}
+
+
+def validate_graph_spec(spec: Dict[str, Any], external_nodes: Tuple[str, ...] = ()) -> List[str]:
+    """Every problem with the spec, or an empty list; edges may also name external_nodes"""
+    errors: List[str] = []
+    if not isinstance(spec, dict):
+        return ["Graph spec must be an object"]
+
+    if not isinstance(spec.get("title", ""), str):
+        errors.append("title must be a string")
+    if str(spec.get("direction", "LR")).upper() not in DIRECTIONS:
+        errors.append(f"direction must be one of {', '.join(DIRECTIONS)}")
+    if str(spec.get("curvestyle", "ortho")).lower() not in CURVESTYLES:
+        errors.append(f"curvestyle must be one of {', '.join(CURVESTYLES)}")
+    for key in ("graph_attr", "node_attr", "edge_attr"):
+        _attrs(spec.get(key), key, errors)
+
+    clusters = spec.get("clusters") or []
+    nodes = spec.get("nodes") or []
+    edges = spec.get("edges") or []
+    shape_errors = [
+        f"{key} must be a list of objects"
+        for key, value in (("clusters", clusters), ("nodes", nodes), ("edges", edges))
+        if not isinstance(value, list) or not all(isinstance(item, dict) for item in value)
+    ]
+    if shape_errors:
+        # The item checks below need lists of objects
+        return errors + shape_errors
+    if not nodes and not external_nodes:
+        errors.append("At least one node is required")
+    if len(nodes) > MAX_NODES:
+        errors.append(f"More than {MAX_NODES} nodes")
+
+    cluster_ids = set()
+    cluster_labels = set()
+    for i, cluster in enumerate(clusters):
+        where = f"clusters[{i}]"
+        cluster_id = cluster.get("id")
+        if not isinstance(cluster_id, str) or not cluster_id:
+            errors.append(f"{where}.id is required")
+        elif cluster_id in cluster_ids:
+            errors.append(f"{where}.id '{cluster_id}' is not unique")
+        else:
+            cluster_ids.add(cluster_id)
+        label = cluster.get("label", cluster_id)
+        if not isinstance(label, str):
+            errors.append(f"{where}.label must be a string")
+        elif label in cluster_labels:
+            # Clusters are named after their label, so Graphviz would merge the two
+            errors.append(f"{where}.label '{label}' is used by another cluster")
+        else:
+            cluster_labels.add(label)
+        if str(cluster.get("direction", "LR")).upper() not in DIRECTIONS:
+            errors.append(f"{where}.direction must be one of {', '.join(DIRECTIONS)}")
+        _attrs(cluster.get("graph_attr"), f"{where}.graph_attr", errors)
+
+    # Ids and references are checked with isinstance first: a list or object would not hash
+    parents = {c["id"]: c.get("parent") for c in clusters if isinstance(c.get("id"), str)}
+    for cluster_id, parent in parents.items():
+        if parent is not None and (not isinstance(parent, str) or parent not in cluster_ids):
+            errors.append(f"Cluster '{cluster_id}' has unknown parent '{parent}'")
+            continue
+        seen = {cluster_id}
+        while parent is not None and parent in parents:
+            if parent in seen:
+                errors.append(f"Cluster '{cluster_id}' is nested inside itself")
+                break
+            seen.add(parent)
+            parent = parents[parent]
+
+    node_ids = set()
+    for i, node in enumerate(nodes):
+        where = f"nodes[{i}]"
+        node_id = node.get("id")
+        if not isinstance(node_id, str) or not node_id:
+            errors.append(f"{where}.id is required")
+        elif node_id in node_ids:
+            errors.append(f"{where}.id '{node_id}' is not unique")
+        else:
+            node_ids.add(node_id)
+        if node.get("icon") is not None:
+            if not isinstance(node["icon"], str) or not os.path.isfile(node["icon"]):
+                errors.append(f"{where}.icon must be a local image file")
+        else:
+            _, error = resolve_node_class(node.get("class"))
+            if error:
+                errors.append(f"{where}: {error}")
+        if not isinstance(node.get("label", ""), str):
+            errors.append(f"{where}.label must be a string")
+        cluster = node.get("cluster")
+        if cluster is not None and (not isinstance(cluster, str) or cluster not in cluster_ids):
+            errors.append(f"{where}.cluster '{cluster}' is not a declared cluster")
+        _attrs(node.get("attrs"), f"{where}.attrs", errors)
+
+    for i, edge in enumerate(edges):
+        where = f"edges[{i}]"
+        for end in ("from", "to"):
+            node_id = edge.get(end)
+            if not isinstance(node_id, str) or (node_id not in node_ids and node_id not in external_nodes):
+                errors.append(f"{where}.{end} '{node_id}' is not a declared node")
+        direction = edge.get("direction", "forward")
+        if not isinstance(direction, str) or direction not in EDGE_DIRECTIONS:
+            errors.append(f"{where}.direction must be one of {', '.join(EDGE_DIRECTIONS)}")
+        for key in ("label", "color", "style"):
+            if not isinstance(edge.get(key, ""), str):
+                errors.append(f"{where}.{key} must be a string")
+        _attrs(edge.get("attrs"), f"{where}.attrs", errors)
+    return errors
+
+
+def compile_graph_spec(spec: Dict[str, Any], layout: Optional[Dict[str, Any]] = None,
+                       base_code: str = "") -> _Diagram:
+    """Compiled graph for a spec, with `layout` positions pinned on when given; raises GraphSpecError
+
+    With base_code the spec's nodes, clusters and edges are added to the graph that
+    diagrams code builds (title and graph settings then come from the code), and
+    edges may name the code's node variables.
+    """
+    unused: List[str] = []
+    compiler = DiagramCompiler(layout=layout)
+    variables: Dict[str, _Node] = {}
+    if base_code:
+        try:
+            diagram = compile_diagram(base_code, compiler=compiler)
+        except UnsupportedDiagramCode as e:
+            raise GraphSpecError([f"base diagram code cannot be compiled: {e}"])
+        compiler.diagram = diagram
+        variables = {name: value for name, value in compiler.env.items() if isinstance(value, _Node)}
+
+    # Before building the diagram, which raises ValueError on an invalid direction
+    errors = validate_graph_spec(spec, tuple(variables))
+    if errors:
+        raise GraphSpecError(errors)
+
+    if not base_code:
+        diagram = compiler.diagram = _Diagram(
+            name=spec.get("title", ""),
+            direction=str(spec.get("direction", "LR")).upper(),
+            curvestyle=str(spec.get("curvestyle", "ortho")).lower(),
+            show=False,
+            graph_attr=_attrs(spec.get("graph_attr"), "graph_attr", unused),
+            node_attr=_attrs(spec.get("node_attr"), "node_attr", unused),
+            edge_attr=_attrs(spec.get("edge_attr"), "edge_attr", unused),
+        )
+        diagram.layout = layout
+
+    clusters = spec.get("clusters") or []
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for cluster in clusters:
+        children.setdefault(cluster.get("parent"), []).append(cluster)
+    members: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for node in spec["nodes"]:
+        members.setdefault(node.get("cluster"), []).append(node)
+
+    built: Dict[str, _Node] = dict(variables)
+
+    def emit(cluster_id: Optional[str]):
+        # Same order as the equivalent `with Cluster(...)` blocks: own nodes first, then sub-clusters
+        for node in members.get(cluster_id, []):
+            if node.get("icon") is not None:
+                class_name, icon = "Custom", node["icon"]
+            else:
+                entry, _ = resolve_node_class(node["class"])
+                class_name, icon = entry["class"], entry["icon"]
+            built[node["id"]] = _Node(compiler, class_name, icon, node.get("label", ""),
+                                      **_attrs(node.get("attrs"), "attrs", unused))
+        for cluster in children.get(cluster_id, []):
+            context = _Cluster(compiler, cluster.get("label", cluster["id"]),
+                               str(cluster.get("direction", "LR")).upper(),
+                               _attrs(cluster.get("graph_attr"), "graph_attr", unused))
+            parent, compiler.cluster = compiler.cluster, context
+            emit(cluster["id"])
+            context.close()
+            compiler.cluster = parent
+
+    emit(None)
+
+    for edge in spec.get("edges") or []:
+        forward, reverse = EDGE_DIRECTIONS[edge.get("direction", "forward")]
+        diagram.connect(built[edge["from"]], built[edge["to"]], _Edge(
+            forward=forward, reverse=reverse,
+            label=edge.get("label", ""), color=edge.get("color", ""), style=edge.get("style", ""),
+            **_attrs(edge.get("attrs"), "attrs", unused)
+        ))
+
+    if layout:
+        diagram.dot.graph_attr.update(layout["graph"])
+    return diagram
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Graphviz Layout Engine Pool
+Runs Graphviz layout engines (dot, neato, fdp, sfdp, circo, twopi) as bounded,
+timed-out subprocesses. A single invocation lays the graph out once and writes
+every requested output format from that layout, and a batch of graphs shares
+one invocation so process start-up, plugin loading and font setup are paid once.
+"""
+
+import asyncio
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+LAYOUT_ENGINES = ("dot", "neato", "fdp", "sfdp", "circo", "twopi")
+OUTPUT_FORMATS = ("png", "svg", "pdf", "ps", "jpg", "dot", "json")
+
+
+# Attributes that make Graphviz read files: never allowed in client DOT
+FILE_SEARCH_ATTRIBUTES = ("imagepath", "shapefile", "fontpath")
+# Attributes that name a file; allowed for absolute paths under the trusted image roots
+IMAGE_ATTRIBUTES = ("image",)
+FONT_ATTRIBUTES = ("fontname", "labelfontname")
+
+_HTML_IMG = re.compile(r"<\s*img\b(?P<attrs>[^>]*)>", re.IGNORECASE)
+_HTML_IMG_SRC = re.compile(r"\bsrc\s*=\s*(?:\"(?P<dq>[^\"]*)\"|'(?P<sq>[^']*)')", re.IGNORECASE)
+
+
+class LayoutError(Exception):
+    """Graphviz failed, timed out or is not installed"""
+
+
+def _dot_tokens(dot_source: str) -> List[tuple]:
+    """DOT lexer: ("id", text) for identifiers and quoted strings (joined across +), ("html", text), ("punct", c)"""
+    tokens: List[tuple] = []
+    i, n = 0, len(dot_source)
+    while i < n:
+        c = dot_source[i]
+        if c.isspace():
+            i += 1
+        elif dot_source.startswith("//", i) or (c == "#" and (i == 0 or dot_source[i - 1] == "\n")):
+            end = dot_source.find("\n", i)
+            i = n if end < 0 else end
+        elif dot_source.startswith("/*", i):
+            end = dot_source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif c == '"':
+            chars, i = [], i + 1
+            while i < n and dot_source[i] != '"':
+                if dot_source[i] == "\\" and i + 1 < n and dot_source[i + 1] in '"\n':
+                    # \" is a quote, backslash-newline continues the line
+                    if dot_source[i + 1] == '"':
+                        chars.append('"')
+                    i += 2
+                    continue
+                chars.append(dot_source[i])
+                i += 1
+            i += 1
+            text = "".join(chars)
+            if len(tokens) >= 2 and tokens[-1] == ("punct", "+") and tokens[-2][0] == "id":
+                tokens.pop()
+                text = tokens.pop()[1] + text
+            tokens.append(("id", text))
+        elif c == "<":
+            depth, start = 0, i
+            while i < n:
+                if dot_source[i] == "<":
+                    depth += 1
+                elif dot_source[i] == ">":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            tokens.append(("html", dot_source[start + 1:i]))
+            i += 1
+        elif c.isalnum() or c in "_.-" or ord(c) > 127:
+            start = i
+            while i < n and (dot_source[i].isalnum() or dot_source[i] in "_.-" or ord(dot_source[i]) > 127):
+                i += 1
+            tokens.append(("id", dot_source[start:i]))
+        else:
+            tokens.append(("punct", c))
+            i += 1
+    return tokens
+
+
+def _under_roots(path: str, roots: List[str]) -> bool:
+    if not os.path.isabs(path):
+        # Relative paths resolve against the engine's working directory, not a trusted root
+        return False
+    real = os.path.realpath(path)
+    return any(os.path.commonpath([real, root]) == root for root in (os.path.realpath(r) for r in roots if r))
+
+
+def untrusted_dot_error(dot_source: str, image_roots: List[str]) -> Optional[str]:
+    """Why client-supplied DOT may not be rendered, or None
+
+    Graphviz reads whatever files image=, shapefile=, fontpath= and friends name into
+    the output, so client DOT may only reference images under image_roots (the icon
+    cache and the diagrams resources) and may not change where files are searched for.
+    """
+    tokens = _dot_tokens(dot_source)
+    for index, (kind, text) in enumerate(tokens):
+        if kind == "html":
+            for tag in _HTML_IMG.finditer(text):
+                src = _HTML_IMG_SRC.search(tag.group("attrs"))
+                path = (src.group("dq") if src.group("dq") is not None else src.group("sq")) if src else None
+                if path is None or not _under_roots(path, image_roots):
+                    return "HTML <IMG> may only reference icons from the icon cache or the diagrams resources"
+            continue
+        if kind != "id" or index + 2 >= len(tokens) or tokens[index + 1] != ("punct", "="):
+            continue
+        name = text.lower()
+        value = tokens[index + 2][1]
+        if name in FILE_SEARCH_ATTRIBUTES:
+            return f"Attribute '{text}' is not allowed"
+        if name in IMAGE_ATTRIBUTES and value and not _under_roots(value, image_roots):
+            return f"{text}= may only reference icons from the icon cache or the diagrams resources"
+        if name in FONT_ATTRIBUTES and ("/" in value or "\\" in value):
+            return f"{text}= must be a font name, not a path"
+    return None
+
+
+class LayoutEnginePool:
+    """Limits concurrent Graphviz processes and renders several formats per layout pass"""
+
+    def __init__(self, max_workers: int = 4, timeout: float = 30.0, batch_size: int = 50):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.layouts_total: Dict[str, int] = {}
+        self.failures_total = 0
+        self.timeouts_total = 0
+        self.batches_total = 0
+        self.batch_graphs_total = 0
+
+    async def render(self, dot_source: str, engine: str = "dot", formats: Optional[List[str]] = None,
+                     timeout: Optional[float] = None, options: Optional[List[str]] = None) -> Dict[str, bytes]:
+        """Lay out dot_source with `engine` once and return {format: bytes}; safe from any event loop
+
+        options are extra engine flags, e.g. ["-n2"] to draw neato input from its pos attributes.
+        """
+        formats = [f.lower() for f in (formats or ["png"])]
+        if engine not in LAYOUT_ENGINES:
+            raise LayoutError(f"Unsupported layout engine '{engine}', expected one of {', '.join(LAYOUT_ENGINES)}")
+        unsupported = [f for f in formats if f not in OUTPUT_FORMATS]
+        if unsupported:
+            raise LayoutError(f"Unsupported output format(s): {', '.join(unsupported)}")
+        # Preserve order but drop duplicates; each format is written once
+        formats = list(dict.fromkeys(formats))
+        return await asyncio.to_thread(self._render_blocking, dot_source, engine, formats,
+                                       timeout or self.timeout, options or [])
+
+    async def render_batch(self, dot_sources: List[str], engine: str = "dot", format: str = "png",
+                           timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Render many graphs with as few Graphviz invocations as possible
+
+        Graphs are split into chunks of batch_size, each chunk is one process and
+        chunks run concurrently on the pool. Returns one {"success", "data"|"error"}
+        per input, in order; a bad graph only fails its own entry.
+        """
+        format = format.lower()
+        if engine not in LAYOUT_ENGINES:
+            raise LayoutError(f"Unsupported layout engine '{engine}', expected one of {', '.join(LAYOUT_ENGINES)}")
+        if format not in OUTPUT_FORMATS:
+            raise LayoutError(f"Unsupported output format(s): {format}")
+
+        chunks = [dot_sources[i:i + self.batch_size] for i in range(0, len(dot_sources), self.batch_size)]
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self._with_slot, self._run_batch, chunk, engine, format, timeout or self.timeout)
+            for chunk in chunks
+        ))
+        return [entry for chunk_results in results for entry in chunk_results]
+
+    def _render_blocking(self, dot_source: str, engine: str, formats: List[str],
+                         timeout: float, options: List[str]) -> Dict[str, bytes]:
+        return self._with_slot(self._run_engine, (dot_source, options), engine, formats, timeout)
+
+    def _with_slot(self, run, payload, engine: str, formats, timeout: float):
+        """Run one Graphviz invocation once a worker slot is free; waiting counts against timeout"""
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=timeout):
+            raise LayoutError(f"No layout worker became free within {timeout:.0f}s")
+        try:
+            with self._lock:
+                self.in_flight += 1
+            remaining = max(0.1, timeout - (time.monotonic() - started))
+            return run(payload, engine, formats, remaining)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def _run_engine(self, payload: tuple, engine: str, formats: List[str],
+                    timeout: float) -> Dict[str, bytes]:
+        dot_source, options = payload
+        with tempfile.TemporaryDirectory(prefix="mcp-layout-") as work_dir:
+            command = [engine, *options]
+            for format in formats:
+                # Repeated -T/-o pairs share the one layout Graphviz computes for the graph
+                command += [f"-T{format}", "-o", os.path.join(work_dir, f"out.{format}")]
+
+            try:
+                completed = subprocess.run(
+                    command,
+                    input=dot_source.encode(),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    cwd=work_dir,
+                    timeout=timeout
+                )
+            except FileNotFoundError:
+                self.failures_total += 1
+                raise LayoutError(
+                    f"failed to execute '{engine}', make sure the Graphviz executables are on your systems' PATH"
+                )
+            except subprocess.TimeoutExpired:
+                self.timeouts_total += 1
+                raise LayoutError(f"{engine} did not finish within {timeout:.0f}s")
+
+            if completed.returncode != 0:
+                self.failures_total += 1
+                raise LayoutError(
+                    f"{engine} exited with code {completed.returncode}: "
+                    f"{completed.stderr.decode(errors='replace').strip()}"
+                )
+
+            outputs = {}
+            for format in formats:
+                path = os.path.join(work_dir, f"out.{format}")
+                if not os.path.exists(path):
+                    self.failures_total += 1
+                    raise LayoutError(f"{engine} produced no {format} output")
+                with open(path, "rb") as f:
+                    outputs[format] = f.read()
+
+        with self._lock:
+            self.layouts_total[engine] = self.layouts_total.get(engine, 0) + 1
+        return outputs
+
+    def _run_batch(self, dot_sources: List[str], engine: str, format: str,
+                   timeout: float) -> List[Dict[str, Any]]:
+        with tempfile.TemporaryDirectory(prefix="mcp-layout-batch-") as work_dir:
+            # One input file per graph: with -O Graphviz writes <input>.<format> next to
+            # each file, and a parse error in one file does not stop the files after it
+            names = []
+            for index, dot_source in enumerate(dot_sources):
+                name = f"g{index}.gv"
+                with open(os.path.join(work_dir, name), "w") as f:
+                    f.write(dot_source)
+                names.append(name)
+
+            try:
+                completed = subprocess.run(
+                    [engine, f"-T{format}", "-O", *names],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    cwd=work_dir,
+                    timeout=timeout
+                )
+            except FileNotFoundError:
+                self.failures_total += 1
+                raise LayoutError(
+                    f"failed to execute '{engine}', make sure the Graphviz executables are on your systems' PATH"
+                )
+            except subprocess.TimeoutExpired:
+                self.timeouts_total += 1
+                error = f"{engine} did not finish a batch of {len(names)} graphs within {timeout:.0f}s"
+                return [{"success": False, "error": error} for _ in names]
+
+            stderr = completed.stderr.decode(errors="replace")
+            results = []
+            for name in names:
+                path = os.path.join(work_dir, f"{name}.{format}")
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        results.append({"success": True, "data": f.read()})
+                    continue
+                self.failures_total += 1
+                # Graphviz names the offending input file in its error lines
+                messages = [line.strip() for line in stderr.splitlines()
+                            if re.search(rf"\b{re.escape(name)}\b", line)]
+                results.append({
+                    "success": False,
+                    "error": "; ".join(messages) or
+                             f"{engine} produced no {format} output (exit code {completed.returncode})"
+                })
+
+        with self._lock:
+            self.layouts_total[engine] = self.layouts_total.get(engine, 0) + 1
+            self.batches_total += 1
+            self.batch_graphs_total += len(dot_sources)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "layouts_total": dict(self.layouts_total),
+            "failures_total": self.failures_total,
+            "timeouts_total": self.timeouts_total,
+            "batches_total": self.batches_total,
+            "batch_graphs_total": self.batch_graphs_total,
+        }
+
+
+_default_pool: Optional[LayoutEnginePool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_layout_pool() -> LayoutEnginePool:
+    """Process-wide pool configured from MCP_LAYOUT_WORKERS / MCP_LAYOUT_TIMEOUT / MCP_LAYOUT_BATCH_SIZE"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = LayoutEnginePool(
+                max_workers=int(os.getenv("MCP_LAYOUT_WORKERS", str(os.cpu_count() or 4))),
+                timeout=float(os.getenv("MCP_LAYOUT_TIMEOUT", "30")),
+                batch_size=int(os.getenv("MCP_LAYOUT_BATCH_SIZE", "50"))
+            )
+        return _default_pool
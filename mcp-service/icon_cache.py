@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Custom Icon Cache
+Ingests custom node icons (http(s) URLs, data URIs or local files) once into a
+local content-addressed store. Local files must sit under the icons directory
+(MCP_ICON_LOCAL_ROOT, default ./icons) and URLs must resolve to public
+addresses, so a diagram request cannot read server files or reach internal
+services. Icons are normalized at ingest time (decoded,
+converted to RGBA PNG and scaled to fit a square box) so renders only ever
+reference local files and never repeat a download or a resize. The store is
+bounded by size with least-recently-used eviction; icons used within the last
+render_window seconds are never evicted, since a render may still be reading them.
+"""
+
+import base64
+import hashlib
+import io
+import ipaddress
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}\.png$")
+_DATA_URI = re.compile(r"^data:(?P<mime>[\w/+.-]*)(?P<params>(;[\w=.-]+)*?)(?P<b64>;base64)?,(?P<data>.*)$", re.DOTALL)
+
+# Icons larger than this are rejected before decoding
+MAX_SOURCE_PIXELS = 40_000_000
+
+DEFAULT_LOCAL_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
+
+
+class IconError(Exception):
+    """The icon could not be fetched, read or decoded"""
+
+
+class IconCache:
+    """Content-addressed store of normalized PNG icons, keyed by the sha256 of the source bytes"""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = 64 * 1024 * 1024, size_px: int = 256,
+                 max_source_bytes: int = 5 * 1024 * 1024, fetch_timeout: float = 10.0,
+                 local_root: Optional[str] = None, allow_private: bool = False, render_window: float = 120.0):
+        self.root = Path(root or os.path.join(tempfile.gettempdir(), "mcp-icon-cache"))
+        self.max_bytes = max_bytes
+        self.size_px = size_px
+        self.max_source_bytes = max_source_bytes
+        self.fetch_timeout = fetch_timeout
+        self.local_root = Path(local_root or DEFAULT_LOCAL_ROOT).resolve()
+        # Whether URLs may point at loopback, private or link-local addresses
+        self.allow_private = allow_private
+        # Icons ingested or hit this recently may still be read by a render, in this or another process
+        self.render_window = render_window
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Remote sources already ingested, so a URL is downloaded once per process
+        self._sources: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.ingested = 0
+        self.downloads = 0
+        self.evictions = 0
+
+    def ingest(self, source: str) -> str:
+        """Local path of the normalized icon for a URL, data URI or file path"""
+        if not isinstance(source, str) or not source.strip():
+            raise IconError("Icon source must be a non-empty string")
+        source = source.strip()
+
+        remote = source.startswith(("http://", "https://"))
+        if remote:
+            with self._lock:
+                key = self._sources.get(source)
+            if key and self._touch(key):
+                return str(self.root / key)
+            raw = self._download(source)
+        elif source.startswith("data:"):
+            raw = self._decode_data_uri(source)
+        else:
+            path = Path(source)
+            # Already one of ours, e.g. a path returned by an earlier ingest
+            if path.parent.resolve() == self.root.resolve() and _KEY_PATTERN.match(path.name) \
+                    and self._touch(path.name):
+                return str(self.root / path.name)
+            raw = self._read_local(source)
+
+        key = f"{hashlib.sha256(raw).hexdigest()}.png"
+        if remote:
+            with self._lock:
+                self._sources[source] = key
+        if self._touch(key):
+            return str(self.root / key)
+
+        self._write(key, self._normalize(raw))
+        with self._lock:
+            self.ingested += 1
+        self._evict()
+        return str(self.root / key)
+
+    def _touch(self, key: str) -> bool:
+        """Mark a stored icon as recently used; False if it is not (or no longer) stored"""
+        try:
+            os.utime(self.root / key)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def _check_url(self, url: str):
+        """Reject URLs whose host resolves to a loopback, private, link-local or otherwise internal address"""
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise IconError(f"Icon URL {url} must be http(s) with a host")
+        if self.allow_private:
+            return
+        try:
+            infos = socket.getaddrinfo(parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80),
+                                       proto=socket.IPPROTO_TCP)
+        except (OSError, UnicodeError) as e:
+            raise IconError(f"Could not resolve icon host {parsed.hostname}: {e}")
+        for info in infos:
+            address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+            if not address.is_global or address.is_multicast:
+                raise IconError(f"Icon host {parsed.hostname} resolves to a non-public address")
+
+    def _download(self, url: str) -> bytes:
+        self._check_url(url)
+        cache = self
+
+        class CheckedRedirects(urllib.request.HTTPRedirectHandler):
+            # Every redirect target is checked like the original URL
+            def redirect_request(self, req, fp, code, msg, headers, newurl):
+                cache._check_url(newurl)
+                return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+        opener = urllib.request.build_opener(CheckedRedirects)
+        request = urllib.request.Request(url, headers={"User-Agent": "mcp-diagrams-icon-cache"})
+        try:
+            with opener.open(request, timeout=self.fetch_timeout) as response:
+                length = response.headers.get("Content-Length")
+                if length and length.isdigit() and int(length) > self.max_source_bytes:
+                    raise IconError(f"Icon {url} is larger than {self.max_source_bytes} bytes")
+                raw = response.read(self.max_source_bytes + 1)
+        except (OSError, ValueError) as e:
+            raise IconError(f"Could not download icon {url}: {e}")
+        if len(raw) > self.max_source_bytes:
+            raise IconError(f"Icon {url} is larger than {self.max_source_bytes} bytes")
+        with self._lock:
+            self.downloads += 1
+        return raw
+
+    def _decode_data_uri(self, uri: str) -> bytes:
+        match = _DATA_URI.match(uri)
+        if not match:
+            raise IconError("Malformed data URI")
+        try:
+            if match.group("b64"):
+                raw = base64.b64decode(match.group("data"), validate=False)
+            else:
+                raw = urllib.parse.unquote_to_bytes(match.group("data"))
+        except ValueError as e:
+            raise IconError(f"Malformed data URI: {e}")
+        if len(raw) > self.max_source_bytes:
+            raise IconError(f"Icon data is larger than {self.max_source_bytes} bytes")
+        return raw
+
+    def _read_local(self, source: str) -> bytes:
+        path = Path(source[len("file://"):] if source.startswith("file://") else source).expanduser().resolve()
+        if self.local_root not in path.parents:
+            raise IconError(f"Icon path {source} is outside the allowed icon directory")
+        try:
+            if path.stat().st_size > self.max_source_bytes:
+                raise IconError(f"Icon {source} is larger than {self.max_source_bytes} bytes")
+            return path.read_bytes()
+        except OSError as e:
+            raise IconError(f"Could not read icon {source}: {e.strerror or e}")
+
+    def _normalize(self, raw: bytes) -> bytes:
+        from PIL import Image, UnidentifiedImageError
+
+        try:
+            image = Image.open(io.BytesIO(raw))
+            if image.width * image.height > MAX_SOURCE_PIXELS:
+                raise IconError(f"Icon is {image.width}x{image.height}, too many pixels to decode")
+            image = image.convert("RGBA")
+        except UnidentifiedImageError:
+            raise IconError("Not a supported image format")
+        except (OSError, Image.DecompressionBombError) as e:
+            raise IconError(f"Not a supported image: {e}")
+
+        image.thumbnail((self.size_px, self.size_px), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="PNG", optimize=True)
+        return output.getvalue()
+
+    def _write(self, key: str, data: bytes):
+        # Write then rename so Graphviz never reads a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.root / key)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _evict(self):
+        """Drop the least recently used icons until the store fits max_bytes, sparing the render window"""
+        in_use_since = time.time() - self.render_window
+        entries = []
+        for path in self.root.iterdir():
+            if not _KEY_PATTERN.match(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes or mtime >= in_use_since:
+                # Oldest first, so everything after this one is in use too
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "ingested": self.ingested,
+            "downloads": self.downloads,
+            "evictions": self.evictions,
+        }
+
+
+_default_cache: Optional[IconCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_icon_cache() -> IconCache:
+    """Process-wide icon cache configured from the MCP_ICON_* environment variables"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = IconCache(
+                root=os.getenv("MCP_ICON_CACHE_DIR"),
+                max_bytes=int(os.getenv("MCP_ICON_CACHE_MB", "64")) * 1024 * 1024,
+                size_px=int(os.getenv("MCP_ICON_SIZE", "256")),
+                max_source_bytes=int(os.getenv("MCP_ICON_MAX_SOURCE_MB", "5")) * 1024 * 1024,
+                fetch_timeout=float(os.getenv("MCP_ICON_FETCH_TIMEOUT", "10")),
+                local_root=os.getenv("MCP_ICON_LOCAL_ROOT"),
+                allow_private=os.getenv("MCP_ICON_ALLOW_PRIVATE", "false").lower() == "true",
+                render_window=float(os.getenv("MCP_ICON_RENDER_WINDOW", "120"))
+            )
+        return _default_cache
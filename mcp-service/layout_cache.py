@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Graphviz Layout Cache
+Keeps the node, cluster and edge positions Graphviz computed for a graph,
+keyed by the graph's topology. A later render with the same nodes and edges
+but different labels, icons or styles pins those positions and is drawn with
+`neato -n2`, which skips layout entirely and keeps the picture stable.
+Layouts can be saved to and loaded from a JSON file, e.g. the template
+library's base layouts computed at build time.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+
+def parse_graphviz_json(raw: bytes) -> Optional[Dict[str, Any]]:
+    """Positions from `-Tjson` output as {"graph", "nodes", "clusters", "edges"}; None if unusable"""
+    try:
+        data = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(data, dict) or "bb" not in data:
+        return None
+
+    layout = {
+        "graph": {k: data[k] for k in ("bb", "lp") if k in data},
+        "nodes": {},
+        "clusters": {},
+        "edges": {},
+    }
+    # Subgraphs and nodes are numbered separately; edges refer to nodes by _gvid
+    node_names = {}
+    for obj in data.get("objects", []):
+        if "pos" in obj:
+            node_names[obj["_gvid"]] = obj["name"]
+            layout["nodes"][obj["name"]] = {k: obj[k] for k in ("pos", "xlp") if k in obj}
+        elif "bb" in obj and obj.get("name", "").startswith("cluster"):
+            layout["clusters"][obj["name"]] = {k: obj[k] for k in ("bb", "lp") if k in obj}
+
+    counts: Dict[tuple, int] = {}
+    for edge in data.get("edges", []):
+        pair = (node_names.get(edge.get("tail")), node_names.get(edge.get("head")))
+        if None in pair or "pos" not in edge:
+            return None
+        occurrence = counts.get(pair, 0)
+        counts[pair] = occurrence + 1
+        layout["edges"][(*pair, occurrence)] = {
+            k: edge[k] for k in ("pos", "lp", "xlp", "head_lp", "tail_lp") if k in edge
+        }
+    return layout
+
+
+class LayoutCache:
+    """LRU of parsed layouts keyed by topology hash"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._layouts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, topology_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            layout = self._layouts.get(topology_key)
+            if layout is None:
+                self.misses += 1
+                return None
+            self._layouts.move_to_end(topology_key)
+            self.hits += 1
+            return layout
+
+    def put(self, topology_key: str, layout: Dict[str, Any]):
+        with self._lock:
+            self._layouts[topology_key] = layout
+            self._layouts.move_to_end(topology_key)
+            while len(self._layouts) > self.max_entries:
+                self._layouts.popitem(last=False)
+
+    def discard(self, topology_key: str):
+        with self._lock:
+            self._layouts.pop(topology_key, None)
+
+    def save(self, path: str, topology_keys: List[str]) -> int:
+        """Write the layouts cached for topology_keys to a JSON file; returns how many were written"""
+        with self._lock:
+            layouts = {key: self._layouts[key] for key in topology_keys if key in self._layouts}
+        data = {
+            key: {**layout, "edges": [[*edge, positions] for edge, positions in layout["edges"].items()]}
+            for key, layout in layouts.items()
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename so a concurrent load never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return len(data)
+
+    def load(self, path: str) -> int:
+        """Add the layouts from a file written by save(); returns how many were loaded"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        loaded = 0
+        for key, layout in data.items() if isinstance(data, dict) else ():
+            try:
+                edges = {(tail, head, occurrence): positions for tail, head, occurrence, positions in layout["edges"]}
+                self.put(key, {**layout, "edges": edges})
+            except (KeyError, TypeError, ValueError):
+                continue
+            loaded += 1
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._layouts),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_default_cache: Optional[LayoutCache] = None
+
+
+def get_layout_cache() -> Optional[LayoutCache]:
+    """Process-wide cache configured from MCP_LAYOUT_CACHE*; None when disabled"""
+    global _default_cache
+    if os.getenv("MCP_LAYOUT_CACHE", "true").lower() != "true":
+        return None
+    if _default_cache is None:
+        _default_cache = LayoutCache(max_entries=int(os.getenv("MCP_LAYOUT_CACHE_ENTRIES", "512")))
+    return _default_cache
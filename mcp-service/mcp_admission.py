@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+MCP Admission Control
+Per-tool concurrency limits with a bounded, deadline-aware wait queue.
+Requests that cannot start before their deadline are rejected up front so
+the wrapper degrades with HTTP 429 instead of piling up work.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+
+# Absolute monotonic deadline for the current HTTP request, set by the wrapper middleware
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call cannot be admitted before its deadline"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class _ToolLimiter:
+    """Concurrency slot accounting for a single tool"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self.waiters: deque = deque()  # (future, enqueued_at)
+        self.service_time = None  # EWMA of execution seconds
+        self.admitted = 0
+        self.rejected = 0
+
+    def record(self, seconds: float, alpha: float = 0.2):
+        if self.service_time is None:
+            self.service_time = seconds
+        else:
+            self.service_time = alpha * seconds + (1 - alpha) * self.service_time
+
+    def estimated_wait(self, position: int) -> float:
+        """Expected seconds until the request at queue position `position` gets a slot"""
+        if self.service_time is None:
+            return 0.0
+        return self.service_time * (position // self.limit + 1)
+
+
+class AdmissionController:
+    """Admits calls per tool up to a concurrency limit, queueing a bounded number of waiters"""
+
+    def __init__(self, default_limit: int = 16, tool_limits: Optional[Dict[str, int]] = None,
+                 max_queue: int = 64, max_wait: float = 10.0):
+        self.default_limit = default_limit
+        self.tool_limits = tool_limits or {}
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._limiters: Dict[str, _ToolLimiter] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(limiter.waiters) for limiter in self._limiters.values())
+
+    @property
+    def in_flight(self) -> int:
+        return sum(limiter.in_flight for limiter in self._limiters.values())
+
+    def limit_for(self, key: str) -> int:
+        """Concurrency limit that applies to `key`"""
+        return max(1, self.tool_limits.get(key, self.default_limit))
+
+    def _limiter(self, key: str) -> _ToolLimiter:
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = _ToolLimiter(self.limit_for(key))
+            self._limiters[key] = limiter
+        return limiter
+
+    def _deadline(self) -> float:
+        now = time.monotonic()
+        deadline = now + self.max_wait
+        requested = request_deadline.get()
+        return min(deadline, requested) if requested else deadline
+
+    @asynccontextmanager
+    async def admit(self, key: str):
+        """Hold a concurrency slot for `key` for the duration of the context"""
+        limiter = self._limiter(key)
+        await self._acquire(key, limiter)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            limiter.record(time.monotonic() - started)
+            self._release(limiter)
+
+    async def _acquire(self, key: str, limiter: _ToolLimiter):
+        if limiter.in_flight < limiter.limit and not limiter.waiters:
+            limiter.in_flight += 1
+            limiter.admitted += 1
+            return
+
+        now = time.monotonic()
+        deadline = self._deadline()
+        expected_wait = limiter.estimated_wait(len(limiter.waiters))
+
+        if self.queue_depth >= self.max_queue:
+            limiter.rejected += 1
+            raise AdmissionRejected(
+                f"Admission queue full ({self.max_queue} waiting)",
+                retry_after=expected_wait or 1.0
+            )
+        if now + expected_wait > deadline:
+            limiter.rejected += 1
+            raise AdmissionRejected(
+                f"'{key}' cannot start before the request deadline "
+                f"(expected wait {expected_wait:.1f}s)",
+                retry_after=expected_wait
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, now)
+        limiter.waiters.append(entry)
+        try:
+            await asyncio.wait_for(future, timeout=max(0.0, deadline - now))
+        except asyncio.TimeoutError:
+            limiter.rejected += 1
+            raise AdmissionRejected(
+                f"'{key}' waited {time.monotonic() - now:.1f}s without a free slot",
+                retry_after=limiter.estimated_wait(len(limiter.waiters)) or 1.0
+            )
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the caller went away
+                self._release(limiter)
+            raise
+        finally:
+            if entry in limiter.waiters:
+                limiter.waiters.remove(entry)
+
+        # The releasing call handed its slot over to us
+        limiter.admitted += 1
+
+    def _release(self, limiter: _ToolLimiter):
+        while limiter.waiters:
+            future, _ = limiter.waiters.popleft()
+            if not future.done():
+                # Hand the slot straight to the next waiter; in_flight stays the same
+                future.set_result(True)
+                return
+        limiter.in_flight -= 1
+
+    def scaling_metrics(self) -> Dict[str, Any]:
+        """Signals for an external autoscaler (e.g. a KEDA metrics-api scaler)"""
+        now = time.monotonic()
+        oldest = min(
+            (enqueued for limiter in self._limiters.values() for _, enqueued in limiter.waiters),
+            default=None
+        )
+        capacity = sum(limiter.limit for limiter in self._limiters.values())
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "oldest_wait_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+            "max_queue": self.max_queue,
+            "utilization": round(self.in_flight / capacity, 3) if capacity else 0.0,
+            "tools": {
+                key: {
+                    "limit": limiter.limit,
+                    "in_flight": limiter.in_flight,
+                    "queued": len(limiter.waiters),
+                    "admitted_total": limiter.admitted,
+                    "rejected_total": limiter.rejected,
+                    "avg_service_seconds": round(limiter.service_time, 4) if limiter.service_time else None
+                }
+                for key, limiter in self._limiters.items()
+            }
+        }
+
+
+def parse_tool_limits(spec: Optional[str]) -> Dict[str, int]:
+    """Parse 'tool=limit,tool=limit' into a dict"""
+    limits = {}
+    for entry in (spec or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if "=" not in entry:
+            raise ValueError(f"Invalid tool limit entry '{entry}', expected tool=limit")
+        tool_name, limit = (part.strip() for part in entry.split("=", 1))
+        limits[tool_name] = int(limit)
+    return limits
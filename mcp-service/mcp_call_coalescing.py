@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+MCP Call Coalescing
+Shares one execution between concurrent identical MCP calls and keeps a
+short-lived result cache for deterministic tools
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+
+def call_key(method: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Canonical hash of (method, tool name, arguments)"""
+    params = params or {}
+    arguments = params.get("arguments", {}) if method == "tools/call" else params
+    canonical = json.dumps(
+        {"method": method, "name": params.get("name"), "arguments": arguments},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Runs at most one execution per key; concurrent callers await the same result"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    @property
+    def inflight_count(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        # Shielded so one waiter disconnecting does not cancel the call for the others
+        return await asyncio.shield(task)
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after a fixed time-to-live"""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
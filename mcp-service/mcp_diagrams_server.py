@@ -5,9 +5,13 @@ Comprehensive access to Python diagrams library and GraphViz tools
 Supports ALL providers, advanced features, and custom styling
 """
 
+import ast
+import asyncio
+import hashlib
 import json
 import os
 import tempfile
+import time
 import traceback
 import importlib
 from typing import Dict, List, Any, Optional
@@ -16,19 +20,17 @@ from pathlib import Path
 
 # MCP Server imports
 from mcp.server import Server
-from mcp.types import Tool, TextContent
+from mcp.types import Tool, TextContent, CallToolResult
 
 # Core diagram imports
 try:
     from diagrams import Diagram, Cluster, Edge
     from diagrams.custom import Custom
     
+    from node_catalog import PROVIDERS
+    
     # Dynamic provider imports
-    AVAILABLE_PROVIDERS = [
-        'aws', 'azure', 'gcp', 'k8s', 'alibabacloud', 'digitalocean',
-        'elastic', 'firebase', 'ibm', 'oci', 'openstack', 'outscale',
-        'onprem', 'saas', 'programming', 'generic', 'c4'
-    ]
+    AVAILABLE_PROVIDERS = list(PROVIDERS)
     
     DIAGRAMS_AVAILABLE = True
     
@@ -245,7 +247,8 @@ async def list_tools() -> List[Tool]:
                 "properties": {
                     "provider": {"type": "string", "description": "Provider name (aws, azure, gcp, k8s, onprem, saas, programming)"},
                     "category": {"type": "string", "description": "Service category (compute, database, storage, etc.)"},
-                    "search_term": {"type": "string", "description": "Search for specific services"}
+                    "search_term": {"type": "string", "description": "Search for specific services"},
+                    "if_none_match": {"type": "string", "description": "catalog_version (or ETag) from an earlier call; returns only not_modified when unchanged"}
                 }
             }
         ),
@@ -278,13 +281,26 @@ async def list_tools() -> List[Tool]:
         ),
         Tool(
             name="create_cluster_diagram",
-            description="Create diagrams with advanced clustering and grouping",
+            description="Create clustered diagrams from a JSON graph spec, validated against the node catalog and compiled straight to DOT",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "cluster_config": {"type": "object", "description": "Cluster configuration"},
-                    "services": {"type": "array", "description": "Services to include"},
-                    "connections": {"type": "array", "description": "Service connections"}
+                    "cluster_config": {
+                        "type": "object",
+                        "description": "Graph settings: title, direction (TB/BT/LR/RL), curvestyle, graph_attr/node_attr/edge_attr and clusters [{id, label, parent, direction, graph_attr}]"
+                    },
+                    "services": {
+                        "type": "array",
+                        "items": {"type": "object"},
+                        "description": "Nodes: [{id, class (e.g. azure.compute.AppServices) or icon (URL, data URI or path), label, cluster, attrs}]"
+                    },
+                    "connections": {
+                        "type": "array",
+                        "items": {"type": "object"},
+                        "description": "Edges: [{from, to, label, color, style, direction (forward/back/both/none), attrs}]"
+                    },
+                    "format": {"type": "string", "enum": ["png", "svg", "pdf", "dot"], "description": "Output format; dot returns the DOT source"},
+                    "output_path": {"type": "string", "description": "Optional output file path"}
                 },
                 "required": ["cluster_config", "services"]
             }
@@ -297,7 +313,12 @@ async def list_tools() -> List[Tool]:
                 "properties": {
                     "providers": {"type": "array", "items": {"type": "string"}, "description": "List of providers to include"},
                     "architecture_description": {"type": "string", "description": "Multi-cloud architecture description"},
-                    "hybrid_components": {"type": "array", "description": "On-prem/hybrid components"}
+                    "hybrid_components": {
+                        "type": "array",
+                        "description": "On-prem/hybrid components: service keywords or class names, or {name|class, label}"
+                    },
+                    "format": {"type": "string", "enum": ["png", "svg", "pdf", "dot"], "description": "Output format; dot returns the DOT source"},
+                    "output_path": {"type": "string", "description": "Optional output file path"}
                 },
                 "required": ["providers", "architecture_description"]
             }
@@ -308,9 +329,23 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "custom_nodes": {"type": "array", "description": "Custom node definitions"},
-                    "icon_urls": {"type": "array", "description": "URLs or paths to custom icons"},
-                    "base_diagram_code": {"type": "string", "description": "Base diagram code"}
+                    "custom_nodes": {
+                        "type": "array",
+                        "description": "Custom nodes: labels, or {id, label, icon, icon_index, cluster, attrs}"
+                    },
+                    "icon_urls": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Icons (http(s) URLs, data URIs or local paths) matched to custom_nodes by position"
+                    },
+                    "base_diagram_code": {"type": "string", "description": "Base diagram code the custom nodes are added to (compiled, not executed)"},
+                    "connections": {
+                        "type": "array",
+                        "items": {"type": "object"},
+                        "description": "Edges: [{from, to, label, color, style, direction}]; ends are custom node ids or base code variables"
+                    },
+                    "format": {"type": "string", "enum": ["png", "svg", "pdf", "dot"], "description": "Output format; dot returns the DOT source"},
+                    "output_path": {"type": "string", "description": "Optional output file path"}
                 },
                 "required": ["custom_nodes"]
             }
@@ -323,24 +358,88 @@ async def list_tools() -> List[Tool]:
                 "properties": {
                     "dot_code": {"type": "string", "description": "GraphViz DOT notation code"},
                     "layout_engine": {"type": "string", "enum": ["dot", "neato", "fdp", "sfdp", "circo", "twopi"], "description": "GraphViz layout engine"},
-                    "output_format": {"type": "string", "enum": ["png", "svg", "pdf", "ps"], "description": "Output format"}
+                    "output_format": {"type": "string", "enum": ["png", "svg", "pdf", "ps"], "description": "Output format"},
+                    "output_formats": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["png", "svg", "pdf", "ps"]},
+                        "description": "Several output formats rendered from a single layout pass (overrides output_format)"
+                    }
                 },
                 "required": ["dot_code"]
             }
         ),
+        Tool(
+            name="batch_render_diagrams",
+            description="Render many diagrams (diagrams code or DOT) with one Graphviz invocation per chunk; returns per-item results",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "string", "description": "Caller's identifier, echoed in the result"},
+                                "code": {"type": "string", "description": "Python diagrams code"},
+                                "dot_code": {"type": "string", "description": "GraphViz DOT source"}
+                            }
+                        },
+                        "description": "Diagrams to render; each item has either code or dot_code"
+                    },
+                    "format": {"type": "string", "enum": ["png", "svg", "pdf"], "description": "Output format"},
+                    "layout_engine": {"type": "string", "enum": ["dot", "neato", "fdp", "sfdp", "circo", "twopi"], "description": "Layout engine for dot_code items"}
+                },
+                "required": ["items"]
+            }
+        ),
         Tool(
             name="export_diagram_templates",
-            description="Export reusable diagram templates and patterns",
+            description="Render a pre-rendered architecture template (3-tier-web, microservices, serverless, event-driven, data-platform) with optional customizations",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "template_type": {"type": "string", "description": "Template type (microservices, serverless, etc.)"},
-                    "provider": {"type": "string", "description": "Target provider"},
-                    "customizations": {"type": "object", "description": "Template customizations"}
+                    "template_type": {"type": "string", "description": "Template type (3-tier-web, microservices, serverless, event-driven, data-platform)"},
+                    "provider": {"type": "string", "enum": ["azure", "aws", "gcp"], "description": "Target provider (default: azure)"},
+                    "customizations": {
+                        "type": "object",
+                        "properties": {
+                            "title": {"type": "string"},
+                            "direction": {"type": "string", "enum": ["TB", "BT", "LR", "RL"]},
+                            "labels": {"type": "object", "description": "New label per template node id"},
+                            "classes": {"type": "object", "description": "Role or provider.category.Class per template node id"},
+                            "add_nodes": {"type": "array", "items": {"type": "object"}, "description": "Graph spec nodes; a node may give a role instead of a class"},
+                            "add_edges": {"type": "array", "items": {"type": "object"}, "description": "Graph spec edges"},
+                            "remove_nodes": {"type": "array", "items": {"type": "string"}, "description": "Template node ids to drop with their edges"}
+                        },
+                        "description": "Template customizations; relabelling or reclassing nodes reuses the pre-rendered layout"
+                    },
+                    "format": {"type": "string", "enum": ["png", "svg", "pdf", "dot"], "description": "Output format"},
+                    "output_path": {"type": "string", "description": "Output file path (optional)"}
                 },
                 "required": ["template_type"]
             }
         ),
+        Tool(
+            name="run_pipeline",
+            description="Run suggest -> auto_fix -> validate -> render in one call, passing structured results between steps",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "description": {"type": "string", "description": "Architecture description (used by the suggest step)"},
+                    "code": {"type": "string", "description": "Starting diagram code; the suggest step is skipped when provided"},
+                    "steps": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["suggest", "auto_fix", "validate", "render"]},
+                        "description": "Steps to run in order (default: all)"
+                    },
+                    "provider": {"type": "string", "description": "Target provider (default: azure)"},
+                    "complexity_level": {"type": "string", "enum": ["simple", "medium", "complex"], "description": "Diagram complexity"},
+                    "format": {"type": "string", "enum": ["png", "svg", "pdf"], "description": "Output format for the render step"},
+                    "theme": {"type": "string", "description": "Visual theme/style"},
+                    "stop_on_invalid": {"type": "boolean", "description": "Skip rendering when validation reports errors"}
+                }
+            }
+        ),
         Tool(
             name="validate_azure_components",
             description="Validate Azure component names against the diagrams library",
@@ -351,11 +450,41 @@ async def list_tools() -> List[Tool]:
                         "type": "array",
                         "items": {"type": "string"},
                         "description": "List of Azure component names to validate"
+                    },
+                    "min_score": {
+                        "type": "number",
+                        "minimum": 0,
+                        "maximum": 1,
+                        "description": "Lowest score (0-1) a suggestion for an invalid name needs (default 0.5)"
                     }
                 },
                 "required": ["component_names"]
             }
         ),
+        Tool(
+            name="lint_diagram_corpus",
+            description="Bulk-validate many diagram programs' Azure imports against the component catalog; returns per-file issues and the most frequent mistakes",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "source": {"type": "string", "description": "Directory of .py programs or NDJSON file of {id, code} records, relative to the server's MCP_LINT_ROOT"},
+                    "programs": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "string"},
+                                "code": {"type": "string"}
+                            }
+                        },
+                        "description": "Programs to lint instead of a source path"
+                    },
+                    "threshold": {"type": "number", "minimum": 0, "maximum": 1, "description": "Lowest similarity a suggestion needs (default 0.5)"},
+                    "top": {"type": "integer", "minimum": 1, "description": "Rows in the most-frequent-mistakes table (default 20)"},
+                    "include_clean": {"type": "boolean", "description": "Also list files without issues"}
+                }
+            }
+        ),
         Tool(
             name="suggest_architecture_components",
             description="Suggest validated Azure components based on architecture description",
@@ -397,7 +526,24 @@ async def list_tools() -> List[Tool]:
     ]
 
 @app.call_tool()
-async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
+    """Run a tool and report its execution time and render cache lookups in the result's _meta"""
+    from render_cache import render_cache_events
+    
+    started = time.perf_counter()
+    cache_events = []
+    token = render_cache_events.set(cache_events)
+    try:
+        content = await dispatch_tool(name, arguments)
+    finally:
+        render_cache_events.reset(token)
+    
+    meta = {"timings": {"tool_execution_ms": round((time.perf_counter() - started) * 1000, 3)}}
+    if cache_events:
+        meta["render_cache"] = cache_events
+    return CallToolResult(content=content, isError=False, _meta=meta)
+
+async def dispatch_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Enhanced tool call handler with comprehensive functionality"""
     
     try:
@@ -422,7 +568,8 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             result = get_available_services(
                 arguments.get("provider"),
                 arguments.get("category"),
-                arguments.get("search_term")
+                arguments.get("search_term"),
+                arguments.get("if_none_match")
             )
             return [TextContent(type="text", text=json.dumps(result, indent=2))]
         
@@ -444,54 +591,94 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             return [TextContent(type="text", text=json.dumps(result, indent=2))]
         
         elif name == "create_cluster_diagram":
-            result = create_cluster_diagram(
+            result = await create_cluster_diagram(
                 arguments["cluster_config"],
                 arguments["services"],
-                arguments.get("connections", [])
+                arguments.get("connections", []),
+                arguments.get("format", "png"),
+                arguments.get("output_path")
             )
             return [TextContent(type="text", text=json.dumps(result, indent=2))]
         
         elif name == "generate_multi_provider_diagram":
-            result = generate_multi_provider_diagram(
+            result = await generate_multi_provider_diagram(
                 arguments["providers"],
                 arguments["architecture_description"],
-                arguments.get("hybrid_components", [])
+                arguments.get("hybrid_components", []),
+                arguments.get("format", "png"),
+                arguments.get("output_path")
             )
             return [TextContent(type="text", text=json.dumps(result, indent=2))]
         
         elif name == "create_custom_node_diagram":
-            result = create_custom_node_diagram(
+            result = await create_custom_node_diagram(
                 arguments["custom_nodes"],
                 arguments.get("icon_urls", []),
-                arguments.get("base_diagram_code", "")
+                arguments.get("base_diagram_code", ""),
+                arguments.get("connections", []),
+                arguments.get("format", "png"),
+                arguments.get("output_path")
             )
             return [TextContent(type="text", text=json.dumps(result, indent=2))]
         
         elif name == "generate_graphviz_diagram":
-            result = generate_graphviz_diagram(
+            result = await generate_graphviz_diagram(
                 arguments["dot_code"],
                 arguments.get("layout_engine", "dot"),
-                arguments.get("output_format", "png")
+                arguments.get("output_format", "png"),
+                arguments.get("output_formats")
+            )
+            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        
+        elif name == "batch_render_diagrams":
+            result = await batch_render_diagrams(
+                arguments["items"],
+                arguments.get("format", "png"),
+                arguments.get("layout_engine", "dot")
             )
             return [TextContent(type="text", text=json.dumps(result, indent=2))]
         
         elif name == "export_diagram_templates":
-            result = export_diagram_templates(
+            result = await export_diagram_templates(
                 arguments["template_type"],
                 arguments.get("provider"),
-                arguments.get("customizations", {})
+                arguments.get("customizations", {}),
+                arguments.get("format", "png"),
+                arguments.get("output_path")
             )
             return [TextContent(type="text", text=json.dumps(result, indent=2))]
         
+        elif name == "run_pipeline":
+            result = await run_pipeline(arguments)
+            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        
         elif name == "validate_azure_components":
             try:
                 from enhanced_azure_validator import validate_component_names
-                result = validate_component_names(arguments["component_names"])
+                result = validate_component_names(arguments["component_names"], arguments.get("min_score"))
                 return [TextContent(type="text", text=json.dumps(result, indent=2))]
             except ImportError:
                 error_result = {"success": False, "error": "Azure validator not available"}
                 return [TextContent(type="text", text=json.dumps(error_result, indent=2))]
         
+        elif name == "lint_diagram_corpus":
+            result = await lint_diagram_corpus(
+                arguments.get("source"),
+                arguments.get("programs"),
+                arguments.get("threshold", 0.5),
+                arguments.get("top", 20),
+                arguments.get("include_clean", False)
+            )
+            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        
+        elif name == "reload_catalog":
+            # Admin call from the HTTP wrapper; not listed in list_tools
+            from azure_catalog import reload_azure_catalog
+            
+            result = await asyncio.to_thread(reload_azure_catalog, bool(arguments.get("force", False)))
+            result["catalog_version"] = catalog_version()
+            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        
         elif name == "suggest_architecture_components":
             try:
                 from enhanced_azure_validator import suggest_architecture_components
@@ -561,7 +748,7 @@ async def validate_diagram_code(code: str, provider: str = "auto", architecture_
         advanced_features = detect_advanced_features(code)
         
         # Provider-specific validation
-        if detected_provider and detected_provider in PROVIDER_SERVICE_MAPPINGS:
+        if detected_provider:
             provider_suggestions = validate_provider_services(code, detected_provider)
             suggestions.extend(provider_suggestions)
         
@@ -598,29 +785,104 @@ async def validate_diagram_code(code: str, provider: str = "auto", architecture_
             "explanation": f"Validation failed with {len(errors)} errors"
         }
 
-def get_available_services(provider: str = None, category: str = None, search_term: str = None) -> Dict[str, Any]:
+def catalog_version() -> str:
+    """Hash of everything get_available_services lists; changes when the Azure catalog is reloaded"""
+    from azure_catalog import get_azure_catalog
+    
+    return _catalog_version(get_azure_catalog())
+
+def _catalog_version(azure_catalog) -> str:
+    def build(azure_catalog) -> str:
+        from node_catalog import get_node_catalog
+        
+        node_catalog = get_node_catalog()
+        digest = hashlib.sha256()
+        digest.update(azure_catalog.source_sha256.encode())
+        digest.update(node_catalog.diagrams_version.encode())
+        digest.update(",".join(node_catalog.providers).encode())
+        digest.update(json.dumps(PROVIDER_SERVICE_MAPPINGS, sort_keys=True).encode())
+        return digest.hexdigest()[:16]
+    
+    # Cached on the catalog snapshot, so a reload brings a new version with it
+    return azure_catalog.derived("service_catalog_version", build)
+
+def etag_matches(if_none_match: Optional[str], version: str) -> bool:
+    """Whether an If-None-Match value (a bare version, "*", or a list of possibly weak ETags) names version"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == version:
+            return True
+    return False
+
+def get_available_services(provider: str = None, category: str = None, search_term: str = None,
+                           if_none_match: str = None) -> Dict[str, Any]:
     """Get comprehensive service listings across all providers"""
+    from azure_catalog import get_azure_catalog
+    from node_catalog import get_node_catalog
     
-    if provider and provider not in PROVIDER_SERVICE_MAPPINGS:
+    # One catalog snapshot for the whole listing, even if a reload swaps in another meanwhile
+    azure_catalog = get_azure_catalog()
+    version = _catalog_version(azure_catalog)
+    if etag_matches(if_none_match, version):
+        return {"not_modified": True, "catalog_version": version}
+    
+    catalog = get_node_catalog()
+    providers = sorted(set(PROVIDER_SERVICE_MAPPINGS) | set(catalog.providers))
+    if provider and provider not in providers:
         return {
             "error": f"Provider '{provider}' not supported",
-            "available_providers": list(PROVIDER_SERVICE_MAPPINGS.keys())
+            "available_providers": providers
         }
     
     result = {}
     
     if provider:
-        services = PROVIDER_SERVICE_MAPPINGS[provider]
+        services = PROVIDER_SERVICE_MAPPINGS.get(provider, {})
         if search_term:
             services = {k: v for k, v in services.items() if search_term.lower() in k.lower()}
         result[provider] = services
     else:
         result = PROVIDER_SERVICE_MAPPINGS.copy()
     
+    # Every installed node class, from the prebuilt catalog, once the listing is narrowed down
+    if provider or category or search_term:
+        classes: Dict[str, Dict[str, List[str]]] = {}
+        term = (search_term or "").lower()
+        for node in catalog.nodes:
+            if ((provider and node.provider != provider) or (category and node.category != category)
+                    or (term and term not in node.name.lower())):
+                continue
+            classes.setdefault(node.provider, {}).setdefault(node.category or node.provider, []).append(node.name)
+        result["classes"] = classes
+    
+    # Names azure_nodes.json accepts besides the class names
+    if provider == "azure":
+        term = (search_term or "").lower()
+        result["aliases"] = {
+            alias: canonical for alias, canonical in azure_catalog.alias_map.items()
+            if not term or term in alias.lower() or term in canonical.lower()
+        }
+        # Misspelling -> class name table the backend's auto-fix uses, so it follows catalog reloads
+        result["common_mistakes"] = {
+            mistake: canonical for mistake, canonical in azure_catalog.common_mistakes.items()
+            if not term or term in mistake.lower() or term in canonical.lower()
+        }
+    
+    result["catalog_version"] = version
+    
     # Add metadata
     result["metadata"] = {
-        "total_providers": len(PROVIDER_SERVICE_MAPPINGS),
+        "total_providers": len(providers),
         "total_services": sum(len(services) for services in PROVIDER_SERVICE_MAPPINGS.values()),
+        "total_classes": len(catalog.nodes),
+        "diagrams_version": catalog.diagrams_version,
+        "azure_components": len(azure_catalog.components),
         "supported_features": [
             "Multi-provider diagrams",
             "Custom nodes and icons", 
@@ -660,42 +922,93 @@ def detect_advanced_features(code: str) -> List[str]:
     
     return features
 
+async def lint_diagram_corpus(source: str = None, programs: List[Dict] = None, threshold: float = 0.5,
+                              top: int = 20, include_clean: bool = False) -> Dict[str, Any]:
+    """Lint a corpus of diagram programs against the Azure catalog (see catalog_lint.py)"""
+    from catalog_lint import lint_corpus
+    
+    if (source is None) == (programs is None):
+        return {"success": False, "error": "Give exactly one of source or programs"}
+    
+    # Over MCP a source path must lie under the configured corpus root; the CLI takes any path
+    root = None
+    if source is not None:
+        root = os.getenv("MCP_LINT_ROOT")
+        if not root:
+            return {"success": False, "error": "Linting a source path is disabled; set MCP_LINT_ROOT or pass programs"}
+        root = os.path.realpath(root)
+        source = os.path.realpath(os.path.join(root, source))
+        if os.path.commonpath([root, source]) != root:
+            return {"success": False, "error": "Source must be inside MCP_LINT_ROOT"}
+        if not os.path.exists(source):
+            return {"success": False, "error": "Source not found"}
+    
+    workers = int(os.getenv("MCP_LINT_WORKERS", str(os.cpu_count() or 1)))
+    # Parsing and scoring run in worker processes; keep the event loop free while they do
+    return await asyncio.to_thread(
+        lint_corpus, source, programs, workers, threshold, top, include_clean, root=root
+    )
+
 def validate_imports(code: str) -> List[str]:
     """Validate all import statements in the code"""
     import_errors = []
     
+    from diagram_compiler import check_diagrams_import
+    from node_catalog import get_node_catalog
+    
+    catalog = get_node_catalog()
+    
     # Extract import statements
     import_lines = [line.strip() for line in code.split('\n') if line.strip().startswith('from diagrams')]
     
+    # Checked against the diagrams sources instead of executing the line
     for line in import_lines:
         try:
-            exec(line)
-        except ImportError as e:
-            import_errors.append(f"Import error in '{line}': {str(e)}")
-        except Exception as e:
+            statements = ast.parse(line).body
+        except SyntaxError as e:
             import_errors.append(f"Error in '{line}': {str(e)}")
+            continue
+        
+        for statement in statements:
+            if not isinstance(statement, ast.ImportFrom):
+                import_errors.append(f"Error in '{line}': only import statements are allowed")
+                break
+            module = statement.module or ""
+            names = [alias.name for alias in statement.names]
+            # Provider modules are looked up in the prebuilt catalog; the rest are scanned from the sources
+            error = catalog.check_import(module, names) if catalog.covers(module) else check_diagrams_import(module, names)
+            if error:
+                import_errors.append(f"Import error in '{line}': {error}")
+                break
     
     return import_errors
 
 def validate_provider_services(code: str, provider: str) -> List[str]:
     """Validate services used match the provider's available services"""
+    from node_catalog import get_node_catalog
+    
     suggestions = []
+    catalog = get_node_catalog()
+    if provider not in catalog.providers:
+        return suggestions
     
-    if provider in PROVIDER_SERVICE_MAPPINGS:
-        available_services = PROVIDER_SERVICE_MAPPINGS[provider]
-        
-        # Check for common misnamed services
-        for service_name in available_services:
-            variations = [
-                service_name.replace('_', ''),
-                service_name.replace('_', ' '),
-                service_name.title(),
-                service_name.upper()
-            ]
-            
-            for variation in variations:
-                if variation in code and service_name not in code:
-                    suggestions.append(f"Consider using '{service_name}' instead of '{variation}'")
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return suggestions
+    
+    # Names imported from the wrong category or with the wrong case, and where they actually live
+    prefix = f"diagrams.{provider}"
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ImportFrom) or not (node.module or "").startswith(prefix):
+            continue
+        for alias in node.names:
+            if catalog.resolve(node.module, alias.name) or f"{node.module}.{alias.name}" in catalog.exports:
+                continue
+            found = catalog.find(alias.name, provider)
+            if found:
+                places = ", ".join(sorted({f"{n.module}.{n.name}" for n in found}))
+                suggestions.append(f"'{alias.name}' is not in {node.module}; use {places}")
     
     return suggestions
 
@@ -758,27 +1071,123 @@ def generate_sample_code_advanced(services: List[Dict], connections: List[str],
     
     return "\n".join(code_lines)
 
+def _diagram_artifact_result(diagram_data: bytes, format: str, output_path: str = None, **extra) -> Dict[str, Any]:
+    """Hand rendered bytes to the caller via the artifact store (and output_path if requested)"""
+    from artifact_store import get_artifact_store
+    
+    store = get_artifact_store()
+    key = store.put(diagram_data, format)
+    result = {
+        "success": True,
+        **store.describe(key),
+        "size_bytes": len(diagram_data),
+    }
+    
+    # An explicit output_path is the caller's own location, so it is written but never cleaned up
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(diagram_data)
+        result["output_path"] = output_path
+    
+    result.update({k: v for k, v in extra.items() if v is not None})
+    return result
+
+async def _render_compiled(code: str, format: str) -> Dict[str, Any]:
+    """Render via the exec-free compiler; {"fallback": reason} when the code needs the exec path"""
+    from diagram_compiler import UnsupportedDiagramCode, compile_diagram
+    
+    started = time.perf_counter()
+    try:
+        diagram = compile_diagram(code)
+    except UnsupportedDiagramCode as e:
+        return {"success": False, "fallback": str(e)}
+    
+    result = await _render_graph(diagram, lambda layout: compile_diagram(code, layout), format)
+    if result.get("success"):
+        result["render_seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+async def _render_graph(diagram, rebuild, format: str) -> Dict[str, Any]:
+    """Lay out and draw a compiled graph, reusing a cached layout when its topology was seen before
+    
+    rebuild(layout) must compile the same graph again with that layout's positions pinned on.
+    """
+    from graphviz_layout_pool import LayoutError, get_layout_pool
+    from layout_cache import get_layout_cache, parse_graphviz_json
+    
+    started = time.perf_counter()
+    pool = get_layout_pool()
+    layouts = get_layout_cache()
+    topology_key = diagram.topology_key()
+    
+    # Same nodes and edges as an earlier render: pin its positions and skip layout
+    layout = layouts.get(topology_key) if layouts else None
+    if layout:
+        try:
+            outputs = await pool.render(rebuild(layout).dot.source, "neato", [format], options=["-n2"])
+            return {
+                "success": True,
+                "data": outputs[format],
+                "renderer": "compiled",
+                "layout": "reused",
+                "render_seconds": round(time.perf_counter() - started, 4)
+            }
+        except LayoutError:
+            layouts.discard(topology_key)
+    
+    try:
+        # The json output carries the computed positions and comes from the same layout pass
+        formats = [format, "json"] if layouts and format != "json" else [format]
+        outputs = await pool.render(diagram.dot.source, "dot", formats)
+    except LayoutError as e:
+        return {"success": False, "error": f"Failed to generate diagram: {str(e)}", "renderer": "compiled"}
+    
+    if layouts and "json" in outputs:
+        parsed = parse_graphviz_json(outputs["json"])
+        if parsed:
+            layouts.put(topology_key, parsed)
+    
+    return {
+        "success": True,
+        "data": outputs[format],
+        "renderer": "compiled",
+        "layout": "computed",
+        "render_seconds": round(time.perf_counter() - started, 4)
+    }
+
 # Additional helper functions for the enhanced features...
 async def generate_diagram(code: str, output_path: str = None, format: str = "png", theme: str = None) -> Dict[str, Any]:
     """Enhanced diagram generation with multiple formats and themes"""
     try:
-        # Create unique output path if not provided
-        if not output_path:
-            import uuid
-            output_path = f"/tmp/diagram_{uuid.uuid4().hex}.{format}"
+        from render_cache import get_render_cache
+        from render_worker_pool import get_render_pool
         
-        # Prepare environment for code execution
-        import os
-        import sys
-        from io import StringIO
-        import tempfile
+        # Identical code (ignoring comments, whitespace and filename=) renders to identical bytes
+        cache = get_render_cache()
+        if cache:
+            cached, tier = cache.get(code, format, theme)
+            if cached is not None:
+                return _diagram_artifact_result(cached, format, output_path, render_cache=tier)
         
-        # Create a temporary directory for diagram generation
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create the full path for the diagram
-            diagram_filename = f"diagram.{format}"
-            full_output_path = os.path.join(temp_dir, diagram_filename)
-            
+        # Most generated code is plain Diagram/Cluster/node/edge statements; compile it to DOT
+        # and run Graphviz directly instead of executing it
+        compiler_fallback = None
+        if os.getenv("MCP_DIAGRAM_COMPILER", "true").lower() == "true":
+            compiled = await _render_compiled(code, format)
+            compiler_fallback = compiled.get("fallback")
+            if not compiler_fallback:
+                if compiled.get("success"):
+                    diagram_data = compiled.pop("data")
+                    if cache:
+                        cache.put(code, format, theme, diagram_data)
+                    return _diagram_artifact_result(
+                        diagram_data, format, output_path,
+                        render_cache="miss" if cache else None, **compiled
+                    )
+                return compiled
+        
+        # Each render gets its own working directory; the code runs in a sandboxed worker process
+        with tempfile.TemporaryDirectory(prefix="mcp-render-") as temp_dir:
             # Use forward slashes for cross-platform compatibility
             temp_dir_safe = temp_dir.replace('\\', '/')
             diagram_path_safe = f"{temp_dir_safe}/diagram"
@@ -810,89 +1219,138 @@ async def generate_diagram(code: str, output_path: str = None, format: str = "pn
                             break
                     modified_code = '\n'.join(lines)
             
-            # Capture stdout/stderr
-            old_stdout = sys.stdout
-            old_stderr = sys.stderr
-            stdout_capture = StringIO()
-            stderr_capture = StringIO()
+            render = await get_render_pool().render(modified_code, format, temp_dir)
+            if not render.get("success"):
+                render.pop("output_file", None)
+                if compiler_fallback:
+                    render["compiler_fallback"] = compiler_fallback
+                return render
             
-            try:
-                sys.stdout = stdout_capture
-                sys.stderr = stderr_capture
-                
-                # Execute the diagram code
-                exec(modified_code, {'__name__': '__main__'})
-                
-                # Check if diagram file was created
-                expected_file = os.path.join(temp_dir, f"diagram.{format}")
-                if os.path.exists(expected_file):
-                    # Read the generated file
-                    with open(expected_file, 'rb') as f:
-                        diagram_data = f.read()
-                    
-                    # If output_path was provided, save there too
-                    if output_path and output_path != expected_file:
-                        with open(output_path, 'wb') as f:
-                            f.write(diagram_data)
-                    
-                    return {
-                        "success": True,
-                        "output_path": expected_file,
-                        "format": format,
-                        "size_bytes": len(diagram_data),
-                        "stdout": stdout_capture.getvalue(),
-                        "stderr": stderr_capture.getvalue()
-                    }
-                else:
-                    # Check for other possible output files
-                    generated_files = [f for f in os.listdir(temp_dir) if f.endswith(f'.{format}')]
-                    if generated_files:
-                        actual_file = os.path.join(temp_dir, generated_files[0])
-                        with open(actual_file, 'rb') as f:
-                            diagram_data = f.read()
-                        
-                        return {
-                            "success": True,
-                            "output_path": actual_file,
-                            "format": format,
-                            "size_bytes": len(diagram_data),
-                            "stdout": stdout_capture.getvalue(),
-                            "stderr": stderr_capture.getvalue()
-                        }
-                    else:
-                        return {
-                            "success": False,
-                            "error": "No diagram file was generated",
-                            "stdout": stdout_capture.getvalue(),
-                            "stderr": stderr_capture.getvalue(),
-                            "temp_dir_contents": os.listdir(temp_dir)
-                        }
-                        
-            finally:
-                sys.stdout = old_stdout
-                sys.stderr = old_stderr
+            with open(render["output_file"], 'rb') as f:
+                diagram_data = f.read()
+            
+            if cache:
+                cache.put(code, format, theme, diagram_data)
+            
+            return _diagram_artifact_result(
+                diagram_data,
+                format,
+                output_path,
+                stdout=render.get("stdout", ""),
+                stderr=render.get("stderr", ""),
+                render_seconds=render.get("render_seconds"),
+                render_cache="miss" if cache else None,
+                renderer="exec",
+                compiler_fallback=compiler_fallback
+            )
                 
     except Exception as e:
         return {
             "success": False,
             "error": f"Failed to generate diagram: {str(e)}",
-            "stdout": stdout_capture.getvalue() if 'stdout_capture' in locals() else "",
-            "stderr": stderr_capture.getvalue() if 'stderr_capture' in locals() else ""
+            "stdout": "",
+            "stderr": ""
         }
 
+async def batch_render_diagrams(items: List[Dict[str, Any]], format: str = "png",
+                                layout_engine: str = "dot") -> Dict[str, Any]:
+    """Render a list of diagrams code / DOT items, batching every Graphviz-bound item per engine"""
+    from diagram_compiler import UnsupportedDiagramCode, compile_to_dot
+    from graphviz_layout_pool import LayoutError, get_layout_pool
+    from render_cache import get_render_cache
+    
+    max_items = int(os.getenv("MCP_BATCH_RENDER_MAX_ITEMS", "500"))
+    if len(items) > max_items:
+        return {"success": False, "error": f"Batch of {len(items)} items exceeds the limit of {max_items}"}
+    
+    started = time.perf_counter()
+    cache = get_render_cache()
+    use_compiler = os.getenv("MCP_DIAGRAM_COMPILER", "true").lower() == "true"
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    pending: Dict[str, List[tuple]] = {}  # engine -> [(index, dot_source, code)]
+    exec_items = []
+    
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"success": False, "error": f"Item must be an object, got {type(item).__name__}"}
+            continue
+        code = item.get("code")
+        if item.get("dot_code"):
+            error = client_dot_error(item["dot_code"])
+            if error:
+                results[index] = {"success": False, "error": error}
+            else:
+                pending.setdefault(layout_engine, []).append((index, item["dot_code"], None))
+        elif not code:
+            results[index] = {"success": False, "error": "Item needs either code or dot_code"}
+        elif not use_compiler:
+            exec_items.append(index)
+        else:
+            try:
+                dot_source = compile_to_dot(code)
+            except UnsupportedDiagramCode:
+                # generate_diagram takes it from here: cache, then the sandboxed exec path
+                exec_items.append(index)
+                continue
+            cached, tier = cache.get(code, format) if cache else (None, None)
+            if cached is not None:
+                results[index] = _diagram_artifact_result(cached, format, render_cache=tier)
+            else:
+                pending.setdefault("dot", []).append((index, dot_source, code))
+    
+    invocations = 0
+    for engine, entries in pending.items():
+        try:
+            rendered = await get_layout_pool().render_batch([dot for _, dot, _ in entries], engine, format)
+        except LayoutError as e:
+            rendered = [{"success": False, "error": str(e)}] * len(entries)
+        invocations += -(-len(entries) // get_layout_pool().batch_size)
+        
+        for (index, _, code), outcome in zip(entries, rendered):
+            if not outcome["success"]:
+                results[index] = {"success": False, "error": f"Failed to generate diagram: {outcome['error']}"}
+                continue
+            if code is not None and cache:
+                cache.put(code, format, None, outcome["data"])
+            results[index] = _diagram_artifact_result(
+                outcome["data"], format,
+                renderer="compiled" if code is not None else "graphviz",
+                render_cache="miss" if code is not None and cache else None
+            )
+    
+    if exec_items:
+        exec_results = await asyncio.gather(*(generate_diagram(items[i]["code"], format=format) for i in exec_items))
+        for index, result in zip(exec_items, exec_results):
+            results[index] = result
+    
+    for item, result in zip(items, results):
+        if isinstance(item, dict) and item.get("id") is not None:
+            result["id"] = item["id"]
+    
+    failed = sum(1 for result in results if not result.get("success"))
+    return {
+        "success": True,
+        "count": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "graphviz_invocations": invocations,
+        "render_seconds": round(time.perf_counter() - started, 4),
+        "results": results
+    }
+
 def suggest_diagram_structure(description: str, provider_preference: str = None, 
                             architecture_type: str = None, complexity_level: str = "medium") -> Dict[str, Any]:
     """AI-powered structure suggestions based on description and preferences with validated components"""
     try:
         # Import the enhanced validator
-        from enhanced_azure_validator import AzureComponentValidator
+        from enhanced_azure_validator import get_validator
         
         # Set default provider
         provider = provider_preference or "azure"
         
         if provider == "azure":
             # Use the enhanced validator for Azure components
-            validator = AzureComponentValidator()
+            validator = get_validator()
             suggestions = validator.suggest_components_for_architecture(description, provider)
             
             if suggestions["components"]:
@@ -1004,31 +1462,380 @@ with Diagram("{description[:50]}...", show=False, direction="TB"):
         ]
     }
 
-def create_cluster_diagram(cluster_config: Dict, services: List, connections: List = None) -> Dict[str, Any]:
-    """Create advanced clustered diagrams"""
-    # Implementation for cluster-based diagrams
-    pass
+# Composite pipeline: each step reads and updates a shared structured state
+async def _pipeline_suggest(state: Dict[str, Any]) -> Dict[str, Any]:
+    if state.get("code"):
+        return {"skipped": True, "reason": "diagram code provided"}
+    if not state.get("description"):
+        raise ValueError("description is required when no code is provided")
+    
+    result = suggest_diagram_structure(
+        state["description"],
+        state["provider"],
+        None,
+        state["complexity_level"]
+    )
+    state["code"] = result.get("diagram_code", "")
+    state["components_used"] = result.get("components_detected", [])
+    state["suggestions"].extend(result.get("suggestions", []))
+    return result
+
+async def _pipeline_auto_fix(state: Dict[str, Any]) -> Dict[str, Any]:
+    result = auto_fix_diagram_code(state["code"], state["provider"], state.get("description", ""))
+    state["code"] = result["fixed_code"]
+    return {"fixes_applied": result["fixes_applied"], "changes_made": result["changes_made"]}
+
+async def _pipeline_validate(state: Dict[str, Any]) -> Dict[str, Any]:
+    result = await validate_diagram_code(state["code"], state["provider"], state.get("description", ""))
+    state["is_valid"] = result["is_valid"]
+    # corrected_code mirrors the input and would only bloat the pipeline result
+    return {k: v for k, v in result.items() if k != "corrected_code"}
+
+async def _pipeline_render(state: Dict[str, Any]) -> Dict[str, Any]:
+    if state.get("stop_on_invalid") and state.get("is_valid") is False:
+        return {"skipped": True, "reason": "validation failed"}
+    return await generate_diagram(state["code"], None, state["format"], state.get("theme"))
+
+PIPELINE_STEPS = {
+    "suggest": _pipeline_suggest,
+    "auto_fix": _pipeline_auto_fix,
+    "validate": _pipeline_validate,
+    "render": _pipeline_render,
+}
+
+async def run_pipeline(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Run several tools inside one server call without re-parsing intermediate text"""
+    steps = arguments.get("steps") or list(PIPELINE_STEPS)
+    unknown = [step for step in steps if step not in PIPELINE_STEPS]
+    if unknown:
+        return {"success": False, "error": f"Unknown pipeline steps: {unknown}", "available_steps": list(PIPELINE_STEPS)}
+    
+    state = {
+        "description": arguments.get("description", ""),
+        "code": arguments.get("code", ""),
+        "provider": arguments.get("provider") or "azure",
+        "complexity_level": arguments.get("complexity_level", "medium"),
+        "format": arguments.get("format", "png"),
+        "theme": arguments.get("theme"),
+        "stop_on_invalid": arguments.get("stop_on_invalid", False),
+        "components_used": [],
+        "suggestions": [],
+    }
+    step_results = {}
+    
+    for step in steps:
+        try:
+            step_results[step] = await PIPELINE_STEPS[step](state)
+        except Exception as e:
+            step_results[step] = {"success": False, "error": str(e)}
+            return {
+                "success": False,
+                "error": f"Pipeline step '{step}' failed: {e}",
+                "failed_step": step,
+                "diagram_code": state["code"],
+                "steps": step_results
+            }
+    
+    render = step_results.get("render")
+    success = render.get("success", False) if render and not render.get("skipped") else bool(state["code"])
+    
+    return {
+        "success": success,
+        "diagram_code": state["code"],
+        "artifact_key": render.get("artifact_key") if render else None,
+        "content_type": render.get("content_type") if render else None,
+        "components_used": state["components_used"],
+        "suggestions": state["suggestions"],
+        "is_valid": state.get("is_valid"),
+        "explanation": f"Pipeline ran steps: {', '.join(steps)}",
+        "steps": step_results
+    }
+
+async def _ingest_icons(services: List) -> List[str]:
+    """Swap each service's icon (URL, data URI or path) for its normalized local copy; returns errors"""
+    from icon_cache import IconError, get_icon_cache
+    
+    icon_cache = get_icon_cache()
+    errors = []
+    for i, service in enumerate(services):
+        if not isinstance(service, dict) or service.get("icon") is None:
+            continue
+        try:
+            # Downloads and decoding are blocking; keep them off the event loop
+            service["icon"] = await asyncio.to_thread(icon_cache.ingest, service["icon"])
+        except IconError as e:
+            errors.append(f"nodes[{i}].icon: {e}")
+    return errors
+
+async def create_cluster_diagram(cluster_config: Dict, services: List, connections: List = None,
+                                 format: str = "png", output_path: str = None,
+                                 base_code: str = "") -> Dict[str, Any]:
+    """Create clustered diagrams from a JSON graph spec; no Python is generated or executed
+    
+    base_code, when given, is compiled (not executed) and the spec is added to its graph.
+    """
+    from graph_spec import GraphSpecError, compile_graph_spec
+    from render_cache import get_render_cache
+    
+    if isinstance(services, list):
+        services = [dict(service) if isinstance(service, dict) else service for service in services]
+        icon_errors = await _ingest_icons(services)
+        if icon_errors:
+            return {"success": False, "error": "Invalid graph spec", "errors": icon_errors}
+    
+    spec = {**(cluster_config or {}), "nodes": services, "edges": connections or []}
+    try:
+        diagram = compile_graph_spec(spec, base_code=base_code)
+    except GraphSpecError as e:
+        return {"success": False, "error": "Invalid graph spec", "errors": e.errors}
+    
+    summary = {
+        "node_count": len(services),
+        "cluster_count": len(spec.get("clusters") or []),
+        "edge_count": len(spec["edges"])
+    }
+    if format == "dot":
+        return {"success": True, "format": "dot", "dot_source": diagram.dot.source, **summary}
+    
+    # The spec is data, so its canonical JSON is a stable cache key; icons are content-addressed paths
+    cache = get_render_cache()
+    cache_code = json.dumps({"spec": spec, "base_code": base_code}, sort_keys=True)
+    if cache:
+        cached, tier = cache.get(cache_code, format)
+        if cached is not None:
+            return _diagram_artifact_result(cached, format, output_path, render_cache=tier, **summary)
+    
+    rendered = await _render_graph(diagram, lambda layout: compile_graph_spec(spec, layout, base_code), format)
+    if not rendered.get("success"):
+        return rendered
+    diagram_data = rendered.pop("data")
+    if cache:
+        cache.put(cache_code, format, None, diagram_data)
+    return _diagram_artifact_result(
+        diagram_data, format, output_path,
+        render_cache="miss" if cache else None, **rendered, **summary
+    )
+
+async def generate_multi_provider_diagram(providers: List[str], architecture_description: str, 
+                                  hybrid_components: List = None, format: str = "png",
+                                  output_path: str = None) -> Dict[str, Any]:
+    """Generate diagrams spanning multiple providers, one cluster per provider"""
+    from provider_catalog import TIER_ORDER, get_provider_catalog
+    
+    # Built once per process; a request does one regex pass over the description
+    catalog = get_provider_catalog(PROVIDER_SERVICE_MAPPINGS)
+    providers = [p.lower() for p in providers]
+    unknown = [p for p in providers if p not in catalog.providers()]
+    if unknown or not providers:
+        return {
+            "success": False,
+            "error": f"Provider(s) not supported: {', '.join(unknown) or 'none given'}",
+            "available_providers": catalog.providers()
+        }
+    
+    matches = catalog.match(architecture_description, providers)
+    for provider in providers:
+        if not matches[provider]:
+            matches[provider] = catalog.category_defaults(architecture_description, provider) or \
+                [catalog.representative(provider)]
+    
+    warnings = []
+    hybrid = []
+    for component in hybrid_components or []:
+        if isinstance(component, dict) and component.get("class"):
+            entry = {"provider": "hybrid", "class_path": component["class"],
+                     "keyword": component.get("label") or component["class"].rsplit(".", 1)[-1], "category": ""}
+        else:
+            name = component.get("name", "") if isinstance(component, dict) else str(component)
+            entry = catalog.lookup(name, ["onprem", *providers])
+            if entry is None:
+                warnings.append(f"Hybrid component '{name}' is not in the catalog and was skipped")
+                continue
+            if isinstance(component, dict) and component.get("label"):
+                entry = {**entry, "keyword": component["label"]}
+        hybrid.append(entry)
+    
+    groups = [(provider, f"{provider.upper()} Services", matches[provider]) for provider in providers]
+    if hybrid:
+        groups.append(("hybrid", "On-Premises / Hybrid", hybrid))
+    
+    clusters, services, connections, anchors, components = [], [], [], [], []
+    for cluster_id, label, entries in groups:
+        clusters.append({"id": cluster_id, "label": label})
+        tiers: Dict[int, List[str]] = {}
+        for i, entry in enumerate(entries):
+            node_id = f"{cluster_id}_{i}"
+            services.append({"id": node_id, "class": entry["class_path"],
+                             "label": entry["keyword"].title(), "cluster": cluster_id})
+            tiers.setdefault(TIER_ORDER.get(entry["category"], 4), []).append(node_id)
+            components.append({"provider": cluster_id, "keyword": entry["keyword"], "class": entry["class_path"]})
+        
+        # Each tier feeds the first node of the next tier present
+        ordered = [tiers[tier] for tier in sorted(tiers)]
+        for current, following in zip(ordered, ordered[1:]):
+            for node_id in current:
+                connections.append({"from": node_id, "to": following[0]})
+        anchors.append((cluster_id, ordered[0][0]))
+    
+    # Providers are linked through their entry points; hybrid links over a VPN
+    for (_, source), (target_cluster, target) in zip(anchors, anchors[1:]):
+        connections.append({
+            "from": source, "to": target, "style": "dashed", "direction": "both",
+            "label": "VPN" if target_cluster == "hybrid" else "interconnect"
+        })
+    
+    cluster_config = {"title": "Multi-Provider Architecture", "direction": "LR", "clusters": clusters}
+    result = await create_cluster_diagram(cluster_config, services, connections, format, output_path)
+    result.update({
+        "providers": providers,
+        "components": components,
+        "graph_spec": {"cluster_config": cluster_config, "services": services, "connections": connections}
+    })
+    if warnings:
+        result["warnings"] = warnings
+    return result
 
-def generate_multi_provider_diagram(providers: List[str], architecture_description: str, 
-                                  hybrid_components: List = None) -> Dict[str, Any]:
-    """Generate diagrams spanning multiple providers"""
-    # Implementation for multi-cloud diagrams
-    pass
+async def create_custom_node_diagram(custom_nodes: List, icon_urls: List = None, base_diagram_code: str = "",
+                                     connections: List = None, format: str = "png",
+                                     output_path: str = None) -> Dict[str, Any]:
+    """Create diagrams with custom nodes and icons, optionally added to base diagram code"""
+    icon_urls = icon_urls or []
+    services, clusters, errors = [], {}, []
+    for i, node in enumerate(custom_nodes):
+        node = {"label": node} if isinstance(node, str) else dict(node)
+        # A node's own icon wins; otherwise icon_urls is matched by position (or icon_index)
+        icon_index = node.get("icon_index", i)
+        icon = node.get("icon") or (icon_urls[icon_index] if 0 <= icon_index < len(icon_urls) else None)
+        if not icon:
+            errors.append(f"custom_nodes[{i}] has no icon and no matching icon_urls entry")
+            continue
+        service = {"id": node.get("id") or f"custom_{i}", "icon": icon, "label": node.get("label", "")}
+        if node.get("cluster"):
+            service["cluster"] = node["cluster"]
+            clusters.setdefault(node["cluster"], {"id": node["cluster"], "label": node["cluster"]})
+        if node.get("attrs"):
+            service["attrs"] = node["attrs"]
+        services.append(service)
+    if errors:
+        return {"success": False, "error": "Invalid custom nodes", "errors": errors}
+    
+    cluster_config = {"title": "Custom Diagram", "clusters": list(clusters.values())}
+    return await create_cluster_diagram(cluster_config, services, connections, format, output_path,
+                                        base_code=base_diagram_code)
 
-def create_custom_node_diagram(custom_nodes: List, icon_urls: List = None, base_diagram_code: str = "") -> Dict[str, Any]:
-    """Create diagrams with custom nodes and icons"""
-    # Implementation for custom node support
-    pass
+def client_dot_error(dot_code: str) -> Optional[str]:
+    """Why client DOT may not be rendered: it may only read icons from the icon cache or the diagrams resources"""
+    from graphviz_layout_pool import untrusted_dot_error
+    from icon_cache import get_icon_cache
+    from node_catalog import get_node_catalog
+    
+    if not isinstance(dot_code, str):
+        return "dot_code must be a string"
+    resources_root = get_node_catalog().resources_root
+    image_roots = [str(get_icon_cache().root)]
+    if resources_root:
+        image_roots.append(os.path.join(resources_root, "resources"))
+    return untrusted_dot_error(dot_code, image_roots)
 
-def generate_graphviz_diagram(dot_code: str, layout_engine: str = "dot", output_format: str = "png") -> Dict[str, Any]:
-    """Direct GraphViz diagram generation"""
-    # Implementation for direct GraphViz support
-    pass
+async def generate_graphviz_diagram(dot_code: str, layout_engine: str = "dot", output_format: str = "png",
+                                    output_formats: List[str] = None) -> Dict[str, Any]:
+    """Direct GraphViz diagram generation; all requested formats come from one layout pass"""
+    from artifact_store import get_artifact_store
+    from graphviz_layout_pool import LayoutError, get_layout_pool
+    
+    formats = output_formats or [output_format]
+    started = time.perf_counter()
+    error = client_dot_error(dot_code)
+    if error:
+        return {"success": False, "error": error, "layout_engine": layout_engine}
+    try:
+        outputs = await get_layout_pool().render(dot_code, layout_engine, formats)
+    except LayoutError as e:
+        return {
+            "success": False,
+            "error": f"Failed to generate diagram: {str(e)}",
+            "layout_engine": layout_engine
+        }
+    
+    store = get_artifact_store()
+    artifacts = {}
+    for format, data in outputs.items():
+        artifacts[format] = {**store.describe(store.put(data, format)), "size_bytes": len(data)}
+    
+    # The first format doubles as the primary artifact, matching generate_diagram's result shape
+    primary = artifacts[next(iter(artifacts))]
+    return {
+        "success": True,
+        **primary,
+        "artifacts": artifacts,
+        "layout_engine": layout_engine,
+        "layout_passes": 1,
+        "render_seconds": round(time.perf_counter() - started, 4)
+    }
 
-def export_diagram_templates(template_type: str, provider: str = None, customizations: Dict = None) -> Dict[str, Any]:
-    """Export reusable diagram templates"""
-    # Implementation for template system
-    pass
+async def export_diagram_templates(template_type: str, provider: str = None, customizations: Dict = None,
+                                   format: str = "png", output_path: str = None) -> Dict[str, Any]:
+    """Render a template from the template library, optionally customized, and return its graph spec"""
+    from diagram_templates import TemplateError, build_template_spec, list_templates
+    
+    try:
+        name, provider, spec = build_template_spec(template_type, provider, customizations)
+    except TemplateError as e:
+        return {"success": False, "error": str(e), "errors": e.errors, "available_templates": list_templates()}
+    
+    # Base specs were rendered at startup, so an uncustomized template is a render cache hit and
+    # relabelled or reclassed nodes are drawn on the base layout
+    cluster_config = {key: value for key, value in spec.items() if key not in ("nodes", "edges")}
+    result = await create_cluster_diagram(cluster_config, spec["nodes"], spec["edges"], format, output_path)
+    return {**result, "template_type": name, "provider": provider, "graph_spec": spec}
+
+def load_template_layouts() -> int:
+    """Add the template layouts saved at image build time to the layout cache; returns how many were loaded"""
+    from diagram_templates import template_layouts_path
+    from layout_cache import get_layout_cache
+    
+    layouts = get_layout_cache()
+    return layouts.load(template_layouts_path()) if layouts else 0
+
+async def prerender_diagram_templates(formats: List[str] = None) -> Dict[str, Any]:
+    """Render every template's base spec once, filling the render cache and the saved template layouts"""
+    from diagram_templates import base_specs, template_layouts_path
+    from graph_spec import compile_graph_spec
+    from layout_cache import get_layout_cache
+    
+    started = time.perf_counter()
+    layouts = get_layout_cache()
+    path = template_layouts_path()
+    loaded = load_template_layouts()
+    
+    rendered, failed, topology_keys = 0, [], set()
+    for name, provider, spec in base_specs():
+        # Icons do not move anything, so one template shares a layout across providers
+        topology_keys.add(compile_graph_spec(spec).topology_key())
+        cluster_config = {key: value for key, value in spec.items() if key not in ("nodes", "edges")}
+        # One at a time so live requests still get layout slots while this runs
+        for format in formats or ["png"]:
+            result = await create_cluster_diagram(cluster_config, spec["nodes"], spec["edges"], format)
+            if result.get("success"):
+                rendered += 1
+            else:
+                failed.append({"template_type": name, "provider": provider, "format": format,
+                               "error": result.get("error")})
+    
+    saved, save_error = 0, None
+    if layouts and len(topology_keys) > loaded:
+        try:
+            saved = layouts.save(path, sorted(topology_keys))
+        except OSError as e:
+            save_error = f"Could not save template layouts to {path}: {e}"
+    return {
+        "rendered": rendered,
+        "failed": failed,
+        "layouts_loaded": loaded,
+        "layouts_saved": saved,
+        "layouts_error": save_error,
+        "seconds": round(time.perf_counter() - started, 4)
+    }
 
 def auto_fix_diagram_code(code: str, target_provider: str = "azure", architecture_description: str = "") -> Dict[str, Any]:
     """Auto-fix common diagram code issues"""
@@ -1096,6 +1903,28 @@ if __name__ == "__main__":
     
     async def main():
         from mcp.server.stdio import stdio_server
+        from component_matcher import get_component_matcher
+        from node_catalog import get_node_catalog
+        from render_worker_pool import get_render_pool
+        
+        # Load the Azure component catalog, its matcher and the node catalog of every provider
+        # before the first validation call needs them
+        get_component_matcher()
+        get_node_catalog()
+        
+        # Pre-warm render workers while the client is still connecting
+        get_render_pool().start_in_background()
+        
+        # Base template layouts written by `diagram_templates.py --prerender` at image build time,
+        # so customized templates are drawn on them
+        load_template_layouts()
+        
+        # Opt-in: the image renders the template library at build time, and every pooled
+        # server process would otherwise repeat it at startup
+        prerender = None  # held so the task is not garbage collected
+        if os.getenv("MCP_TEMPLATE_PRERENDER", "false").lower() == "true":
+            formats = [f.strip() for f in os.getenv("MCP_TEMPLATE_PRERENDER_FORMATS", "png").split(",") if f.strip()]
+            prerender = asyncio.create_task(prerender_diagram_templates(formats))
         
         async with stdio_server() as (read_stream, write_stream):
             await app.run(read_stream, write_stream, app.create_initialization_options())
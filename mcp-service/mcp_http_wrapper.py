@@ -5,16 +5,29 @@ Wraps the stdio-based MCP diagram server with a REST API interface
 """
 
 import asyncio
+import hmac
 import json
 import subprocess
 import sys
 import os
-from typing import Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
+from typing import Dict, Any, Optional, List, Tuple
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, FileResponse, Response, PlainTextResponse
 from pydantic import BaseModel
 import logging
+import time
 from pathlib import Path
 
+from mcp_session_pool import MCPSession, MCPSessionPool
+from mcp_tool_dispatch import InProcessToolDispatcher, parse_tool_dispatch
+from mcp_call_coalescing import SingleFlight, TTLCache, call_key
+from mcp_admission import AdmissionController, AdmissionRejected, parse_tool_limits, request_deadline
+from artifact_store import get_artifact_store
+from mcp_metrics import (
+    CallTimings, phase_duration, registry, render_cache_lookups, response_outcome,
+    server_render_cache_events, server_reported_seconds
+)
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,6 +46,12 @@ class MCPResponse(BaseModel):
     success: bool
     result: Optional[Any] = None
     error: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None
+
+class MCPBatchResponse(BaseModel):
+    success: bool
+    results: List[MCPResponse] = []
+    error: Optional[str] = None
 
 class MCPService:
     def __init__(self):
@@ -43,13 +62,196 @@ class MCPService:
         # Verify MCP server exists
         if not self.mcp_server_path.exists():
             raise FileNotFoundError(f"MCP server not found: {self.mcp_server_path}")
+        
+        # "pool" reuses long-lived MCP server sessions, "spawn" starts a process per call
+        self.transport = os.getenv("MCP_TRANSPORT", "pool").lower()
+        self.request_timeout = float(os.getenv("MCP_REQUEST_TIMEOUT", "30"))
+        self.pool = MCPSessionPool(
+            self._create_session,
+            min_size=int(os.getenv("MCP_POOL_MIN_SIZE", "1")),
+            max_size=int(os.getenv("MCP_POOL_MAX_SIZE", "4")),
+            max_requests=int(os.getenv("MCP_POOL_MAX_REQUESTS", "500")),
+            health_check_interval=float(os.getenv("MCP_POOL_HEALTH_INTERVAL", "30")),
+            max_concurrency=int(os.getenv("MCP_SESSION_MAX_CONCURRENCY", "8"))
+        )
+        
+        # Cheap read-only tools can skip the stdio hop entirely (tool=inline|thread|process)
+        self.inprocess_enabled = os.getenv("MCP_INPROCESS_TOOLS", "true").lower() == "true"
+        self.dispatcher = InProcessToolDispatcher(
+            parse_tool_dispatch(os.getenv("MCP_TOOL_DISPATCH")),
+            max_threads=int(os.getenv("MCP_INPROCESS_THREADS", "4"))
+        )
+        
+        # Per-tool concurrency limits with a bounded, deadline-aware wait queue
+        self.admission = AdmissionController(
+            default_limit=int(os.getenv("MCP_DEFAULT_TOOL_CONCURRENCY", "16")),
+            tool_limits=parse_tool_limits(os.getenv("MCP_TOOL_CONCURRENCY", "generate_diagram=4,run_pipeline=4")),
+            max_queue=int(os.getenv("MCP_ADMISSION_MAX_QUEUE", "64")),
+            max_wait=float(os.getenv("MCP_ADMISSION_MAX_WAIT", "10"))
+        )
+        
+        # Identical concurrent calls share one execution; deterministic tools are cached briefly
+        self.coalesce_enabled = os.getenv("MCP_COALESCE_CALLS", "true").lower() == "true"
+        self.singleflight = SingleFlight()
+        self.result_cache = TTLCache(
+            ttl_seconds=float(os.getenv("MCP_RESULT_CACHE_TTL", "30")),
+            max_entries=int(os.getenv("MCP_RESULT_CACHE_SIZE", "1024"))
+        )
+        self.cacheable_calls = {
+            name.strip() for name in os.getenv(
+                "MCP_RESULT_CACHE_TOOLS",
+                "tools/list,get_available_services,validate_azure_components"
+            ).split(",") if name.strip()
+        }
+    
+    async def _create_session(self) -> MCPSession:
+        session = MCPSession(self.python_exe, str(self.mcp_server_path), str(self.base_dir))
+        await session.start(timeout=self.request_timeout)
+        return session
+    
+    async def start(self):
+        if self.inprocess_enabled:
+            await asyncio.get_running_loop().run_in_executor(None, self.dispatcher.load)
+        if self.transport == "pool":
+            await self.pool.start()
+    
+    async def stop(self):
+        await self.pool.close()
+        self.dispatcher.shutdown()
+    
+    async def reload_catalog(self, force: bool = False) -> Dict[str, Any]:
+        """Reload the Azure catalog in this process and in every pooled MCP server session"""
+        results: Dict[str, Any] = {}
+        if self.inprocess_enabled:
+            from azure_catalog import reload_azure_catalog
+            results["in_process"] = await asyncio.get_running_loop().run_in_executor(None, reload_azure_catalog, force)
+        if self.transport == "pool":
+            responses = await self.pool.broadcast(
+                "tools/call", {"name": "reload_catalog", "arguments": {"force": force}}, timeout=self.request_timeout
+            )
+            results["sessions"] = {
+                str(pid): {"error": str(response)} if isinstance(response, Exception) else extract_tool_json(response)
+                for pid, response in responses.items()
+            }
+        # Cached get_available_services results carry the old catalog version
+        self.result_cache.clear()
+        return results
+    
+    def _is_cacheable(self, method: str, params: Optional[Dict[str, Any]]) -> bool:
+        if not self.result_cache.enabled:
+            return False
+        name = (params or {}).get("name") if method == "tools/call" else method
+        return name in self.cacheable_calls
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.coalesce_enabled,
+            "executions": self.singleflight.executions,
+            "coalesced": self.singleflight.coalesced,
+            "inflight": self.singleflight.inflight_count,
+            "cache_entries": len(self.result_cache),
+            "cache_hits": self.result_cache.hits,
+            "cache_misses": self.result_cache.misses
+        }
+    
+    @staticmethod
+    def _call_name(method: str, params: Optional[Dict[str, Any]]) -> str:
+        """Tool name for tools/call, otherwise the method; used for limits and metric labels"""
+        return (params or {}).get("name", method) if method == "tools/call" else method
     
     async def call_mcp(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Call the MCP server, sharing identical in-flight calls and caching deterministic ones"""
+        response, _ = await self.call_mcp_timed(method, params)
+        return response
+    
+    async def call_mcp_timed(self, method: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], CallTimings]:
+        """Like call_mcp, but also returns the phase timings of the call"""
+        started = time.perf_counter()
+        timings = CallTimings()
+        outcome = "exception"
+        try:
+            response, execution = await self._call_shared(method, params)
+            timings.merge(execution)
+            outcome = response_outcome(response) if execution else "cache_hit"
+            return response, timings
+        finally:
+            timings.record("total", time.perf_counter() - started)
+            phase_duration.observe(
+                timings.phases["total"], phase="total", tool=self._call_name(method, params), outcome=outcome
+            )
+    
+    async def _call_shared(self, method: str, params: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Optional[CallTimings]]:
+        """Returns the response and the timings of the execution that produced it (None if cached)"""
+        if not self.coalesce_enabled:
+            return await self._admitted_dispatch(method, params)
+        
+        key = call_key(method, params)
+        cacheable = self._is_cacheable(method, params)
+        if cacheable:
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                return cached, None
+        
+        response, execution = await self.singleflight.do(key, lambda: self._admitted_dispatch(method, params))
+        
+        if cacheable and response_outcome(response) == "success":
+            self.result_cache.set(key, response)
+        return response, execution
+    
+    async def _admitted_dispatch(self, method: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], CallTimings]:
+        name = self._call_name(method, params)
+        timings = CallTimings()
+        outcome = "exception"
+        admission_started = time.perf_counter()
+        try:
+            async with self.admission.admit(name):
+                timings.record("admission_wait", time.perf_counter() - admission_started)
+                response = await self._dispatch(method, params, timings)
+            outcome = response_outcome(response)
+            return response, timings
+        except AdmissionRejected:
+            timings.record("admission_wait", time.perf_counter() - admission_started)
+            outcome = "rejected"
+            raise
+        finally:
+            timings.observe(name, outcome)
+    
+    async def _dispatch(self, method: str, params: Optional[Dict[str, Any]] = None,
+                        timings: Optional[CallTimings] = None) -> Dict[str, Any]:
+        """Call the MCP server using the configured transport"""
+        timings = timings or CallTimings()
+        
+        if self.inprocess_enabled and self.dispatcher.handles(method, params):
+            logger.info(f"Calling MCP tool in-process: {params['name']}")
+            response = await self.dispatcher.call(method, params)
+        elif self.transport == "spawn":
+            response = await self._call_mcp_spawn(method, params, timings)
+        else:
+            try:
+                logger.info(f"Calling MCP method: {method}")
+                async with self.pool.session(timings) as session:
+                    response = await session.request(method, params, timeout=self.request_timeout, timings=timings)
+                logger.info(f"MCP response received for method: {method}")
+            except Exception as e:
+                logger.error(f"Error calling MCP: {e}")
+                raise e
+        
+        tool_seconds = server_reported_seconds(response)
+        if tool_seconds is not None:
+            timings.record("tool_execution", tool_seconds)
+        for event in server_render_cache_events(response):
+            render_cache_lookups.inc(result=event)
+        return response
+    
+    async def _call_mcp_spawn(self, method: str, params: Optional[Dict[str, Any]] = None,
+                              timings: Optional[CallTimings] = None) -> Dict[str, Any]:
         """Call the MCP stdio server with proper protocol handshake"""
+        timings = timings or CallTimings()
         try:
             logger.info(f"Calling MCP method: {method}")
             
             # Start MCP server process
+            phase_started = time.perf_counter()
             process = await asyncio.create_subprocess_exec(
                 self.python_exe,
                 str(self.mcp_server_path),
@@ -58,6 +260,8 @@ class MCPService:
                 stderr=asyncio.subprocess.PIPE,
                 cwd=str(self.base_dir)
             )
+            timings.record("spawn", time.perf_counter() - phase_started)
+            phase_started = time.perf_counter()
             
             # MCP Protocol: First initialize the connection
             init_request = {
@@ -95,6 +299,8 @@ class MCPService:
             init_notif_data = json.dumps(initialized_notification) + "\n"
             process.stdin.write(init_notif_data.encode())
             await process.stdin.drain()
+            timings.record("initialize", time.perf_counter() - phase_started)
+            phase_started = time.perf_counter()
             
             # Now send the actual request
             mcp_request = {
@@ -110,6 +316,8 @@ class MCPService:
             
             # Close stdin to signal completion
             process.stdin.close()
+            timings.record("request_write", time.perf_counter() - phase_started)
+            phase_started = time.perf_counter()
             
             # Read all responses
             responses = []
@@ -132,6 +340,8 @@ class MCPService:
                     logger.warning(f"Failed to parse response line: {response_text}")
                     continue
             
+            timings.record("first_byte", time.perf_counter() - phase_started)
+            
             # Wait for process to complete
             await process.wait()
             
@@ -159,17 +369,78 @@ class MCPService:
 # Global MCP service instance
 mcp_service = MCPService()
 
+registry.gauge("mcp_pool_sessions", "MCP server sessions in the pool", lambda: mcp_service.pool.size)
+registry.gauge("mcp_pool_in_flight", "Requests in flight on pooled sessions", lambda: mcp_service.pool.stats()["in_flight"])
+registry.gauge("mcp_admission_queue_depth", "Calls waiting for a concurrency slot", lambda: mcp_service.admission.queue_depth)
+registry.gauge("mcp_admission_in_flight", "Calls holding a concurrency slot", lambda: mcp_service.admission.in_flight)
+registry.gauge("mcp_coalesced_calls_total", "Calls that joined an identical in-flight call",
+               lambda: mcp_service.singleflight.coalesced, metric_type="counter")
+registry.gauge("mcp_result_cache_hits_total", "Result cache hits", lambda: mcp_service.result_cache.hits, metric_type="counter")
+registry.gauge("mcp_result_cache_misses_total", "Result cache misses", lambda: mcp_service.result_cache.misses, metric_type="counter")
+
+@app.on_event("startup")
+async def startup():
+    await mcp_service.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await mcp_service.stop()
+
+@app.middleware("http")
+async def request_deadline_middleware(request: Request, call_next):
+    """Let callers bound how long their request may wait for admission (X-Request-Timeout seconds)"""
+    timeout = request.headers.get("x-request-timeout")
+    token = None
+    if timeout:
+        try:
+            token = request_deadline.set(time.monotonic() + float(timeout))
+        except ValueError:
+            pass
+    try:
+        return await call_next(request)
+    finally:
+        if token:
+            request_deadline.reset(token)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    logger.warning(f"Rejected request to {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=429,
+        content=MCPResponse(success=False, error=str(exc)).model_dump(),
+        headers={"Retry-After": exc.retry_after_header}
+    )
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "mcp-http-wrapper"}
+    return {
+        "status": "healthy",
+        "service": "mcp-http-wrapper",
+        "transport": mcp_service.transport,
+        "inprocess_tools": mcp_service.dispatcher.dispatch if mcp_service.inprocess_enabled else {},
+        "pool": mcp_service.pool.stats(),
+        "coalescing": mcp_service.coalescing_stats()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics, including per-phase latency histograms by tool and outcome"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/scaling")
+async def scaling_metrics():
+    """Queue depth, in-flight count and oldest wait age for autoscalers"""
+    return mcp_service.admission.scaling_metrics()
 
 @app.post("/mcp/tools/list", response_model=MCPResponse)
 async def list_tools():
     """List available MCP tools"""
     try:
-        result = await mcp_service.call_mcp("tools/list")
-        return MCPResponse(success=True, result=result)
+        result, timings = await mcp_service.call_mcp_timed("tools/list")
+        return MCPResponse(success=True, result=result, timings=timings.as_ms())
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"Error listing tools: {e}")
         return MCPResponse(success=False, error=str(e))
@@ -184,19 +455,117 @@ async def call_tool(request: Dict[str, Any]):
         if not tool_name:
             raise ValueError("Tool name is required")
         
-        result = await mcp_service.call_mcp("tools/call", {
+        result, timings = await mcp_service.call_mcp_timed("tools/call", {
             "name": tool_name,
             "arguments": arguments
         })
         
-        return MCPResponse(success=True, result=result)
+        return MCPResponse(success=True, result=result, timings=timings.as_ms())
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"Error calling tool: {e}")
         return MCPResponse(success=False, error=str(e))
 
+@app.post("/mcp/tools/batch", response_model=MCPBatchResponse)
+async def call_tools_batch(request: Dict[str, Any]):
+    """Call several MCP tools concurrently; results keep the order of the calls"""
+    try:
+        calls = request.get("calls")
+        if not isinstance(calls, list) or not calls:
+            raise ValueError("calls must be a non-empty list of {name, arguments}")
+        
+        max_calls = int(os.getenv("MCP_BATCH_MAX_CALLS", "100"))
+        if len(calls) > max_calls:
+            raise ValueError(f"Batch of {len(calls)} calls exceeds the limit of {max_calls}")
+        
+        # At most each tool's concurrency limit in flight from this batch, so the rest waits here
+        # instead of filling the admission queue and getting the batch's own calls rejected
+        slots: Dict[str, asyncio.Semaphore] = {}
+        
+        async def run_call(call: Any) -> MCPResponse:
+            try:
+                if not isinstance(call, dict) or not call.get("name"):
+                    raise ValueError("Tool name is required")
+                name = call["name"]
+                if name not in slots:
+                    slots[name] = asyncio.Semaphore(mcp_service.admission.limit_for(name))
+                async with slots[name]:
+                    result, timings = await mcp_service.call_mcp_timed("tools/call", {
+                        "name": name,
+                        "arguments": call.get("arguments", {})
+                    })
+                return MCPResponse(success=True, result=result, timings=timings.as_ms())
+            except Exception as e:
+                logger.error(f"Error in batch tool call: {e}")
+                return MCPResponse(success=False, error=str(e))
+        
+        results = await asyncio.gather(*(run_call(call) for call in calls))
+        return MCPBatchResponse(success=True, results=list(results))
+    except Exception as e:
+        logger.error(f"Error calling tool batch: {e}")
+        return MCPBatchResponse(success=False, error=str(e))
+
+def server_timing_header(timings: CallTimings) -> str:
+    """Phase timings as a Server-Timing header for responses that are not JSON"""
+    return ", ".join(f"{phase};dur={seconds * 1000:.3f}" for phase, seconds in timings.phases.items())
+
+def extract_tool_json(mcp_response: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse the JSON text payload of a tools/call response"""
+    try:
+        return json.loads(mcp_response["result"]["content"][0]["text"])
+    except (KeyError, IndexError, TypeError, json.JSONDecodeError):
+        return {}
+
+@app.get("/mcp/artifacts/{key}")
+async def get_artifact(key: str):
+    """Stream a rendered diagram artifact"""
+    store = get_artifact_store()
+    path = store.path(key)
+    if not path:
+        raise HTTPException(status_code=404, detail=f"Artifact not found: {key}")
+    return FileResponse(path, media_type=store.describe(key)["content_type"])
+
+@app.get("/mcp/catalog")
+async def get_catalog(http_request: Request, provider: Optional[str] = None, category: Optional[str] = None,
+                      search_term: Optional[str] = None):
+    """Service catalog with its version as an ETag; If-None-Match gets a 304 while it is unchanged"""
+    arguments = {"provider": provider, "category": category, "search_term": search_term,
+                 "if_none_match": http_request.headers.get("if-none-match")}
+    result, timings = await mcp_service.call_mcp_timed("tools/call", {
+        "name": "get_available_services",
+        "arguments": {key: value for key, value in arguments.items() if value}
+    })
+    catalog = extract_tool_json(result)
+    if not catalog:
+        raise HTTPException(status_code=502, detail="MCP server returned no catalog")
+    
+    # no-cache: clients keep the body but revalidate before each use
+    headers = {"Cache-Control": "no-cache", "Server-Timing": server_timing_header(timings)}
+    if catalog.get("catalog_version"):
+        headers["ETag"] = f'"{catalog["catalog_version"]}"'
+    if catalog.get("not_modified"):
+        return Response(status_code=304, headers=headers)
+    if catalog.get("error"):
+        return JSONResponse(status_code=404, content=catalog, headers=headers)
+    return JSONResponse(content=catalog, headers=headers)
+
+@app.post("/admin/catalog/reload")
+async def reload_catalog(http_request: Request, force: bool = False):
+    """Rebuild the Azure catalog from azure_nodes.json and swap it in; MCP_ADMIN_TOKEN guards it when set"""
+    token = os.getenv("MCP_ADMIN_TOKEN")
+    if token and not hmac.compare_digest(http_request.headers.get("x-admin-token", ""), token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    return await mcp_service.reload_catalog(force)
+
 @app.post("/mcp/generate-diagram")
-async def generate_diagram(request: Dict[str, Any]):
-    """Generate a diagram using MCP tools"""
+async def generate_diagram(request: Dict[str, Any], http_request: Request):
+    """Generate a diagram using MCP tools.
+    
+    Returns the MCP JSON envelope (with an artifact_key to fetch from
+    /mcp/artifacts/{key}) or, when the client sends Accept: image/* or
+    response_format=binary, the rendered image bytes directly.
+    """
     try:
         # Extract parameters
         architecture_description = request.get("architecture_description", "")
@@ -205,54 +574,39 @@ async def generate_diagram(request: Dict[str, Any]):
         if not architecture_description and not diagram_code:
             raise ValueError("Either architecture_description or diagram_code is required")
         
-        # If we have an architecture description, first get diagram structure suggestion
-        if architecture_description and not diagram_code:
-            print(f"🧠 Getting diagram structure for: {architecture_description[:100]}...")
-            
-            # Call suggest_diagram_structure first
-            structure_result = await mcp_service.call_mcp("tools/call", {
-                "name": "suggest_diagram_structure",
-                "arguments": {
-                    "description": architecture_description,
-                    "provider_preference": "azure",
-                    "complexity_level": "medium"
-                }
-            })
-            
-            # Extract suggested code from the structure result
-            if "result" in structure_result and "content" in structure_result["result"]:
-                content = structure_result["result"]["content"]
-                if isinstance(content, list) and len(content) > 0:
-                    suggested_text = content[0].get("text", "")
-                    
-                    # Try to extract Python code from the response
-                    import re
-                    code_pattern = r'```python\n(.*?)\n```'
-                    code_match = re.search(code_pattern, suggested_text, re.DOTALL)
-                    
-                    if code_match:
-                        diagram_code = code_match.group(1)
-                        print(f"✅ Extracted diagram code ({len(diagram_code)} chars)")
-                    else:
-                        # If no code blocks found, assume the whole response is code
-                        diagram_code = suggested_text
-                        print(f"⚠️ No code block found, using full response as code")
-        
-        if not diagram_code:
-            raise ValueError("Could not generate or extract diagram code")
-        
-        print(f"🎨 Generating diagram with code...")
+        logger.info("Running diagram pipeline (%s)", "from code" if diagram_code else "from description")
         
-        # Now call generate_diagram with the code
-        result = await mcp_service.call_mcp("tools/call", {
-            "name": "generate_diagram",
+        # suggest -> auto_fix -> validate -> render in a single server call;
+        # the suggest step is skipped by the server when diagram_code is given
+        result, timings = await mcp_service.call_mcp_timed("tools/call", {
+            "name": "run_pipeline",
             "arguments": {
+                "description": architecture_description,
                 "code": diagram_code,
+                "provider": "azure",
+                "complexity_level": "medium",
                 "format": "png"
             }
         })
         
-        return MCPResponse(success=True, result=result)
+        accept = http_request.headers.get("accept", "")
+        if request.get("response_format") == "binary" or accept.startswith("image/"):
+            pipeline_result = extract_tool_json(result)
+            artifact_key = pipeline_result.get("artifact_key")
+            store = get_artifact_store()
+            data = store.get(artifact_key) if artifact_key else None
+            if data is None:
+                render_error = pipeline_result.get("steps", {}).get("render", {}).get("error")
+                raise ValueError(render_error or pipeline_result.get("error") or "Diagram was not rendered")
+            return Response(
+                content=data,
+                media_type=pipeline_result.get("content_type") or store.describe(artifact_key)["content_type"],
+                headers={"X-Artifact-Key": artifact_key, "Server-Timing": server_timing_header(timings)}
+            )
+        
+        return MCPResponse(success=True, result=result, timings=timings.as_ms())
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"Error generating diagram: {e}")
         return MCPResponse(success=False, error=str(e))
@@ -267,14 +621,16 @@ async def analyze_architecture(request: Dict[str, Any]):
             raise ValueError("diagram_code is required")
         
         # Call the analyze_architecture tool
-        result = await mcp_service.call_mcp("tools/call", {
+        result, timings = await mcp_service.call_mcp_timed("tools/call", {
             "name": "analyze_architecture", 
             "arguments": {
                 "diagram_code": diagram_code
             }
         })
         
-        return MCPResponse(success=True, result=result)
+        return MCPResponse(success=True, result=result, timings=timings.as_ms())
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing architecture: {e}")
         return MCPResponse(success=False, error=str(e))
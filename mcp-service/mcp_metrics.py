@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+MCP Wrapper Metrics
+Minimal Prometheus text-format metrics (histograms, counters, gauges) and
+per-call phase timings for the MCP HTTP wrapper
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+# Phases of an MCP call, in the order they happen
+PHASES = (
+    "admission_wait",  # waiting for a per-tool concurrency slot
+    "pool_wait",       # waiting to lease an MCP session
+    "spawn",           # starting the MCP server process
+    "initialize",      # MCP initialize handshake
+    "request_write",   # writing the JSON-RPC request to stdin
+    "first_byte",      # from request written until the response line arrives
+    "tool_execution",  # tool handler time reported by the server
+    "parse",           # decoding the JSON-RPC response
+    "total",           # end to end inside the wrapper
+)
+
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # counts per bucket + sum + count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for i, bound in enumerate(self.buckets):
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {_format_value(series[i])}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {_format_value(series[-1])}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time (also used for externally kept counters)"""
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float],
+                 metric_type: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+        self.metric_type = metric_type
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            f"{self.name} {_format_value(self.read())}",
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.get(name) or self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._metrics.get(name) or self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, read: Callable[[], float],
+              metric_type: str = "gauge") -> Gauge:
+        return self.register(Gauge(name, documentation, read, metric_type))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+phase_duration = registry.histogram(
+    "mcp_phase_duration_seconds",
+    "Duration of each phase of an MCP call",
+    ("phase", "tool", "outcome")
+)
+
+render_cache_lookups = registry.counter(
+    "mcp_render_cache_lookups_total",
+    "Diagram render cache lookups by result (memory, disk or miss)",
+    ("result",)
+)
+
+
+class CallTimings:
+    """Phase durations (seconds) collected while serving one MCP call"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def record(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def merge(self, other: Optional["CallTimings"]):
+        if other:
+            for phase, seconds in other.phases.items():
+                self.record(phase, seconds)
+
+    def as_ms(self) -> Dict[str, float]:
+        ordered = [p for p in PHASES if p in self.phases] + [p for p in self.phases if p not in PHASES]
+        return {f"{phase}_ms": round(self.phases[phase] * 1000, 3) for phase in ordered}
+
+    def observe(self, tool: str, outcome: str):
+        for phase, seconds in self.phases.items():
+            phase_duration.observe(seconds, phase=phase, tool=tool, outcome=outcome)
+
+
+def server_reported_seconds(response: Dict[str, Any]) -> Optional[float]:
+    """Tool execution time the MCP server put in the result's _meta, if any"""
+    meta = (response.get("result") or {}).get("_meta") or {}
+    timings = meta.get("timings") or {}
+    value = timings.get("tool_execution_ms")
+    return value / 1000 if isinstance(value, (int, float)) else None
+
+
+def server_render_cache_events(response: Dict[str, Any]) -> List[str]:
+    """Render cache lookups the MCP server reported in the result's _meta"""
+    meta = (response.get("result") or {}).get("_meta") or {}
+    return list(meta.get("render_cache") or [])
+
+
+def response_outcome(response: Dict[str, Any]) -> str:
+    if "error" in response:
+        return "error"
+    if (response.get("result") or {}).get("isError"):
+        return "tool_error"
+    return "success"
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+MCP Session Pool
+Keeps long-lived, pre-initialized MCP stdio server processes that HTTP requests
+share instead of spawning a fresh server per call. Each session multiplexes
+many concurrent JSON-RPC requests over its stdio pipes.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple
+
+from mcp_metrics import CallTimings
+
+logger = logging.getLogger(__name__)
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+MCP_CLIENT_INFO = {"name": "mcp-http-wrapper", "version": "1.0.0"}
+
+# Large tool results (e.g. tools/list, rendered diagram metadata) exceed the 64KB default
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+class MCPSessionError(Exception):
+    """Raised when an MCP session can no longer serve requests"""
+
+
+class MCPSession:
+    """A single MCP stdio server process that multiplexes concurrent requests"""
+
+    def __init__(self, python_exe: str, server_path: str, cwd: str, stderr_tail: int = 50):
+        self.python_exe = python_exe
+        self.server_path = server_path
+        self.cwd = cwd
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.request_count = 0
+        self.created_at = time.monotonic()
+        self.broken = False
+        self.draining = False
+        self.startup_timings = CallTimings()
+        self.stderr_lines: deque = deque(maxlen=stderr_tail)
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self.process is not None
+            and self.process.returncode is None
+            and not self.broken
+        )
+
+    async def start(self, timeout: float = 30.0):
+        """Spawn the server process and perform the MCP initialize handshake"""
+        with self.startup_timings.phase("spawn"):
+            self.process = await asyncio.create_subprocess_exec(
+                self.python_exe,
+                self.server_path,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=self.cwd,
+                limit=STREAM_LIMIT
+            )
+        self._reader_task = asyncio.create_task(self._read_stdout())
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+
+        with self.startup_timings.phase("initialize"):
+            try:
+                init_result = await self.request("initialize", {
+                    "protocolVersion": MCP_PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": MCP_CLIENT_INFO
+                }, timeout=timeout)
+            except Exception:
+                await self.close()
+                raise
+
+            if "error" in init_result:
+                await self.close()
+                raise MCPSessionError(f"MCP initialization failed: {init_result['error']}")
+
+            await self._write({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        logger.info(f"MCP session started (pid={self.pid})")
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: float = 30.0, timings: Optional[CallTimings] = None) -> Dict[str, Any]:
+        """Send a JSON-RPC request and wait for the response routed back by id"""
+        if not self.is_alive:
+            raise MCPSessionError(f"MCP session is not alive (pid={self.pid})")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.request_count += 1
+
+        try:
+            write_started = time.perf_counter()
+            await self._write({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": method,
+                "params": params or {}
+            })
+            written = time.perf_counter()
+
+            response_data, received, parse_seconds = await asyncio.wait_for(future, timeout=timeout)
+
+            if timings:
+                timings.record("request_write", written - write_started)
+                timings.record("first_byte", max(0.0, received - written))
+                timings.record("parse", parse_seconds)
+            return response_data
+        except asyncio.TimeoutError:
+            # Responses are routed by id, so a late reply is simply dropped by the reader
+            raise MCPSessionError(f"Timeout waiting for MCP response to '{method}'")
+        except (BrokenPipeError, ConnectionResetError) as e:
+            self.broken = True
+            raise MCPSessionError(f"MCP session pipe closed: {e}")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """Health check using the MCP ping request"""
+        try:
+            response = await self.request("ping", timeout=timeout)
+            return "error" not in response
+        except Exception as e:
+            logger.warning(f"MCP session health check failed (pid={self.pid}): {e}")
+            return False
+
+    async def close(self):
+        """Terminate the server process and fail any outstanding requests"""
+        self.broken = True
+        if self.process and self.process.returncode is None:
+            try:
+                self.process.stdin.close()
+                await asyncio.wait_for(self.process.wait(), timeout=2.0)
+            except (asyncio.TimeoutError, Exception):
+                try:
+                    self.process.kill()
+                    await self.process.wait()
+                except ProcessLookupError:
+                    pass
+            logger.info(f"MCP session closed (pid={self.pid}, requests={self.request_count})")
+
+        for task in (self._reader_task, self._stderr_task):
+            if task and not task.done():
+                task.cancel()
+        self._fail_pending(MCPSessionError(f"MCP session closed (pid={self.pid})"))
+
+    async def _write(self, message: Dict[str, Any]):
+        data = (json.dumps(message) + "\n").encode()
+        async with self._write_lock:
+            self.process.stdin.write(data)
+            await self.process.stdin.drain()
+
+    async def _read_stdout(self):
+        """Route every response line to the future waiting on its id"""
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+
+                received = time.perf_counter()
+                response_text = line.decode().strip()
+                if not response_text:
+                    continue
+                try:
+                    response_data = json.loads(response_text)
+                except json.JSONDecodeError:
+                    logger.warning(f"Failed to parse response line: {response_text[:200]}")
+                    continue
+                parse_seconds = time.perf_counter() - received
+
+                future = self._pending.get(response_data.get("id"))
+                if future and not future.done():
+                    future.set_result((response_data, received, parse_seconds))
+                elif "id" not in response_data:
+                    logger.debug(f"MCP notification (pid={self.pid}): {response_data.get('method')}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"MCP session reader failed (pid={self.pid}): {e}")
+
+        self.broken = True
+        stderr_tail = " | ".join(self.stderr_lines)
+        self._fail_pending(MCPSessionError(
+            f"MCP server exited (pid={self.pid})" + (f": {stderr_tail}" if stderr_tail else "")
+        ))
+
+    async def _drain_stderr(self):
+        """Continuously read stderr so a chatty server can never fill the pipe"""
+        try:
+            while True:
+                line = await self.process.stderr.readline()
+                if not line:
+                    break
+                text = line.decode(errors="replace").rstrip()
+                if text:
+                    self.stderr_lines.append(text)
+                    logger.debug(f"MCP server stderr (pid={self.pid}): {text}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"MCP session stderr drain failed (pid={self.pid}): {e}")
+
+    def _fail_pending(self, error: Exception):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+class MCPSessionPool:
+    """Pool of shared MCP sessions with health checks and recycling"""
+
+    def __init__(self, session_factory: Callable[[], Awaitable[MCPSession]],
+                 min_size: int = 1, max_size: int = 4, max_requests: int = 500,
+                 health_check_interval: float = 30.0, max_concurrency: int = 8):
+        self.session_factory = session_factory
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.max_requests = max_requests
+        self.health_check_interval = health_check_interval
+        self.max_concurrency = max(1, max_concurrency)
+
+        self._sessions: List[MCPSession] = []
+        self._leases: Dict[int, int] = {}  # id(session) -> checked out count
+        self._pending = 0  # sessions currently being spawned
+        self._condition = asyncio.Condition()
+        self._health_task: Optional[asyncio.Task] = None
+        self._started = False
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        in_flight = sum(self._leases.get(id(s), 0) for s in self._sessions)
+        return {
+            "size": self.size,
+            "in_flight": in_flight,
+            "idle": sum(1 for s in self._sessions if not self._leases.get(id(s))),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "max_concurrency": self.max_concurrency,
+            "max_requests": self.max_requests,
+            "pids": [s.pid for s in self._sessions]
+        }
+
+    async def start(self):
+        """Pre-spawn min_size sessions and start the health check loop"""
+        if self._started:
+            return
+        self._started = True
+        self._closed = False
+        await self._fill_to_min()
+        if self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+        logger.info(f"MCP session pool started: {self.stats()}")
+
+    async def close(self):
+        """Stop the health check loop and terminate all sessions"""
+        self._closed = True
+        self._started = False
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        sessions = list(self._sessions)
+        self._sessions.clear()
+        self._leases.clear()
+        async with self._condition:
+            self._condition.notify_all()
+        await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+
+    @asynccontextmanager
+    async def session(self, timings: Optional[CallTimings] = None):
+        """Lease a session for one request; sessions are shared up to max_concurrency"""
+        wait_started = time.perf_counter()
+        session, spawned = await self._acquire()
+        if timings:
+            startup = 0.0
+            if spawned:
+                # This request paid for starting the session; report spawn/initialize separately
+                timings.merge(session.startup_timings)
+                startup = sum(session.startup_timings.phases.values())
+            timings.record("pool_wait", max(0.0, time.perf_counter() - wait_started - startup))
+        try:
+            yield session
+        finally:
+            await self._release(session)
+
+    async def broadcast(self, method: str, params: Optional[Dict[str, Any]] = None,
+                        timeout: float = 30.0) -> Dict[int, Any]:
+        """Send one request to every live session (e.g. to reload shared state); response or exception by pid"""
+        sessions = [s for s in self._sessions if s.is_alive and not s.draining]
+        responses = await asyncio.gather(
+            *(s.request(method, params, timeout=timeout) for s in sessions), return_exceptions=True
+        )
+        return {session.pid: response for session, response in zip(sessions, responses)}
+
+    def _available(self) -> Optional[MCPSession]:
+        """Least-loaded live session that can take another request"""
+        best = None
+        for session in self._sessions:
+            if not session.is_alive or session.draining:
+                continue
+            leases = self._leases.get(id(session), 0)
+            if leases < self.max_concurrency and (
+                best is None or leases < self._leases.get(id(best), 0)
+            ):
+                best = session
+        return best
+
+    async def _acquire(self) -> Tuple[MCPSession, bool]:
+        """Lease a session; the flag says whether it was spawned for this request"""
+        if not self._started:
+            await self.start()
+
+        async with self._condition:
+            while True:
+                if self._closed:
+                    raise MCPSessionError("MCP session pool is closed")
+
+                self._discard_dead()
+                session = self._available()
+                # Prefer an idle session; otherwise grow before stacking onto a busy one
+                if session and (
+                    self._leases.get(id(session), 0) == 0
+                    or self.size + self._pending >= self.max_size
+                ):
+                    self._leases[id(session)] = self._leases.get(id(session), 0) + 1
+                    return session, False
+
+                if self.size + self._pending < self.max_size:
+                    self._pending += 1
+                    break
+
+                await self._condition.wait()
+
+        # Spawn outside the condition so other waiters are not blocked on startup
+        try:
+            session = await self.session_factory()
+        finally:
+            async with self._condition:
+                self._pending -= 1
+                self._condition.notify_all()
+
+        async with self._condition:
+            self._sessions.append(session)
+            self._leases[id(session)] = 1
+        return session, True
+
+    async def _release(self, session: MCPSession):
+        async with self._condition:
+            leases = self._leases.get(id(session), 1) - 1
+            self._leases[id(session)] = leases
+
+            if session.is_alive and session.request_count >= self.max_requests:
+                session.draining = True
+
+            retire = not session.is_alive or (session.draining and leases == 0)
+            if retire:
+                reason = "request limit reached" if session.is_alive else "crashed"
+                logger.info(f"Recycling MCP session (pid={session.pid}): {reason}")
+                self._remove(session)
+
+            self._condition.notify_all()
+
+        if retire:
+            await session.close()
+            if not self._closed:
+                asyncio.create_task(self._fill_to_min())
+
+    def _remove(self, session: MCPSession):
+        if session in self._sessions:
+            self._sessions.remove(session)
+        self._leases.pop(id(session), None)
+
+    def _discard_dead(self):
+        for session in list(self._sessions):
+            if not session.is_alive and not self._leases.get(id(session)):
+                self._remove(session)
+                asyncio.create_task(session.close())
+
+    async def _fill_to_min(self):
+        while not self._closed and self.size + self._pending < self.min_size:
+            self._pending += 1
+            try:
+                session = await self.session_factory()
+            except Exception as e:
+                logger.error(f"Failed to start MCP session: {e}")
+                return
+            finally:
+                self._pending -= 1
+            async with self._condition:
+                self._sessions.append(session)
+                self._condition.notify_all()
+
+    async def _health_loop(self):
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self._check_idle_sessions()
+            except Exception as e:
+                logger.error(f"MCP session pool health check error: {e}")
+
+    async def _check_idle_sessions(self):
+        # Busy sessions prove their health by answering real requests
+        for session in list(self._sessions):
+            if self._leases.get(id(session)) or not session.is_alive:
+                continue
+            if not await session.ping():
+                logger.warning(f"Replacing unhealthy MCP session (pid={session.pid})")
+                session.broken = True
+        async with self._condition:
+            self._discard_dead()
+        await self._fill_to_min()
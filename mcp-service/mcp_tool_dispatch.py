@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+In-process MCP Tool Dispatch
+Runs cheap, read-only MCP tools directly inside the HTTP wrapper process
+instead of sending them over the stdio transport
+"""
+
+import asyncio
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+import jsonschema
+from mcp.types import CallToolResult, TextContent
+
+logger = logging.getLogger(__name__)
+
+# Dispatch modes
+INLINE = "inline"    # await the handler on the wrapper's event loop
+THREAD = "thread"    # run the handler in a worker thread (blocking I/O or CPU work)
+PROCESS = "process"  # send over the MCP stdio transport (default for unlisted tools)
+
+DISPATCH_MODES = (INLINE, THREAD, PROCESS)
+
+# Read-only, CPU-cheap tools; everything else (e.g. generate_diagram) stays out of process
+DEFAULT_TOOL_DISPATCH = {
+    "get_available_services": INLINE,
+    "auto_fix_diagram_code": INLINE,
+    "validate_azure_components": THREAD,
+    "suggest_architecture_components": THREAD,
+}
+
+
+def parse_tool_dispatch(spec: Optional[str]) -> Dict[str, str]:
+    """Parse 'tool=mode,tool=mode' overrides on top of DEFAULT_TOOL_DISPATCH"""
+    dispatch = dict(DEFAULT_TOOL_DISPATCH)
+    if not spec:
+        return dispatch
+
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if "=" not in entry:
+            raise ValueError(f"Invalid tool dispatch entry '{entry}', expected tool=mode")
+        tool_name, mode = (part.strip() for part in entry.split("=", 1))
+        if mode not in DISPATCH_MODES:
+            raise ValueError(f"Invalid dispatch mode '{mode}' for tool '{tool_name}'")
+        dispatch[tool_name] = mode
+    return dispatch
+
+
+class InProcessToolDispatcher:
+    """Calls mcp_diagrams_server.call_tool directly and wraps the result like a JSON-RPC response"""
+
+    def __init__(self, dispatch: Dict[str, str], max_threads: int = 4):
+        self.dispatch = dispatch
+        self.max_threads = max_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._call_tool = None
+        self._input_schemas: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+
+    def mode_for(self, tool_name: Optional[str]) -> str:
+        return self.dispatch.get(tool_name, PROCESS)
+
+    def handles(self, method: str, params: Optional[Dict[str, Any]]) -> bool:
+        if method != "tools/call" or not params:
+            return False
+        return self.mode_for(params.get("name")) != PROCESS
+
+    async def call(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a tools/call request in-process using the tool's configured mode"""
+        tool_name = params["name"]
+        arguments = params.get("arguments") or {}
+        call_tool = self.load()
+
+        # Same input validation @app.call_tool() applies on the stdio path
+        schema = self._input_schemas.get(tool_name)
+        error = self._validate_arguments(arguments, schema) if schema else None
+        if error:
+            result = CallToolResult(content=[TextContent(type="text", text=error)], isError=True)
+        elif self.mode_for(tool_name) == THREAD:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._get_executor(),
+                lambda: asyncio.run(call_tool(tool_name, arguments))
+            )
+        else:
+            result = await call_tool(tool_name, arguments)
+
+        return {
+            "jsonrpc": "2.0",
+            "id": f"inprocess-{next(self._ids)}",
+            "result": result.model_dump(mode="json", by_alias=True, exclude_none=True)
+        }
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def load(self):
+        """Import the MCP server module; called at startup to keep it off the request path"""
+        if self._call_tool is None:
+            import mcp_diagrams_server
+            from component_matcher import get_component_matcher
+            from node_catalog import get_node_catalog
+            get_component_matcher()
+            get_node_catalog()
+            tools = asyncio.run(mcp_diagrams_server.list_tools())
+            self._input_schemas = {tool.name: tool.inputSchema for tool in tools}
+            self._call_tool = mcp_diagrams_server.call_tool
+            logger.info(f"In-process tool dispatch enabled: {self.dispatch}")
+        return self._call_tool
+
+    @staticmethod
+    def _validate_arguments(arguments: Dict[str, Any], schema: Dict[str, Any]) -> Optional[str]:
+        try:
+            jsonschema.validate(instance=arguments, schema=schema)
+        except jsonschema.ValidationError as e:
+            return f"Input validation error: {e.message}"
+        return None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_threads,
+                thread_name_prefix="mcp-tool"
+            )
+        return self._executor
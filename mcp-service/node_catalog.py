@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Diagrams Node Catalog
+Every node class of every provider the server offers, read from the installed
+diagrams sources: class names, the module-level aliases (ECS =
+ElasticContainerService), icon paths and the library version.
+`python node_catalog.py --build` walks diagrams.<provider>.<category> for each
+provider in PROVIDERS and writes one compact artifact (diagram_nodes.catalog)
+with every repeated string stored once, so startup only unpickles it. When the
+artifact is missing or was built against another diagrams version the same
+walk runs instead, once per process. Lookups by module path or class name are
+dict lookups for every provider, as they already are for Azure.
+"""
+
+import importlib.metadata
+import json
+import os
+import pickle
+import sys
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
+
+CATALOG_FORMAT = 1
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ARTIFACT_PATH = os.path.join(BASE_DIR, "diagram_nodes.catalog")
+
+# Provider packages the server generates and validates diagrams for
+PROVIDERS = (
+    'aws', 'azure', 'gcp', 'k8s', 'alibabacloud', 'digitalocean',
+    'elastic', 'firebase', 'ibm', 'oci', 'openstack', 'outscale',
+    'onprem', 'saas', 'programming', 'generic', 'c4'
+)
+
+
+def diagrams_version() -> str:
+    """Installed diagrams version, "" when the library is missing"""
+    try:
+        return importlib.metadata.version("diagrams")
+    except importlib.metadata.PackageNotFoundError:
+        return ""
+
+
+class NodeClass:
+    """One public node class of a diagrams.<provider>.<category> module"""
+
+    __slots__ = ("provider", "category", "name", "icon")
+
+    def __init__(self, provider: str, category: str, name: str, icon: str):
+        self.provider = provider
+        self.category = category
+        self.name = name
+        self.icon = icon
+
+    @property
+    def module(self) -> str:
+        return f"diagrams.{self.provider}.{self.category}" if self.category else f"diagrams.{self.provider}"
+
+    @property
+    def path(self) -> str:
+        return f"{self.module}.{self.name}"
+
+    def __repr__(self) -> str:
+        return f"NodeClass({self.path})"
+
+
+def build_catalog_data(providers: Tuple[str, ...] = PROVIDERS) -> Dict[str, Any]:
+    """Walk the installed provider sources (statically, nothing is imported) into plain tuples and dicts"""
+    import ast
+    from diagram_compiler import _class_attrs, _diagrams_package_dir, _resolve_attr, _top_level_names
+
+    intern = sys.intern
+    nodes = []
+    aliases = []
+    exports: Dict[str, Tuple[str, ...]] = {}
+    package_dir = _diagrams_package_dir()
+    found = []
+
+    for provider in providers:
+        provider_dir = package_dir / provider if package_dir else None
+        if provider_dir is None or not (provider_dir / "__init__.py").exists():
+            continue
+        provider = intern(provider)
+        found.append(provider)
+        provider_init = ast.parse((provider_dir / "__init__.py").read_text())
+        provider_classes, _ = _class_attrs(provider_init)
+        module_files = [provider_dir / "__init__.py"] + sorted(
+            p for p in provider_dir.glob("*.py") if p.name != "__init__.py"
+        )
+        for module_file in module_files:
+            if module_file.name == "__init__.py":
+                category = ""
+                tree, classes, module_aliases = provider_init, provider_classes, {}
+            else:
+                category = intern(module_file.stem)
+                tree = ast.parse(module_file.read_text())
+                classes, module_aliases = _class_attrs(tree)
+            module = intern(f"diagrams.{provider}.{category}" if category else f"diagrams.{provider}")
+            exports[module] = tuple(sorted(intern(name) for name in set(_top_level_names(tree))))
+
+            scopes = [classes, provider_classes]
+            names = set()
+            for class_name in classes:
+                if class_name.startswith("_"):
+                    continue
+                icon = _resolve_attr(class_name, "_icon", scopes)
+                icon_dir = _resolve_attr(class_name, "_icon_dir", scopes)
+                if not icon or not icon_dir:
+                    continue
+                names.add(class_name)
+                nodes.append((provider, category, intern(class_name), intern(f"{icon_dir}/{icon}")))
+            for alias, target in module_aliases.items():
+                if target in names:
+                    aliases.append((module, intern(alias), intern(target)))
+
+    return {
+        "format": CATALOG_FORMAT,
+        "diagrams_version": diagrams_version(),
+        "providers": tuple(found),
+        "requested_providers": tuple(providers),
+        "nodes": tuple(nodes),
+        "aliases": tuple(aliases),
+        "exports": exports,
+    }
+
+
+class NodeCatalog:
+    """Read-only node classes plus path, module, name and provider indexes"""
+
+    __slots__ = ("diagrams_version", "providers", "nodes", "by_path", "module_names", "exports",
+                 "by_name", "categories", "resources_root")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.diagrams_version = data["diagrams_version"]
+        self.providers = data["providers"]
+        self.nodes = tuple(NodeClass(*record) for record in data["nodes"])
+
+        by_path: Dict[str, NodeClass] = {node.path: node for node in self.nodes}
+        module_names: Dict[str, set] = {}
+        by_name: Dict[str, List[NodeClass]] = {}
+        categories: Dict[str, List[str]] = {provider: [] for provider in self.providers}
+        for node in self.nodes:
+            module_names.setdefault(node.module, set()).add(node.name)
+            by_name.setdefault(node.name.lower(), []).append(node)
+            if node.category and node.category not in categories[node.provider]:
+                categories[node.provider].append(node.category)
+        for module, alias, target in data["aliases"]:
+            node = by_path[f"{module}.{target}"]
+            by_path[f"{module}.{alias}"] = node
+            module_names[module].add(alias)
+            by_name.setdefault(alias.lower(), []).append(node)
+
+        self.by_path = MappingProxyType(by_path)
+        self.module_names = MappingProxyType({module: frozenset(names) for module, names in module_names.items()})
+        self.exports = MappingProxyType({module: frozenset(names) for module, names in data["exports"].items()})
+        self.by_name = MappingProxyType({name: tuple(nodes) for name, nodes in by_name.items()})
+        self.categories = MappingProxyType({provider: tuple(names) for provider, names in categories.items()})
+        self.resources_root = _resources_root()
+
+    def resolve(self, module: str, name: str) -> Optional[NodeClass]:
+        """Node class imported as `from module import name`, aliases included"""
+        return self.by_path.get(f"{module}.{name}")
+
+    def find(self, name: str, provider: Optional[str] = None) -> Tuple[NodeClass, ...]:
+        """Node classes named name (case-insensitive, aliases included), optionally of one provider"""
+        nodes = self.by_name.get(name.lower(), ())
+        if provider:
+            nodes = tuple(node for node in nodes if node.provider == provider)
+        return nodes
+
+    def covers(self, module: str) -> bool:
+        """Whether module belongs to a catalogued provider, so the catalog is authoritative for it"""
+        parts = module.split(".")
+        return len(parts) >= 2 and parts[0] == "diagrams" and parts[1] in self.providers
+
+    def check_import(self, module: str, names: List[str]) -> Optional[str]:
+        """Error message the import would raise, for a module the catalog covers"""
+        exports = self.exports.get(module)
+        if exports is None:
+            return f"No module named '{module}'"
+        for name in names:
+            # A star import only needs the module to exist
+            if name == "*":
+                continue
+            if name not in exports and f"{module}.{name}" not in self.exports:
+                return f"cannot import name '{name}' from '{module}'"
+        return None
+
+    def icon_path(self, node: NodeClass) -> str:
+        return os.path.join(self.resources_root, node.icon)
+
+    def summary(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for node in self.nodes:
+            counts[node.provider] = counts.get(node.provider, 0) + 1
+        return {
+            "diagrams_version": self.diagrams_version,
+            "providers": counts,
+            "classes": len(self.nodes),
+            "aliases": len(self.by_path) - len(self.nodes),
+        }
+
+
+def _resources_root() -> str:
+    # Node._load_icon joins the icon dir onto the directory that contains the package
+    from diagram_compiler import _diagrams_package_dir
+    package_dir = _diagrams_package_dir()
+    return str(package_dir.parent) if package_dir else ""
+
+
+def compile_catalog(artifact_path: str = DEFAULT_ARTIFACT_PATH) -> Dict[str, Any]:
+    """Walk the installed provider modules and write the catalog artifact"""
+    data = build_catalog_data()
+    tmp_path = f"{artifact_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, artifact_path)
+    return data
+
+
+def load_catalog(artifact_path: Optional[str] = DEFAULT_ARTIFACT_PATH) -> NodeCatalog:
+    """Catalog from the artifact when it was built for the installed diagrams, else walked from the sources"""
+    if artifact_path:
+        try:
+            with open(artifact_path, "rb") as f:
+                data = pickle.load(f)
+            if (data.get("format") == CATALOG_FORMAT and data.get("diagrams_version") == diagrams_version()
+                    and data.get("requested_providers") == PROVIDERS):
+                return NodeCatalog(data)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError, KeyError):
+            pass
+    return NodeCatalog(build_catalog_data())
+
+
+_default_catalog: Optional[NodeCatalog] = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_node_catalog() -> NodeCatalog:
+    """Process-wide catalog; MCP_NODE_CATALOG overrides the artifact location"""
+    global _default_catalog
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            _default_catalog = load_catalog(os.getenv("MCP_NODE_CATALOG", DEFAULT_ARTIFACT_PATH))
+        return _default_catalog
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Diagrams node catalog for every provider")
+    parser.add_argument("--build", action="store_true", help="Write the catalog artifact")
+    parser.add_argument("--output", default=os.getenv("MCP_NODE_CATALOG", DEFAULT_ARTIFACT_PATH))
+    args = parser.parse_args()
+
+    if args.build:
+        data = compile_catalog(args.output)
+        print(f"Wrote {args.output}: diagrams {data['diagrams_version'] or 'not installed'}, "
+              f"{len(data['providers'])} providers, {len(data['nodes'])} classes, "
+              f"{len(data['aliases'])} aliases, {os.path.getsize(args.output)} bytes")
+    else:
+        print(json.dumps(load_catalog(args.output).summary(), indent=2))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Provider Service Catalog
+One index over PROVIDER_SERVICE_MAPPINGS for every provider, checked against
+the node catalog of installed classes once per process. A description is matched against
+all service keywords with a single regex pass instead of re-scanning each
+provider's mapping per service.
+"""
+
+import re
+import threading
+from typing import Dict, Any, Collection, List, Mapping, Optional
+
+# Category words that stand in for "some service of this kind" when a description
+# names no concrete service for a provider
+CATEGORY_WORDS = {
+    "network": ("network", "load balancer", "gateway", "cdn", "dns", "ingress"),
+    "compute": ("compute", "vm", "vms", "server", "servers", "api", "backend", "app", "application", "container"),
+    "database": ("database", "databases", "db", "sql", "datastore"),
+    "storage": ("storage", "bucket", "files", "blob", "object store"),
+    "analytics": ("analytics", "data warehouse", "streaming", "etl", "pipeline"),
+    "queue": ("queue", "messaging", "message bus", "events"),
+    "monitoring": ("monitoring", "metrics", "observability", "logging"),
+}
+
+# Left-to-right order of categories inside one provider's cluster
+TIER_ORDER = {
+    "network": 0, "web": 1, "compute": 1, "queue": 2, "analytics": 2,
+    "database": 3, "inmemory": 3, "storage": 3, "monitoring": 4,
+}
+
+
+def _word_pattern(words: List[str]) -> "re.Pattern":
+    # Longest first so "cloud sql" wins over "sql"
+    alternatives = sorted({w.lower() for w in words}, key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(w) for w in alternatives) + r")\b", re.IGNORECASE)
+
+
+class ProviderCatalog:
+    """Keyword, category and class-name indexes over the provider service mappings"""
+
+    def __init__(self, mappings: Dict[str, Dict[str, str]], node_index: Mapping[str, Collection[str]]):
+        self.entries: List[Dict[str, Any]] = []
+        self.invalid: List[str] = []
+        self.by_keyword: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_category: Dict[tuple, List[Dict[str, Any]]] = {}
+        self.by_class: Dict[str, List[Dict[str, Any]]] = {}
+
+        for provider, services in mappings.items():
+            for keyword, path in services.items():
+                module, _, name = path.rpartition(".")
+                if name not in node_index.get(module, {}):
+                    # A stale hand-written mapping; never offer it
+                    self.invalid.append(path)
+                    continue
+                entry = {
+                    "provider": provider,
+                    "keyword": keyword,
+                    "category": module.rsplit(".", 1)[-1],
+                    "class": name,
+                    "class_path": path[len("diagrams."):] if path.startswith("diagrams.") else path,
+                }
+                self.entries.append(entry)
+                self.by_keyword.setdefault(keyword.lower(), []).append(entry)
+                self.by_category.setdefault((provider, entry["category"]), []).append(entry)
+                self.by_class.setdefault(name.lower(), []).append(entry)
+
+        self._keyword_pattern = _word_pattern(list(self.by_keyword)) if self.by_keyword else None
+        self._category_patterns = {category: _word_pattern(list(words)) for category, words in CATEGORY_WORDS.items()}
+
+    def providers(self) -> List[str]:
+        return sorted({entry["provider"] for entry in self.entries})
+
+    def match(self, text: str, providers: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """{provider: [entry]} for every service keyword in text, each hit going to the first listed provider that has it"""
+        matches: Dict[str, List[Dict[str, Any]]] = {provider: [] for provider in providers}
+        if not self._keyword_pattern:
+            return matches
+        seen = set()
+        for hit in self._keyword_pattern.finditer(text):
+            candidates = {entry["provider"]: entry for entry in self.by_keyword[hit.group(1).lower()]}
+            for provider in providers:
+                entry = candidates.get(provider)
+                if entry and entry["class_path"] not in seen:
+                    seen.add(entry["class_path"])
+                    matches[provider].append(entry)
+                    break
+        return matches
+
+    def category_defaults(self, text: str, provider: str) -> List[Dict[str, Any]]:
+        """First service of each category the text mentions generically"""
+        defaults = []
+        for category, pattern in self._category_patterns.items():
+            entries = self.by_category.get((provider, category))
+            if entries and pattern.search(text):
+                defaults.append(entries[0])
+        return defaults
+
+    def representative(self, provider: str) -> Optional[Dict[str, Any]]:
+        """A compute service (or anything) to stand for a provider nothing else matched"""
+        entries = self.by_category.get((provider, "compute"))
+        if entries:
+            return entries[0]
+        return next((entry for entry in self.entries if entry["provider"] == provider), None)
+
+    def lookup(self, name: str, providers: List[str]) -> Optional[Dict[str, Any]]:
+        """Entry for a keyword or class name, preferring providers in the given order"""
+        key = name.strip().lower()
+        candidates = self.by_keyword.get(key, []) + self.by_class.get(key, [])
+        for provider in providers:
+            for entry in candidates:
+                if entry["provider"] == provider:
+                    return entry
+        return candidates[0] if candidates else None
+
+
+_default_catalog: Optional[ProviderCatalog] = None
+_default_catalog_mappings: Optional[Mapping[str, Mapping[str, str]]] = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_provider_catalog(mappings: Dict[str, Dict[str, str]]) -> ProviderCatalog:
+    """Process-wide catalog over `mappings`, rebuilt when called with a different mappings object"""
+    global _default_catalog, _default_catalog_mappings
+    with _default_catalog_lock:
+        if _default_catalog is None or _default_catalog_mappings is not mappings:
+            from node_catalog import get_node_catalog
+            _default_catalog = ProviderCatalog(mappings, get_node_catalog().module_names)
+            _default_catalog_mappings = mappings
+        return _default_catalog
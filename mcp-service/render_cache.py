@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Diagram Render Cache
+Content-addressed cache of rendered diagrams keyed by normalized diagram code,
+format and theme, with an in-memory LRU tier in front of a size-bounded disk tier
+"""
+
+import ast
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+# Cache lookups made while serving the current tool call ("memory", "disk" or "miss"),
+# reported back to the wrapper in the result's _meta
+render_cache_events: ContextVar[Optional[List[str]]] = ContextVar("render_cache_events", default=None)
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+
+class _StripDiagramFilename(ast.NodeTransformer):
+    """Drops filename= from Diagram(...) calls; it only names the output file"""
+
+    def visit_Call(self, node: ast.Call):
+        self.generic_visit(node)
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+        if name == "Diagram":
+            node.keywords = [kw for kw in node.keywords if kw.arg != "filename"]
+        return node
+
+
+def normalize_code(code: str) -> str:
+    """Canonical form of diagram code: no comments, whitespace or Diagram filename="""
+    try:
+        tree = _StripDiagramFilename().visit(ast.parse(code))
+        return ast.dump(tree, annotate_fields=False)
+    except (SyntaxError, ValueError):
+        # Not parseable; still ignore comment lines and whitespace differences
+        lines = [line for line in code.splitlines() if not line.lstrip().startswith("#")]
+        return " ".join(" ".join(lines).split())
+
+
+def render_cache_key(code: str, format: str, theme: Optional[str] = None) -> str:
+    digest = hashlib.sha256()
+    for part in (normalize_code(code), format.lower(), theme or ""):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Two-tier cache of rendered bytes: memory LRU, then disk, both bounded by size"""
+
+    def __init__(self, root: Optional[str] = None, memory_max_bytes: int = 64 * 1024 * 1024,
+                 disk_max_bytes: int = 512 * 1024 * 1024):
+        self.root = Path(root or os.path.join(tempfile.gettempdir(), "mcp-render-cache"))
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, code: str, format: str, theme: Optional[str] = None) -> Tuple[Optional[bytes], str]:
+        """Return (bytes, tier) where tier is "memory", "disk" or "miss" """
+        key = f"{render_cache_key(code, format, theme)}.{format.lower()}"
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._event(data, "memory")
+
+        path = self.root / key
+        try:
+            data = path.read_bytes()
+            # Refresh so disk eviction treats it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return self._event(None, "miss")
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, data)
+        return self._event(data, "disk")
+
+    def put(self, code: str, format: str, theme: Optional[str], data: bytes):
+        key = f"{render_cache_key(code, format, theme)}.{format.lower()}"
+        with self._lock:
+            self._remember(key, data)
+
+        path = self.root / key
+        if not path.exists():
+            # Write then rename so a concurrent reader never sees a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            self._evict_disk()
+
+    def _event(self, data: Optional[bytes], tier: str) -> Tuple[Optional[bytes], str]:
+        events = render_cache_events.get()
+        if events is not None:
+            events.append(tier)
+        return data, tier
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _evict_disk(self):
+        """Drop the least recently used files until the disk tier fits disk_max_bytes"""
+        entries = []
+        for path in self.root.iterdir():
+            if not _KEY_PATTERN.match(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_default_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """Process-wide cache configured from MCP_RENDER_CACHE*; None when disabled"""
+    global _default_cache
+    if os.getenv("MCP_RENDER_CACHE", "true").lower() != "true":
+        return None
+    if _default_cache is None:
+        _default_cache = RenderCache(
+            root=os.getenv("MCP_RENDER_CACHE_DIR"),
+            memory_max_bytes=int(os.getenv("MCP_RENDER_CACHE_MEMORY_MB", "64")) * 1024 * 1024,
+            disk_max_bytes=int(os.getenv("MCP_RENDER_CACHE_DISK_MB", "512")) * 1024 * 1024
+        )
+    return _default_cache
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Sandboxed Diagram Render Workers
+Runs untrusted diagrams code in a pool of pre-warmed worker processes, one job
+per worker at a time, each in its own working directory with CPU, memory and
+wall-clock limits and its own stdout/stderr capture
+"""
+
+import asyncio
+import atexit
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+import pkgutil
+import resource
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Deque, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Extra wall-clock time the parent allows beyond the in-worker alarm before killing the worker
+KILL_GRACE_SECONDS = 5.0
+
+
+class RenderLimitExceeded(Exception):
+    """Raised inside a worker when a job exceeds its CPU or wall-clock budget"""
+
+
+def _raise_limit(signum, frame):
+    name = "CPU time" if signum == signal.SIGXCPU else "wall-clock time"
+    raise RenderLimitExceeded(f"Render exceeded its {name} limit")
+
+
+def _preload_diagrams():
+    """Import diagrams and every provider module so jobs start warm"""
+    try:
+        import diagrams
+    except ImportError:
+        return
+    for provider in pkgutil.iter_modules(diagrams.__path__):
+        if not provider.ispkg:
+            continue
+        package = importlib.import_module(f"diagrams.{provider.name}")
+        for module in pkgutil.iter_modules(package.__path__):
+            try:
+                importlib.import_module(f"diagrams.{provider.name}.{module.name}")
+            except Exception:
+                pass
+
+
+def _worker_main(conn, memory_mb: int):
+    # fds 0 and 1 are inherited from the MCP server, where they carry JSON-RPC;
+    # nothing a job or Graphviz does may read from or print to them
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+
+    if memory_mb > 0:
+        # RLIMIT_RSS is not enforced on Linux, so cap the address space instead
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    signal.signal(signal.SIGXCPU, _raise_limit)
+    signal.signal(signal.SIGALRM, _raise_limit)
+    _preload_diagrams()
+    conn.send({"ready": True})
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        conn.send(_run_job(job))
+
+
+def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute one render job inside a worker"""
+    work_dir = job["work_dir"]
+    format = job["format"]
+    stdout_capture = io.StringIO()
+    stderr_capture = io.StringIO()
+    previous_cwd = os.getcwd()
+    _, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+
+    try:
+        os.chdir(work_dir)
+        if job.get("cpu_seconds"):
+            # RLIMIT_CPU counts the whole process lifetime, so budget from current usage
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            soft = int(usage.ru_utime + usage.ru_stime + job["cpu_seconds"]) + 1
+            if cpu_hard != resource.RLIM_INFINITY:
+                soft = min(soft, cpu_hard)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, cpu_hard))
+        if job.get("wall_seconds"):
+            signal.setitimer(signal.ITIMER_REAL, job["wall_seconds"])
+
+        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+            exec(job["code"], {"__name__": "__main__"})
+
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        expected = os.path.join(work_dir, f"diagram.{format}")
+        if not os.path.exists(expected):
+            generated = sorted(f for f in os.listdir(work_dir) if f.endswith(f".{format}"))
+            expected = os.path.join(work_dir, generated[0]) if generated else None
+
+        if not expected:
+            return {
+                "success": False,
+                "error": "No diagram file was generated",
+                "stdout": stdout_capture.getvalue(),
+                "stderr": stderr_capture.getvalue(),
+                "temp_dir_contents": os.listdir(work_dir)
+            }
+        return {
+            "success": True,
+            "output_file": expected,
+            "stdout": stdout_capture.getvalue(),
+            "stderr": stderr_capture.getvalue()
+        }
+
+    except (Exception, SystemExit) as e:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        return {
+            "success": False,
+            "error": f"Failed to generate diagram: {str(e)}",
+            "error_type": type(e).__name__,
+            "stdout": stdout_capture.getvalue(),
+            "stderr": stderr_capture.getvalue()
+        }
+
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_hard, cpu_hard))
+        os.chdir(previous_cwd)
+
+
+class _RenderWorker:
+    """One worker process and the parent end of its pipe"""
+
+    def __init__(self, context, memory_mb: int, startup_timeout: float):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_mb),
+            name="mcp-render-worker",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+        if not self.conn.poll(startup_timeout):
+            self.kill()
+            raise RuntimeError(f"Render worker did not start within {startup_timeout}s")
+        self.conn.recv()
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def run(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self.jobs += 1
+        self.conn.send(job)
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"Render worker did not answer within {timeout:.0f}s")
+        return self.conn.recv()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=2)
+        except (OSError, BrokenPipeError):
+            pass
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=2)
+
+
+class RenderWorkerPool:
+    """Fixed-size pool of render workers, recycled after max_jobs_per_worker jobs"""
+
+    def __init__(self, size: int = 2, max_jobs_per_worker: int = 50, cpu_seconds: float = 30.0,
+                 memory_mb: int = 1024, wall_timeout: float = 60.0, startup_timeout: float = 30.0,
+                 checkout_timeout: Optional[float] = None):
+        self.size = max(1, size)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.wall_timeout = wall_timeout
+        self.startup_timeout = startup_timeout
+        # How long a render waits for a busy pool before it fails instead of queueing forever
+        self.checkout_timeout = wall_timeout + startup_timeout if checkout_timeout is None else checkout_timeout
+        # spawn rather than fork: the server has an event loop and threads running
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: Deque[_RenderWorker] = deque()
+        self._lock = threading.Lock()
+        # Signalled whenever a worker goes idle or a worker slot frees up
+        self._available = threading.Condition(self._lock)
+        self._workers = 0
+        self._closed = False
+        self.jobs_total = 0
+        self.recycled_total = 0
+        self.killed_total = 0
+
+    def start(self):
+        """Spawn workers up to the pool size"""
+        while True:
+            with self._lock:
+                if self._closed or self._workers >= self.size:
+                    return
+                self._workers += 1
+            if not self._spawn_idle():
+                return
+
+    def start_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.start, name="mcp-render-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    async def render(self, code: str, format: str, work_dir: str) -> Dict[str, Any]:
+        """Run diagrams code in a worker with work_dir as its cwd; safe to await from any event loop"""
+        job = {
+            "code": code,
+            "format": format,
+            "work_dir": work_dir,
+            "cpu_seconds": self.cpu_seconds,
+            "wall_seconds": self.wall_timeout,
+        }
+        return await asyncio.to_thread(self._render_blocking, job)
+
+    def _render_blocking(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            worker = self._checkout(self.checkout_timeout)
+        except Exception as e:
+            # Pool busy past the deadline, closed, or a worker failed to start
+            return {
+                "success": False,
+                "error": f"Failed to generate diagram: {e}",
+                "stdout": "",
+                "stderr": "",
+                "render_seconds": round(time.perf_counter() - started, 4)
+            }
+        keep = False
+        try:
+            result = worker.run(job, self.wall_timeout + KILL_GRACE_SECONDS)
+            keep = True
+        except (TimeoutError, EOFError, OSError) as e:
+            self.killed_total += 1
+            reason = "exceeded its limits" if isinstance(e, TimeoutError) else "exited"
+            logger.warning(f"Render worker pid={worker.process.pid} {reason}: {e}")
+            result = {
+                "success": False,
+                "error": f"Failed to generate diagram: render worker {reason} "
+                         f"(wall {self.wall_timeout}s, cpu {self.cpu_seconds}s, memory {self.memory_mb}MB)",
+                "stdout": "",
+                "stderr": ""
+            }
+        finally:
+            self.jobs_total += 1
+            self._checkin(worker, keep)
+
+        result["render_seconds"] = round(time.perf_counter() - started, 4)
+        return result
+
+    def _checkout(self, timeout: float) -> _RenderWorker:
+        """An idle worker, a newly spawned one while the pool has room, else wait up to timeout"""
+        deadline = time.monotonic() + timeout
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Render worker pool is closed")
+                if self._idle:
+                    return self._idle.popleft()
+                if self._workers < self.size:
+                    self._workers += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"no render worker became available within {timeout:g}s")
+                self._available.wait(remaining)
+        try:
+            return _RenderWorker(self._context, self.memory_mb, self.startup_timeout)
+        except Exception:
+            self._release_slot()
+            raise
+
+    def _release_slot(self):
+        # A waiter may now spawn the worker this slot was meant for
+        with self._available:
+            self._workers -= 1
+            self._available.notify()
+
+    def _checkin(self, worker: _RenderWorker, keep: bool):
+        if self._closed:
+            worker.close()
+            return
+        if keep and worker.is_alive and worker.jobs < self.max_jobs_per_worker:
+            with self._available:
+                self._idle.append(worker)
+                self._available.notify()
+            return
+
+        if keep:
+            # Shed whatever state the worker accumulated across jobs
+            self.recycled_total += 1
+            worker.close()
+        else:
+            worker.kill()
+        threading.Thread(target=self._spawn_idle, name="mcp-render-respawn", daemon=True).start()
+
+    def _spawn_idle(self) -> bool:
+        try:
+            worker = _RenderWorker(self._context, self.memory_mb, self.startup_timeout)
+        except Exception as e:
+            logger.error(f"Failed to start render worker: {e}")
+            self._release_slot()
+            return False
+        with self._available:
+            if not self._closed:
+                self._idle.append(worker)
+                self._available.notify()
+                return True
+        worker.close()
+        return False
+
+    def close(self):
+        with self._available:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._available.notify_all()
+        for worker in idle:
+            worker.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "workers": self._workers,
+            "idle": len(self._idle),
+            "jobs_total": self.jobs_total,
+            "recycled_total": self.recycled_total,
+            "killed_total": self.killed_total,
+            "max_jobs_per_worker": self.max_jobs_per_worker,
+        }
+
+
+_default_pool: Optional[RenderWorkerPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> RenderWorkerPool:
+    """Process-wide pool configured from the MCP_RENDER_* environment variables"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = RenderWorkerPool(
+                size=int(os.getenv("MCP_RENDER_WORKERS", str(min(4, os.cpu_count() or 1)))),
+                max_jobs_per_worker=int(os.getenv("MCP_RENDER_MAX_JOBS", "50")),
+                cpu_seconds=float(os.getenv("MCP_RENDER_CPU_SECONDS", "30")),
+                memory_mb=int(os.getenv("MCP_RENDER_MEMORY_MB", "1024")),
+                wall_timeout=float(os.getenv("MCP_RENDER_TIMEOUT", "60")),
+                checkout_timeout=float(os.environ["MCP_RENDER_QUEUE_TIMEOUT"]) if os.getenv("MCP_RENDER_QUEUE_TIMEOUT") else None
+            )
+            atexit.register(_default_pool.close)
+        return _default_pool
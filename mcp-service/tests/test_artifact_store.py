@@ -0,0 +1,60 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+import artifact_store
+from artifact_store import ArtifactStore
+
+
+def test_put_is_content_addressed(tmp_path):
+    store = ArtifactStore(root=str(tmp_path))
+    key = store.put(b"png bytes", "PNG")
+    assert key == hashlib.sha256(b"png bytes").hexdigest() + ".png"
+    assert store.put(b"png bytes", "png") == key
+    assert store.get(key) == b"png bytes"
+    assert store.describe(key)["content_type"] == "image/png"
+
+
+def test_invalid_keys_never_reach_the_filesystem(tmp_path):
+    store = ArtifactStore(root=str(tmp_path / "store"))
+    (tmp_path / "secret.png").write_bytes(b"secret")
+    assert store.path("../secret.png") is None
+    assert store.get("0" * 64 + ".png") is None
+    assert store.delete("../secret.png") is False
+    assert (tmp_path / "secret.png").exists()
+
+
+def test_evict_drops_expired_then_oldest(tmp_path):
+    store = ArtifactStore(root=str(tmp_path), max_bytes=10, ttl_seconds=60)
+    expired = store.put(b"a" * 4, "png")
+    stale = time.time() - 120
+    os.utime(store.path(expired), (stale, stale))
+
+    oldest = store.put(b"b" * 4, "png")
+    older = time.time() - 30
+    os.utime(store.path(oldest), (older, older))
+    newest = store.put(b"c" * 4, "png")
+    assert store.path(expired) is None
+
+    store.put(b"d" * 4, "png")
+    # 12 bytes over a 10 byte bound: the oldest live artifact goes
+    assert store.path(oldest) is None
+    assert store.path(newest) is not None
+
+
+def test_artifact_endpoint_streams_stored_bytes(tmp_path, monkeypatch):
+    testclient = pytest.importorskip("fastapi.testclient")
+    import mcp_http_wrapper
+
+    store = ArtifactStore(root=str(tmp_path))
+    monkeypatch.setattr(artifact_store, "_default_store", store)
+    key = store.put(b"<svg/>", "svg")
+    client = testclient.TestClient(mcp_http_wrapper.app)
+
+    response = client.get(f"/mcp/artifacts/{key}")
+    assert response.status_code == 200
+    assert response.content == b"<svg/>"
+    assert response.headers["content-type"].startswith("image/svg+xml")
+    assert client.get("/mcp/artifacts/" + "0" * 64 + ".svg").status_code == 404
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import azure_catalog
+from azure_catalog import compile_catalog, get_azure_catalog, load_catalog, reload_azure_catalog
+
+NODES = {
+    "compute": [
+        {"class": "_Compute", "canonical": "_Compute", "aliases": []},
+        {"class": "AppServices", "canonical": "AppServices", "aliases": ["AppService2"]},
+        {"class": "FunctionApps", "canonical": "FunctionApps", "aliases": []},
+    ],
+    "database": [
+        {"class": "SQLDatabases", "canonical": "SQLDatabases", "aliases": ["SQL"]},
+    ],
+}
+
+
+@pytest.fixture
+def nodes_path(tmp_path, monkeypatch):
+    path = tmp_path / "azure_nodes.json"
+    path.write_text(json.dumps(NODES))
+    monkeypatch.setenv("MCP_AZURE_NODES", str(path))
+    monkeypatch.setenv("MCP_AZURE_CATALOG", str(tmp_path / "azure_nodes.catalog"))
+    monkeypatch.setenv("MCP_CATALOG_WATCH_SECONDS", "0")
+    # Fresh process-wide catalog for every test
+    monkeypatch.setattr(azure_catalog, "_default_catalog", None)
+    monkeypatch.setattr(azure_catalog, "_source_stat", None)
+    return path
+
+
+def test_indexes_resolve_aliases_and_common_mistakes(nodes_path):
+    catalog = load_catalog(str(nodes_path), None)
+    assert "_Compute" not in catalog.canonical_map
+    assert catalog.resolve("SQL").import_path == "diagrams.azure.database"
+    assert catalog.resolve("AppService2").canonical == "AppServices"
+    assert catalog.common_mistakes["AppService"] == "AppServices"
+    assert catalog.submodule_components["compute"] == ("AppServices", "FunctionApps")
+
+
+def test_stale_artifact_is_ignored(nodes_path, tmp_path):
+    artifact = str(tmp_path / "azure_nodes.catalog")
+    compiled = compile_catalog(str(nodes_path), artifact)
+    assert load_catalog(str(nodes_path), artifact).source_sha256 == compiled["source_sha256"]
+
+    nodes = dict(NODES, storage=[{"class": "BlobStorage", "canonical": "BlobStorage", "aliases": []}])
+    nodes_path.write_text(json.dumps(nodes))
+    catalog = load_catalog(str(nodes_path), artifact)
+    assert catalog.source_sha256 != compiled["source_sha256"]
+    assert catalog.resolve("BlobStorage") is not None
+
+
+def test_reload_swaps_in_a_changed_catalog_with_its_derived_indexes(nodes_path):
+    current = get_azure_catalog()
+    current.derived("names", lambda catalog: sorted(catalog.canonical_map))
+    assert reload_azure_catalog() == {"reloaded": False, "version": current.version}
+
+    nodes = dict(NODES, storage=[{"class": "BlobStorage", "canonical": "BlobStorage", "aliases": []}])
+    nodes_path.write_text(json.dumps(nodes))
+    result = reload_azure_catalog()
+    assert result["reloaded"] is True
+    assert result["previous_version"] == current.version
+
+    reloaded = get_azure_catalog()
+    assert reloaded is not current and reloaded.version == result["version"]
+    # Derived indexes were rebuilt over the new catalog before the swap
+    assert "BlobStorage" in reloaded.derived("names", lambda catalog: [])
+
+
+def test_reload_keeps_serving_when_the_file_is_broken(nodes_path):
+    current = get_azure_catalog()
+    nodes_path.write_text("{not json")
+    result = reload_azure_catalog()
+    assert result["reloaded"] is False
+    assert "Could not load" in result["error"]
+    assert get_azure_catalog() is current
+    assert reload_azure_catalog(force=True)["version"] == current.version
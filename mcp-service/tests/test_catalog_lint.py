@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+from catalog_lint import extract_azure_imports, lint_corpus, read_corpus  # noqa: E402
+
+PROGRAM = """\
+from diagrams import Diagram
+from diagrams.azure.compute import FunctionApp
+from diagrams.azure.database import KeyVaults
+from diagrams.azure.security import KeyVolts
+from diagrams.azure.compute import FunctionApps
+"""
+
+
+def test_extract_azure_imports_ignores_other_imports():
+    assert [name for _, _, name in extract_azure_imports(PROGRAM)] == [
+        "FunctionApp", "KeyVaults", "KeyVolts", "FunctionApps"
+    ]
+
+
+def test_lint_classifies_each_kind_of_mistake():
+    report = lint_corpus(programs=[{"id": "a", "code": PROGRAM}, {"id": "b", "code": "def ("}], workers=1)
+    assert (report["files"], report["files_with_issues"], report["parse_errors"]) == (2, 2, 1)
+
+    issues = {issue.get("name"): issue for issue in report["reports"][0]["issues"]}
+    assert set(issues) == {"FunctionApp", "KeyVaults", "KeyVolts"}
+    assert issues["FunctionApp"]["kind"] == "unknown_name"
+    assert issues["FunctionApp"]["suggestion"] == "FunctionApps"
+    assert issues["KeyVaults"]["kind"] == "wrong_module"
+    assert issues["KeyVaults"]["suggested_module"] == "diagrams.azure.security"
+    # Scored by trigram cosine similarity rather than a known spelling
+    assert issues["KeyVolts"]["suggestion"] == "KeyVaults"
+    assert 0.5 <= issues["KeyVolts"]["score"] < 1.0
+    assert report["reports"][1]["issues"] == [{"kind": "parse_error", "error": "SyntaxError: invalid syntax (line 1)"}]
+
+
+def test_top_mistakes_count_files_once_per_mistake():
+    wrong = "from diagrams.azure.compute import FunctionApp\nfrom diagrams.azure.compute import FunctionApp\n"
+    programs = [{"id": str(i), "code": wrong} for i in range(3)] + [{"id": "clean", "code": PROGRAM.splitlines()[-1]}]
+    report = lint_corpus(programs=programs, workers=1, include_clean=True)
+    assert report["top_mistakes"] == [{
+        "module": "diagrams.azure.compute", "name": "FunctionApp", "kind": "unknown_name",
+        "suggestion": "FunctionApps", "suggested_module": "diagrams.azure.compute", "score": 1.0,
+        "alternatives": [], "count": 6, "files": 3,
+    }]
+    assert report["reports"][-1] == {"file": "clean", "imports": 1, "issues": []}
+
+
+def test_ndjson_corpus_reports_bad_records(tmp_path):
+    corpus = tmp_path / "history.ndjson"
+    corpus.write_text("\n".join([json.dumps({"id": "ok", "code": PROGRAM}), "{broken", json.dumps(["x"])]) + "\n")
+    records = list(read_corpus(str(corpus)))
+    assert records[0] == ("ok", None, PROGRAM, None)
+    assert records[1][0] == "line 2" and records[1][3].startswith("Invalid JSON")
+    assert records[2] == ("line 3", None, None, "Record has no code")
+
+
+def test_directory_corpus_skips_files_outside_root(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "inside.py").write_text(PROGRAM)
+    outside = tmp_path / "outside.py"
+    outside.write_text(PROGRAM)
+    os.symlink(outside, corpus / "link.py")
+
+    ids = [record[0] for record in read_corpus(str(corpus), root=os.path.realpath(corpus))]
+    assert ids == ["inside.py"]
+    assert len(list(read_corpus(str(corpus)))) == 2
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from azure_catalog import DEFAULT_NODES_PATH, load_catalog
+from component_matcher import ComponentMatcher, _edit_masks, _levenshtein, matcher_for
+
+
+def reference_levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return ComponentMatcher(load_catalog(DEFAULT_NODES_PATH, None))
+
+
+def test_bit_parallel_edit_distance_matches_the_reference():
+    rng = random.Random(0)
+    for _ in range(500):
+        a = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 12)))
+        b = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 12)))
+        assert _levenshtein(_edit_masks(a), len(a), b) == reference_levenshtein(a, b)
+
+
+def test_known_spellings_score_one(matcher):
+    assert matcher.exact("appservices") == ("AppServices", "same name, different case")
+    assert matcher.exact("AzureFunctions")[0] == "FunctionApps"
+    assert matcher.exact("Redis") == ("CacheForRedis", "service name")
+    assert matcher.match("AzureSQL")[0] == {
+        "name": "SQLDatabases", "submodule": "database", "score": 1.0, "reason": "service name"
+    }
+
+
+def test_misspellings_rank_the_intended_component_first(matcher):
+    best = matcher.match("KeyVolts")[0]
+    assert best["name"] == "KeyVaults"
+    typo = matcher.match("CosmosDBB")
+    assert typo[0]["name"] == "CosmosDb"
+    assert typo[0]["reason"] == "similar spelling"
+    assert all(c["score"] >= matcher.threshold for c in typo)
+    assert [c["score"] for c in typo] == sorted((c["score"] for c in typo), reverse=True)
+
+
+def test_threshold_and_limit(matcher):
+    assert matcher.match("") == []
+    assert matcher.match("zzqqxx") == []
+    assert len(matcher.match("Storage", threshold=0.0, limit=3)) == 3
+
+
+def test_each_catalog_snapshot_gets_its_own_matcher():
+    first = load_catalog(DEFAULT_NODES_PATH, None)
+    second = load_catalog(DEFAULT_NODES_PATH, None)
+    assert matcher_for(first) is matcher_for(first)
+    assert matcher_for(second) is not matcher_for(first)
@@ -0,0 +1,104 @@
+import re
+
+import pytest
+
+from diagram_compiler import UnsupportedDiagramCode, check_diagrams_import, compile_diagram, compile_to_dot
+
+diagrams = pytest.importorskip("diagrams")
+
+PROGRAMS = {
+    "clusters_and_edges": '''
+from diagrams import Diagram, Cluster, Edge
+from diagrams.azure.compute import AppServices, FunctionApps
+from diagrams.azure.database import SQLDatabases
+from diagrams.azure.network import ApplicationGateway
+
+with Diagram("Web App", show=False, direction="LR"):
+    gw = ApplicationGateway("Gateway")
+    with Cluster("App Tier"):
+        apps = [AppServices("Web 1"), AppServices("Web 2")]
+    db = SQLDatabases("DB")
+    gw >> Edge(label="HTTPS", color="blue") >> apps >> db
+    FunctionApps("Jobs") - db
+''',
+    "nested_clusters_and_loops": '''
+from diagrams import Diagram, Cluster
+from diagrams.aws.compute import EC2, ECS
+from diagrams.aws.network import ELB
+
+with Diagram("Workers", show=False, graph_attr={"splines": "curved"}):
+    lb = ELB("lb")
+    with Cluster("Region"):
+        with Cluster("Services"):
+            services = [ECS(f"svc {i}") for i in range(3)]
+        workers = [EC2(name) for name in ("a", "b")]
+    lb >> services
+    for worker in workers:
+        services[0] << worker
+''',
+    "aliases_and_reverse_edges": '''
+from diagrams import Diagram
+from diagrams.azure.compute import AKS, VM
+from diagrams.onprem.database import PostgreSQL
+
+with Diagram("Aliases", show=False, direction="TB"):
+    PostgreSQL("db") << AKS("cluster") << VM("vm")
+''',
+}
+
+
+def _runtime_dot(code, tmp_path, monkeypatch):
+    """DOT the diagrams library builds for code, captured instead of rendered"""
+    sources = []
+
+    def render(self):
+        sources.append(self.dot.source)
+        open(self.filename, "w").close()
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(diagrams.Diagram, "render", render)
+    exec(compile(code, "<diagram>", "exec"), {})
+    return sources[0]
+
+
+def _normalize_ids(dot):
+    # The runtime names nodes with random uuids, the compiler with a counter
+    ids = {}
+    return re.sub(r'"?\b(?:[0-9a-f]{32}|n\d+)\b"?', lambda m: ids.setdefault(m.group(0).strip('"'), f"n{len(ids)}"), dot)
+
+
+@pytest.mark.parametrize("name", sorted(PROGRAMS))
+def test_compiled_dot_matches_runtime(name, tmp_path, monkeypatch):
+    code = PROGRAMS[name]
+    expected = _runtime_dot(code, tmp_path, monkeypatch)
+    assert _normalize_ids(compile_to_dot(code)) == _normalize_ids(expected)
+
+
+def test_compile_is_deterministic():
+    code = PROGRAMS["clusters_and_edges"]
+    assert compile_to_dot(code) == compile_to_dot(code)
+
+
+def test_topology_key_ignores_labels_and_colours():
+    code = PROGRAMS["clusters_and_edges"]
+    relabelled = code.replace('"Web 1"', '"Frontend"').replace('"blue"', '"red"')
+    assert compile_diagram(relabelled).topology_key() == compile_diagram(code).topology_key()
+    rewired = code.replace('FunctionApps("Jobs") - db', 'FunctionApps("Jobs") - gw')
+    assert compile_diagram(rewired).topology_key() != compile_diagram(code).topology_key()
+
+
+@pytest.mark.parametrize("body", [
+    "x = 10 % 0",
+    "x = " + "-" * 5000 + "1",
+    "import os",
+    "open('/etc/passwd')",
+])
+def test_unsupported_code_raises(body):
+    code = f"from diagrams import Diagram\nwith Diagram('t', show=False):\n    {body}\n"
+    with pytest.raises(UnsupportedDiagramCode):
+        compile_diagram(code)
+
+
+def test_check_diagrams_import_accepts_star_imports():
+    assert check_diagrams_import("diagrams.azure.compute", ["*"]) is None
+    assert check_diagrams_import("diagrams.azure.compute", ["NoSuchClass"])
@@ -0,0 +1,118 @@
+import pytest
+
+from graph_spec import GraphSpecError, compile_graph_spec, resolve_node_class, validate_graph_spec
+
+pytest.importorskip("diagrams")
+
+SPEC = {
+    "title": "Web Application",
+    "direction": "LR",
+    "clusters": [{"id": "app", "label": "App Tier"}],
+    "nodes": [
+        {"id": "gw", "class": "azure.network.ApplicationGateway", "label": "Gateway"},
+        {"id": "web", "class": "azure.compute.AppServices", "label": "Web", "cluster": "app"},
+    ],
+    "edges": [{"from": "gw", "to": "web", "label": "HTTPS", "direction": "forward"}],
+}
+
+
+def test_valid_spec_has_no_errors():
+    assert validate_graph_spec(SPEC) == []
+
+
+def test_collects_every_error_instead_of_stopping_at_the_first():
+    spec = {
+        "title": "Broken",
+        "direction": "UP",
+        "clusters": [
+            {"id": "a", "label": "Tier"},
+            {"id": "a", "label": "Tier", "parent": "missing"},
+        ],
+        "nodes": [
+            {"id": "web", "class": "azure.compute.AppServicez"},
+            {"id": "web", "class": "azure.compute.AppServices", "cluster": "nowhere", "label": 3},
+        ],
+        "edges": [{"from": "web", "to": "db", "direction": "sideways", "attrs": {"penwidth": [1]}}],
+    }
+    errors = validate_graph_spec(spec)
+    assert errors == [
+        "direction must be one of TB, BT, LR, RL",
+        "clusters[1].id 'a' is not unique",
+        "clusters[1].label 'Tier' is used by another cluster",
+        "Cluster 'a' has unknown parent 'missing'",
+        "nodes[0]: Unknown node class 'AppServicez' in azure.compute; did you mean AppServices?",
+        "nodes[1].id 'web' is not unique",
+        "nodes[1].label must be a string",
+        "nodes[1].cluster 'nowhere' is not a declared cluster",
+        "edges[0].to 'db' is not a declared node",
+        "edges[0].direction must be one of forward, back, both, none",
+        "edges[0].attrs must be an object of string/number/boolean values",
+    ]
+
+
+def test_shape_errors_are_reported_before_item_checks():
+    assert validate_graph_spec({"nodes": "web", "edges": [1]}) == [
+        "nodes must be a list of objects",
+        "edges must be a list of objects",
+    ]
+    assert validate_graph_spec([]) == ["Graph spec must be an object"]
+    assert validate_graph_spec({}) == ["At least one node is required"]
+
+
+def test_cluster_cycles_are_rejected():
+    spec = dict(SPEC, clusters=[{"id": "a", "label": "A", "parent": "b"}, {"id": "b", "label": "B", "parent": "a"}])
+    assert "Cluster 'a' is nested inside itself" in validate_graph_spec(spec)
+
+
+def test_external_nodes_may_be_edge_endpoints():
+    spec = dict(SPEC, edges=[{"from": "gw", "to": "existing"}])
+    assert validate_graph_spec(spec) != []
+    assert validate_graph_spec(spec, external_nodes=("existing",)) == []
+
+
+def test_resolve_node_class_accepts_the_diagrams_prefix():
+    entry, error = resolve_node_class("diagrams.azure.compute.AppServices")
+    assert error is None
+    assert resolve_node_class("azure.compute.AppServices") == (entry, None)
+    assert resolve_node_class("AppServices")[1] == "Node class 'AppServices' must look like provider.category.Class"
+    assert resolve_node_class("azure.computer.VM")[1].startswith("Unknown category 'azure.computer'; did you mean")
+
+
+def test_compile_raises_with_all_errors():
+    with pytest.raises(GraphSpecError) as raised:
+        compile_graph_spec(dict(SPEC, direction="UP", edges=[{"from": "gw", "to": "db"}]))
+    assert len(raised.value.errors) == 2
+
+
+def test_compiles_clusters_nodes_and_edges():
+    dot = compile_graph_spec(SPEC).dot.source
+    assert 'subgraph "cluster_App Tier"' in dot
+    assert "label=Gateway" in dot
+    assert "label=HTTPS" in dot
+
+
+def test_unhashable_ids_and_references_are_reported():
+    spec = {
+        "clusters": [{"id": ["a"], "label": {"x": 1}}, {"id": "b", "label": "B", "parent": ["a"]}],
+        "nodes": [{"id": ["web"], "class": "azure.compute.AppServices", "cluster": ["b"]}],
+        "edges": [{"from": ["web"], "to": {"id": "web"}, "direction": ["x"]}],
+    }
+    errors = validate_graph_spec(spec)
+    assert "edges[0].direction must be one of forward, back, both, none" in errors
+    assert "Cluster 'b' has unknown parent '['a']'" in errors
+    assert "nodes[0].cluster '['b']' is not a declared cluster" in errors
+    assert len(errors) == 8
+
+
+def test_base_code_errors_become_graph_spec_errors():
+    base_code = "from diagrams import Diagram\nwith Diagram('t', show=False):\n    x = 10 % 0\n"
+    with pytest.raises(GraphSpecError, match="base diagram code cannot be compiled: ZeroDivisionError"):
+        compile_graph_spec(SPEC, base_code=base_code)
+
+
+def test_spec_edges_may_name_base_code_variables():
+    base_code = ("from diagrams import Diagram\nfrom diagrams.azure.database import SQLDatabases\n"
+                 "with Diagram('t', show=False):\n    db = SQLDatabases('DB')\n")
+    spec = dict(SPEC, edges=SPEC["edges"] + [{"from": "web", "to": "db"}])
+    dot = compile_graph_spec(spec, base_code=base_code).dot.source
+    assert "label=DB" in dot and "label=Web" in dot
@@ -0,0 +1,41 @@
+import pytest
+
+from graphviz_layout_pool import untrusted_dot_error
+
+
+@pytest.fixture
+def icons(tmp_path):
+    (tmp_path / "icon.png").write_bytes(b"png")
+    return tmp_path
+
+
+@pytest.mark.parametrize("dot", [
+    'digraph { a [image="/etc/passwd"] }',
+    'digraph { a ["image"="/etc/passwd"] }',
+    'digraph { a ["ima" + "ge"="/etc/" + "passwd"] }',
+    'digraph { a [image="icon.png"] }',
+    'digraph { imagepath="/etc"; a }',
+    'digraph { node [shapefile="/etc/passwd"]; a }',
+    'digraph { fontpath="/etc"; a }',
+    'digraph { a [fontname="/etc/passwd"] }',
+    'digraph { a [label=<<TABLE><TR><TD><IMG SRC="/etc/passwd"/></TD></TR></TABLE>>] }',
+])
+def test_file_references_outside_the_icon_roots_are_rejected(dot):
+    assert untrusted_dot_error(dot, ["/nonexistent-icons"])
+
+
+def test_icons_under_the_roots_are_allowed(icons):
+    icon = icons / "icon.png"
+    assert untrusted_dot_error(f'digraph {{ a [image="{icon}"] }}', [str(icons)]) is None
+    assert untrusted_dot_error(f'digraph {{ a [label=<<IMG SRC="{icon}"/>>] }}', [str(icons)]) is None
+    assert untrusted_dot_error(f'digraph {{ a [image="{icons}/../etc/passwd"] }}', [str(icons)])
+
+
+def test_comments_and_labels_are_not_attributes():
+    dot = '''// image="/etc/passwd"
+digraph {
+    /* shapefile="/etc/passwd" */
+    a [label="image=\\"/etc/passwd\\"" fontname="Sans-Serif"]
+    a -> b [label=<<b>bold</b>>]
+}'''
+    assert untrusted_dot_error(dot, []) is None
@@ -0,0 +1,68 @@
+import base64
+import io
+import os
+import time
+
+import pytest
+
+from icon_cache import IconCache, IconError
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def png_bytes(color, size=(32, 32)):
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, format="PNG")
+    return output.getvalue()
+
+
+def data_uri(color):
+    return "data:image/png;base64," + base64.b64encode(png_bytes(color)).decode()
+
+
+def test_data_uri_is_normalized_once(tmp_path):
+    cache = IconCache(root=str(tmp_path / "store"), size_px=16)
+    path = cache.ingest(data_uri("red"))
+    assert cache.ingest(data_uri("red")) == path
+    assert cache.ingested == 1
+    with Image.open(path) as image:
+        assert image.mode == "RGBA"
+        assert max(image.size) == 16
+
+
+def test_local_files_must_sit_under_the_icon_root(tmp_path):
+    icons = tmp_path / "icons"
+    icons.mkdir()
+    (icons / "ok.png").write_bytes(png_bytes("blue"))
+    (tmp_path / "secret.png").write_bytes(png_bytes("green"))
+    cache = IconCache(root=str(tmp_path / "store"), local_root=str(icons))
+
+    assert os.path.exists(cache.ingest(str(icons / "ok.png")))
+    with pytest.raises(IconError):
+        cache.ingest(str(tmp_path / "secret.png"))
+    with pytest.raises(IconError):
+        cache.ingest(str(icons / ".." / "secret.png"))
+
+
+def test_private_urls_are_rejected(tmp_path):
+    cache = IconCache(root=str(tmp_path / "store"))
+    with pytest.raises(IconError, match="non-public"):
+        cache.ingest("http://127.0.0.1/icon.png")
+    assert cache.downloads == 0
+
+
+def test_eviction_spares_icons_inside_the_render_window(tmp_path):
+    cache = IconCache(root=str(tmp_path / "store"), max_bytes=1, render_window=60)
+    first = cache.ingest(data_uri("red"))
+    second = cache.ingest(data_uri("blue"))
+    # Both may still be read by an in-flight render, so the store may overshoot
+    assert os.path.exists(first) and os.path.exists(second)
+    assert cache.evictions == 0
+
+    stale = time.time() - 120
+    os.utime(first, (stale, stale))
+    cache.ingest(data_uri("green"))
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+    assert cache.evictions == 1
+
@@ -0,0 +1,42 @@
+from layout_cache import LayoutCache
+
+
+def _layout(x):
+    return {"graph": {"bb": "0,0,100,100"}, "nodes": {"n1": {"pos": f"{x},0!"}}, "clusters": {},
+            "edges": {("n1", "n2", 0): {"pos": f"e,{x},0"}}}
+
+
+def test_evicts_least_recently_used():
+    cache = LayoutCache(max_entries=2)
+    cache.put("a", _layout(1))
+    cache.put("b", _layout(2))
+    assert cache.get("a") is not None
+    cache.put("c", _layout(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 1}
+
+
+def test_save_and_load_round_trip_edge_keys(tmp_path):
+    path = str(tmp_path / "layouts" / "warm.json")
+    cache = LayoutCache()
+    cache.put("a", _layout(1))
+    cache.put("b", _layout(2))
+    assert cache.save(path, ["a", "missing"]) == 1
+
+    restored = LayoutCache()
+    assert restored.load(path) == 1
+    assert restored.get("a") == _layout(1)
+    assert restored.get("b") is None
+
+
+def test_load_ignores_missing_and_malformed_files(tmp_path):
+    cache = LayoutCache()
+    assert cache.load(str(tmp_path / "missing.json")) == 0
+    bad = tmp_path / "bad.json"
+    bad.write_text('{"a": {"edges": [["n1"]]}, "b": 3}')
+    assert cache.load(str(bad)) == 0
+    bad.write_text("not json")
+    assert cache.load(str(bad)) == 0
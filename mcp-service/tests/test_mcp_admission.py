@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import pytest
+
+from mcp_admission import AdmissionController, AdmissionRejected, parse_tool_limits, request_deadline
+
+
+async def _hold(controller, key, started, release):
+    async with controller.admit(key):
+        started.set()
+        await release.wait()
+
+
+def test_admits_up_to_the_limit_then_queues():
+    async def scenario():
+        controller = AdmissionController(default_limit=1, max_queue=4, max_wait=5)
+        started, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, "tool", started, release))
+        await started.wait()
+
+        waiter_started = asyncio.Event()
+        waiter = asyncio.create_task(_hold(controller, "tool", waiter_started, asyncio.Event()))
+        await asyncio.sleep(0)
+        assert (controller.in_flight, controller.queue_depth) == (1, 1)
+
+        # The released slot is handed straight to the waiter
+        release.set()
+        await holder
+        await waiter_started.wait()
+        assert (controller.in_flight, controller.queue_depth) == (1, 0)
+        waiter.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_the_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(default_limit=1, max_queue=1, max_wait=5)
+        started, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, "tool", started, release))
+        await started.wait()
+        queued = asyncio.create_task(_hold(controller, "tool", asyncio.Event(), asyncio.Event()))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected, match="queue full") as rejected:
+            async with controller.admit("tool"):
+                pass
+        assert rejected.value.retry_after_header == "1"
+        assert controller.scaling_metrics()["tools"]["tool"]["rejected_total"] == 1
+        queued.cancel()
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+
+
+def test_rejects_up_front_when_the_expected_wait_passes_the_deadline():
+    async def scenario():
+        controller = AdmissionController(default_limit=1, max_queue=10, max_wait=5)
+        started, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, "tool", started, release))
+        await started.wait()
+        controller._limiter("tool").service_time = 2.5
+
+        token = request_deadline.set(time.monotonic() + 1)
+        try:
+            with pytest.raises(AdmissionRejected, match="request deadline") as rejected:
+                async with controller.admit("tool"):
+                    pass
+        finally:
+            request_deadline.reset(token)
+        assert rejected.value.retry_after == 2.5
+        assert rejected.value.retry_after_header == "3"
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+
+
+def test_waiter_is_rejected_when_no_slot_frees_in_time():
+    async def scenario():
+        controller = AdmissionController(default_limit=1, max_queue=10, max_wait=0.05)
+        started, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, "tool", started, release))
+        await started.wait()
+
+        with pytest.raises(AdmissionRejected, match="without a free slot"):
+            async with controller.admit("tool"):
+                pass
+        assert controller.queue_depth == 0
+        release.set()
+        await holder
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_limits_are_per_tool():
+    async def scenario():
+        controller = AdmissionController(default_limit=1, tool_limits={"wide": 3}, max_queue=0)
+        async with controller.admit("wide"), controller.admit("wide"), controller.admit("wide"):
+            async with controller.admit("narrow"):
+                assert controller.in_flight == 4
+
+    asyncio.run(scenario())
+
+
+def test_parse_tool_limits():
+    assert parse_tool_limits(" generate_diagram=2, validate=8 ,") == {"generate_diagram": 2, "validate": 8}
+    assert parse_tool_limits(None) == {}
+    with pytest.raises(ValueError):
+        parse_tool_limits("generate_diagram")
+
+
+def test_rejection_becomes_http_429_with_retry_after(monkeypatch):
+    testclient = pytest.importorskip("fastapi.testclient")
+    import mcp_http_wrapper
+
+    async def rejected(*args, **kwargs):
+        raise AdmissionRejected("'generate_diagram' cannot start before the request deadline", retry_after=4.2)
+
+    monkeypatch.setattr(mcp_http_wrapper.mcp_service, "call_mcp_timed", rejected)
+    response = testclient.TestClient(mcp_http_wrapper.app).post(
+        "/mcp/tools/call", json={"name": "generate_diagram", "arguments": {}}
+    )
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
+    assert response.json()["success"] is False
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from mcp_admission import AdmissionController
+
+testclient = pytest.importorskip("fastapi.testclient")
+import mcp_http_wrapper  # noqa: E402
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = mcp_http_wrapper.mcp_service
+    monkeypatch.setattr(service, "inprocess_enabled", False)
+    monkeypatch.setattr(service, "admission", AdmissionController(default_limit=2, max_queue=1, max_wait=5))
+    in_flight = {"now": 0, "peak": 0}
+
+    async def dispatch(method, params, timings=None):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return {"jsonrpc": "2.0", "id": 1, "result": {"content": [
+            {"type": "text", "text": str(params["arguments"]["n"])}
+        ]}}
+
+    monkeypatch.setattr(service, "_dispatch", dispatch)
+    return in_flight
+
+
+def test_batch_larger_than_the_admission_queue_is_not_rejected(service):
+    calls = [{"name": "validate_azure_components", "arguments": {"n": n}} for n in range(20)]
+    response = testclient.TestClient(mcp_http_wrapper.app).post("/mcp/tools/batch", json={"calls": calls})
+
+    body = response.json()
+    assert body["success"] is True
+    assert [item["success"] for item in body["results"]] == [True] * 20
+    # Results keep the order of the calls
+    assert [item["result"]["result"]["content"][0]["text"] for item in body["results"]] == [str(n) for n in range(20)]
+    assert service["peak"] <= 2
+
+
+def test_invalid_calls_fail_individually(service):
+    calls = [{"name": "validate_azure_components", "arguments": {"n": 1}}, {"arguments": {}}, "nope"]
+    body = testclient.TestClient(mcp_http_wrapper.app).post("/mcp/tools/batch", json={"calls": calls}).json()
+    assert [item["success"] for item in body["results"]] == [True, False, False]
+    assert body["results"][1]["error"] == "Tool name is required"
+
+
+def test_batch_over_the_call_limit_is_refused(service, monkeypatch):
+    monkeypatch.setenv("MCP_BATCH_MAX_CALLS", "2")
+    calls = [{"name": "validate_azure_components", "arguments": {"n": n}} for n in range(3)]
+    body = testclient.TestClient(mcp_http_wrapper.app).post("/mcp/tools/batch", json={"calls": calls}).json()
+    assert body["success"] is False
+    assert "exceeds the limit of 2" in body["error"]
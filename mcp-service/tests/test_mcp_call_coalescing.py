@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from mcp_call_coalescing import SingleFlight, TTLCache, call_key
+
+
+def test_call_key_ignores_argument_order():
+    a = call_key("tools/call", {"name": "t", "arguments": {"x": 1, "y": [1, 2]}})
+    b = call_key("tools/call", {"arguments": {"y": [1, 2], "x": 1}, "name": "t"})
+    assert a == b
+    assert call_key("tools/call", {"name": "t", "arguments": {"x": 2, "y": [1, 2]}}) != a
+    assert call_key("tools/call", {"name": "u", "arguments": {"x": 1, "y": [1, 2]}}) != a
+    assert call_key("tools/list") == call_key("tools/list", {})
+
+
+def test_single_flight_shares_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        assert results == [1] * 5
+        assert (flight.executions, flight.coalesced, flight.inflight_count) == (1, 4, 0)
+
+        # Finished calls are not reused
+        assert await flight.do("k", work) == 2
+
+    asyncio.run(scenario())
+
+
+def test_single_flight_survives_a_cancelled_waiter():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(scenario())
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("mcp_call_coalescing.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl_seconds=5, max_entries=10)
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    now[0] += 6
+    assert cache.get("k") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_ttl_cache_disabled_by_zero_ttl():
+    assert not TTLCache(ttl_seconds=0).enabled
+    assert not TTLCache(max_entries=0).enabled
+    assert TTLCache().enabled
@@ -0,0 +1,141 @@
+import asyncio
+import itertools
+import sys
+import textwrap
+
+import pytest
+
+from mcp_session_pool import MCPSession, MCPSessionError, MCPSessionPool
+
+# Minimal stdio server: answers every request by id, replying to "slow" after the others
+ECHO_SERVER = textwrap.dedent("""
+    import json, sys, threading, time
+
+    lock = threading.Lock()
+
+    def reply(message):
+        if message.get("method") == "slow":
+            time.sleep(0.2)
+        with lock:
+            sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"],
+                                         "result": {"method": message["method"], "params": message["params"]}}) + "\\n")
+            sys.stdout.flush()
+
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" in message:
+            threading.Thread(target=reply, args=(message,)).start()
+""")
+
+
+def test_session_routes_concurrent_responses_by_id(tmp_path):
+    server = tmp_path / "server.py"
+    server.write_text(ECHO_SERVER)
+
+    async def scenario():
+        session = MCPSession(sys.executable, str(server), str(tmp_path))
+        await session.start(timeout=10)
+        try:
+            slow = asyncio.create_task(session.request("slow", {"n": -1}, timeout=10))
+            responses = await asyncio.gather(*(session.request("echo", {"n": n}, timeout=10) for n in range(10)))
+            assert [r["result"]["params"]["n"] for r in responses] == list(range(10))
+            assert not slow.done()
+            assert (await slow)["result"]["params"] == {"n": -1}
+            assert session.in_flight == 0
+        finally:
+            await session.close()
+        with pytest.raises(MCPSessionError):
+            await session.request("echo")
+
+    asyncio.run(scenario())
+
+
+class FakeSession:
+    _pids = itertools.count(1000)
+
+    def __init__(self):
+        self.pid = next(self._pids)
+        self.request_count = 0
+        self.broken = False
+        self.draining = False
+        self.closed = False
+        self.startup_timings = None
+
+    @property
+    def is_alive(self):
+        return not self.broken and not self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    spawned = []
+
+    async def factory():
+        session = FakeSession()
+        spawned.append(session)
+        return session
+
+    pool = MCPSessionPool(factory, health_check_interval=0, **kwargs)
+    return pool, spawned
+
+
+def test_pool_grows_before_sharing_and_caps_concurrency():
+    async def scenario():
+        pool, spawned = make_pool(min_size=1, max_size=2, max_concurrency=2)
+        await pool.start()
+
+        async def lease():
+            async with pool.session() as session:
+                return session
+
+        assert len(spawned) == 1
+
+        async with pool.session() as a, pool.session() as b:
+            # A second request gets a new session rather than stacking onto the busy one
+            assert a is not b
+            async with pool.session() as c, pool.session() as d:
+                assert {c, d} == {a, b}
+                assert pool.stats()["in_flight"] == 4
+
+                # Every session is at max_concurrency, so the next request waits for a release
+                waiter = asyncio.create_task(lease())
+                await asyncio.sleep(0.01)
+                assert not waiter.done()
+            assert await waiter in (a, b)
+        assert len(spawned) == 2
+        await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_pool_recycles_sessions_after_max_requests():
+    async def scenario():
+        pool, spawned = make_pool(min_size=1, max_size=1, max_requests=2)
+        await pool.start()
+        for _ in range(2):
+            async with pool.session() as session:
+                session.request_count += 1
+        first = spawned[0]
+        assert first.closed
+
+        async with pool.session() as session:
+            assert session is not first
+        await pool.close()
+        assert all(s.closed for s in spawned)
+
+    asyncio.run(scenario())
+
+
+def test_pool_replaces_crashed_sessions():
+    async def scenario():
+        pool, spawned = make_pool(min_size=1, max_size=1)
+        async with pool.session() as session:
+            session.broken = True
+        async with pool.session() as replacement:
+            assert replacement is not session
+        assert spawned[0].closed
+        await pool.close()
+
+    asyncio.run(scenario())
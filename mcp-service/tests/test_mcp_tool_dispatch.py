@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+import pytest
+
+from mcp_tool_dispatch import INLINE, PROCESS, THREAD, InProcessToolDispatcher, parse_tool_dispatch
+
+
+@pytest.fixture(scope="module")
+def dispatcher():
+    dispatcher = InProcessToolDispatcher({"get_available_services": INLINE, "validate_azure_components": THREAD})
+    dispatcher.load()
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def test_only_configured_tool_calls_are_handled(dispatcher):
+    assert dispatcher.handles("tools/call", {"name": "get_available_services"})
+    assert not dispatcher.handles("tools/call", {"name": "generate_diagram"})
+    assert not dispatcher.handles("tools/list", {"name": "get_available_services"})
+    assert dispatcher.mode_for("generate_diagram") == PROCESS
+
+
+@pytest.mark.parametrize("name,arguments", [
+    ("get_available_services", {"provider": "azure"}),
+    ("validate_azure_components", {"component_names": ["AppServices", "NoSuchThing"]}),
+])
+def test_calls_return_json_rpc_results(dispatcher, name, arguments):
+    response = asyncio.run(dispatcher.call("tools/call", {"name": name, "arguments": arguments}))
+    assert response["jsonrpc"] == "2.0"
+    assert response["result"].get("isError") is not True
+    assert json.loads(response["result"]["content"][0]["text"])
+
+
+def test_arguments_are_validated_against_the_input_schema(dispatcher):
+    response = asyncio.run(dispatcher.call("tools/call", {
+        "name": "validate_azure_components", "arguments": {"component_names": "AppServices"}
+    }))
+    assert response["result"]["isError"] is True
+    assert response["result"]["content"][0]["text"].startswith("Input validation error:")
+
+
+def test_parse_tool_dispatch_rejects_unknown_modes():
+    assert parse_tool_dispatch("a=thread")["a"] == THREAD
+    with pytest.raises(ValueError):
+        parse_tool_dispatch("a=somewhere")
@@ -0,0 +1,57 @@
+import os
+import pickle
+
+import pytest
+
+import node_catalog
+from node_catalog import CATALOG_FORMAT, PROVIDERS, compile_catalog, diagrams_version, load_catalog
+
+if not diagrams_version():
+    pytest.skip("diagrams is not installed", allow_module_level=True)
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog(None)
+
+
+def test_resolve_follows_module_aliases(catalog):
+    ecs = catalog.resolve("diagrams.aws.compute", "ECS")
+    assert ecs is catalog.resolve("diagrams.aws.compute", "ElasticContainerService")
+    assert ecs.path == "diagrams.aws.compute.ElasticContainerService"
+    assert catalog.resolve("diagrams.aws.compute", "Nope") is None
+    assert ecs in catalog.find("ecs")
+    assert catalog.find("ecs", provider="aws") == (ecs,)
+
+
+def test_check_import_matches_python_import_errors(catalog):
+    assert catalog.check_import("diagrams.aws.compute", ["EC2", "ECS"]) is None
+    assert catalog.check_import("diagrams.aws.compute", ["*"]) is None
+    # Submodules are importable from their provider package
+    assert catalog.check_import("diagrams.aws", ["compute"]) is None
+    assert catalog.check_import("diagrams.aws.compute", ["EC2", "Nope"]) == \
+        "cannot import name 'Nope' from 'diagrams.aws.compute'"
+    assert catalog.check_import("diagrams.aws.nope", ["EC2"]) == "No module named 'diagrams.aws.nope'"
+    assert catalog.covers("diagrams.gcp.compute") and not catalog.covers("diagramsx.aws")
+
+
+def test_icon_paths_exist(catalog):
+    assert os.path.isfile(catalog.icon_path(catalog.resolve("diagrams.aws.compute", "EC2")))
+    assert catalog.summary()["classes"] == len(catalog.nodes)
+
+
+def test_artifact_is_used_only_for_the_installed_version(tmp_path, monkeypatch):
+    artifact = str(tmp_path / "diagram_nodes.catalog")
+    data = compile_catalog(artifact)
+    assert data["format"] == CATALOG_FORMAT and data["requested_providers"] == PROVIDERS
+
+    def no_walk(providers=PROVIDERS):
+        raise AssertionError("the artifact should have been used")
+
+    monkeypatch.setattr(node_catalog, "build_catalog_data", no_walk)
+    assert len(load_catalog(artifact).nodes) == len(data["nodes"])
+
+    with open(artifact, "wb") as f:
+        pickle.dump(dict(data, diagrams_version="0.0.0"), f)
+    with pytest.raises(AssertionError):
+        load_catalog(artifact)
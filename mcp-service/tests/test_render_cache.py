@@ -0,0 +1,92 @@
+import os
+
+from render_cache import RenderCache, normalize_code, render_cache_key, render_cache_events
+
+CODE = '''from diagrams import Diagram
+from diagrams.azure.compute import VM
+
+with Diagram("Demo", show=False, filename="a"):
+    VM("vm")
+'''
+
+
+def test_key_ignores_comments_whitespace_and_filename():
+    variant = '''# a comment
+from diagrams import Diagram
+from diagrams.azure.compute import VM
+
+
+with Diagram("Demo", show=False,   filename="b"):  # trailing comment
+    VM( "vm" )
+'''
+    assert normalize_code(variant) == normalize_code(CODE)
+    assert render_cache_key(variant, "png") == render_cache_key(CODE, "png")
+
+
+def test_key_depends_on_code_format_and_theme():
+    key = render_cache_key(CODE, "png")
+    assert render_cache_key(CODE.replace('"vm"', '"web"'), "png") != key
+    assert render_cache_key(CODE, "svg") != key
+    assert render_cache_key(CODE, "PNG") == key
+    assert render_cache_key(CODE, "png", theme="dark") != key
+
+
+def test_unparseable_code_still_normalizes():
+    assert normalize_code("with Diagram(:\n  # note\n  x") == normalize_code("with   Diagram(:\n  x")
+
+
+def test_get_reports_memory_disk_and_miss_tiers(tmp_path):
+    cache = RenderCache(root=str(tmp_path))
+    assert cache.get(CODE, "png") == (None, "miss")
+    cache.put(CODE, "png", None, b"image")
+    assert cache.get(CODE, "png") == (b"image", "memory")
+
+    # A fresh process only has the disk tier
+    restarted = RenderCache(root=str(tmp_path))
+    events = []
+    token = render_cache_events.set(events)
+    try:
+        assert restarted.get(CODE, "png") == (b"image", "disk")
+        assert restarted.get(CODE, "png") == (b"image", "memory")
+    finally:
+        render_cache_events.reset(token)
+    assert events == ["disk", "memory"]
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(root=str(tmp_path), memory_max_bytes=10)
+    codes = [CODE.replace('"vm"', f'"vm{i}"') for i in range(3)]
+    cache.put(codes[0], "png", None, b"aaaa")
+    cache.put(codes[1], "png", None, b"bbbb")
+    assert cache.get(codes[0], "png")[1] == "memory"
+    cache.put(codes[2], "png", None, b"cccc")
+
+    assert cache.stats()["memory_bytes"] <= 10
+    assert cache.evictions == 1
+    assert cache.get(codes[0], "png")[1] == "memory"
+    assert cache.get(codes[2], "png")[1] == "memory"
+    # Evicted from memory, still on disk
+    assert cache.get(codes[1], "png")[1] == "disk"
+
+
+def test_entries_larger_than_the_memory_tier_stay_on_disk(tmp_path):
+    cache = RenderCache(root=str(tmp_path), memory_max_bytes=4)
+    cache.put(CODE, "png", None, b"too large")
+    assert cache.stats()["memory_entries"] == 0
+    assert cache.get(CODE, "png") == (b"too large", "disk")
+
+
+def test_disk_tier_evicts_oldest_files(tmp_path):
+    cache = RenderCache(root=str(tmp_path), memory_max_bytes=0, disk_max_bytes=10)
+    codes = [CODE.replace('"vm"', f'"vm{i}"') for i in range(3)]
+    for i, code in enumerate(codes):
+        cache.put(code, "png", None, b"xxxx")
+        # Distinct mtimes so the eviction order does not depend on timer resolution
+        path = tmp_path / f"{render_cache_key(code, 'png')}.png"
+        os.utime(path, (1_000_000 + i, 1_000_000 + i))
+
+    cache.put(CODE, "png", None, b"yyyy")
+    remaining = {path.name for path in tmp_path.iterdir()}
+    assert f"{render_cache_key(codes[0], 'png')}.png" not in remaining
+    assert f"{render_cache_key(CODE, 'png')}.png" in remaining
+    assert sum(path.stat().st_size for path in tmp_path.iterdir()) <= 10
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+
+import render_worker_pool
+from render_worker_pool import RenderWorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = RenderWorkerPool(size=1, wall_timeout=2, cpu_seconds=5, memory_mb=0, startup_timeout=60)
+    yield pool
+    pool.close()
+
+
+def test_job_runs_in_its_work_dir_with_captured_output(pool, tmp_path):
+    code = "print('hello')\nopen('diagram.png', 'wb').write(b'png')"
+    result = asyncio.run(pool.render(code, "png", str(tmp_path)))
+    assert result["success"] is True
+    assert result["output_file"] == str(tmp_path / "diagram.png")
+    assert result["stdout"] == "hello\n"
+    assert (tmp_path / "diagram.png").read_bytes() == b"png"
+
+
+def test_runaway_job_hits_the_wall_clock_limit_and_worker_is_reused(pool, tmp_path):
+    result = asyncio.run(pool.render("while True: pass", "png", str(tmp_path)))
+    assert result["success"] is False
+    assert result["error_type"] == "RenderLimitExceeded"
+
+    result = asyncio.run(pool.render("open('diagram.svg', 'w').write('<svg/>')", "svg", str(tmp_path)))
+    assert result["success"] is True
+    assert pool.stats()["killed_total"] == 0
+
+
+class FakeWorker:
+    def __init__(self, context, memory_mb, startup_timeout):
+        self.jobs = 0
+        self.is_alive = True
+
+    def close(self):
+        self.is_alive = False
+
+
+def test_checkout_times_out_when_the_pool_stays_busy(monkeypatch):
+    monkeypatch.setattr(render_worker_pool, "_RenderWorker", FakeWorker)
+    pool = RenderWorkerPool(size=1, checkout_timeout=0.1)
+    worker = pool._checkout(pool.checkout_timeout)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool._checkout(pool.checkout_timeout)
+    assert time.monotonic() - started < 2
+
+    pool._checkin(worker, keep=True)
+    assert pool._checkout(pool.checkout_timeout) is worker
+    pool.close()
+
+
+def test_failed_spawn_frees_its_slot_instead_of_hanging(monkeypatch, tmp_path):
+    def broken_worker(context, memory_mb, startup_timeout):
+        raise RuntimeError("Render worker did not start within 0s")
+
+    monkeypatch.setattr(render_worker_pool, "_RenderWorker", broken_worker)
+    pool = RenderWorkerPool(size=1, checkout_timeout=0.1)
+    for _ in range(2):
+        result = asyncio.run(pool.render("pass", "png", str(tmp_path)))
+        assert result["success"] is False
+        assert "did not start" in result["error"]
+    assert pool.stats()["workers"] == 0
+    pool.close()